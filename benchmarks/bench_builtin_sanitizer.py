@@ -0,0 +1,69 @@
+"""
+Compare the built-in sanitizer engines.
+
+Runs HTMLSanitizer (html.parser based) and FastHTMLSanitizer over the same
+documents, checks that their output is identical and reports timings.
+
+Usage:
+    python benchmarks/bench_builtin_sanitizer.py [--size 200000] [--repeat 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from common import setup_django
+
+setup_django()
+
+from corpus import long_article  # noqa: E402
+
+from chedito.sanitizer import FastHTMLSanitizer, get_policy  # noqa: E402
+from chedito.utils import HTMLSanitizer  # noqa: E402
+
+
+def run_reference(policy, document):
+    sanitizer = HTMLSanitizer(policy=policy)
+    sanitizer.feed(document)
+    return sanitizer.get_result()
+
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000, help="document size in characters")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per engine (best is kept)")
+    args = parser.parse_args()
+
+    policy = get_policy()
+    document = long_article(random.Random(1234), size=args.size)
+    fast = FastHTMLSanitizer(policy)
+
+    reference_time, reference_output = timed(lambda: run_reference(policy, document), args.repeat)
+    fast_time, fast_output = timed(lambda: fast.sanitize(document), args.repeat)
+
+    if fast_output != reference_output:
+        print("ERROR: FastHTMLSanitizer output differs from HTMLSanitizer")
+        return 1
+
+    size_mb = len(document.encode("utf-8")) / (1024 * 1024)
+    print(f"document: {len(document):,} characters")
+    for name, elapsed in (("HTMLSanitizer", reference_time), ("FastHTMLSanitizer", fast_time)):
+        print(f"{name:<18} {elapsed * 1000:8.2f} ms  {size_mb / elapsed:8.2f} MB/s")
+    print(f"speedup: {reference_time / fast_time:.2f}x (outputs identical)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
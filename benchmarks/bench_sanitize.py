@@ -0,0 +1,158 @@
+"""
+Benchmark sanitize_html across backends, policies and document shapes.
+
+Reports throughput (MB/s), p50/p99 latency per document and peak Python heap
+usage for every available backend (nh3, bleach, builtin) and policy, over a
+generated corpus of Quill-shaped documents.
+
+Usage:
+    python benchmarks/bench_sanitize.py
+    python benchmarks/bench_sanitize.py --backend builtin --category hostile
+    python benchmarks/bench_sanitize.py --json results.json
+    python benchmarks/bench_sanitize.py --compare results.json --threshold 0.2
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from common import percentile, setup_django
+
+setup_django()
+
+from corpus import CATEGORIES, build_corpus  # noqa: E402
+
+from chedito.sanitizer import BACKENDS, SanitizationPolicy, get_policy  # noqa: E402
+
+POLICIES = {
+    "default": get_policy,
+    "strict": lambda: SanitizationPolicy(
+        ["p", "br", "strong", "em", "a", "ul", "ol", "li"],
+        {"a": ["href"]},
+        ["color"],
+    ),
+}
+
+
+def available_backends():
+    """Instantiate every sanitizer backend whose library is installed."""
+    backends = {}
+    for backend_class in BACKENDS:
+        try:
+            backend = backend_class()
+        except ImportError:
+            continue
+        backends[backend.name] = backend
+    return backends
+
+
+def measure(backend, policy, documents, repeat):
+    """Benchmark one backend/policy pair on a list of documents."""
+    for document in documents:
+        backend.clean(document, policy)
+
+    latencies = []
+    elapsed = 0.0
+    for _ in range(repeat):
+        for document in documents:
+            start = time.perf_counter()
+            backend.clean(document, policy)
+            duration = time.perf_counter() - start
+            latencies.append(duration)
+            elapsed += duration
+
+    tracemalloc.start()
+    for document in documents:
+        backend.clean(document, policy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total_bytes = sum(len(document.encode("utf-8")) for document in documents) * repeat
+    return {
+        "mb_per_s": total_bytes / (1024 * 1024) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return human-readable throughput regressions against a baseline."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous or not previous["mb_per_s"]:
+            continue
+        change = (current["mb_per_s"] - previous["mb_per_s"]) / previous["mb_per_s"]
+        if change < -threshold:
+            regressions.append(
+                f"{key}: {previous['mb_per_s']:.2f} -> {current['mb_per_s']:.2f} MB/s "
+                f"({change:+.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", action="append", help="backend(s) to run (default: all)")
+    parser.add_argument("--policy", action="append", choices=sorted(POLICIES))
+    parser.add_argument("--category", action="append", choices=sorted(CATEGORIES))
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per document")
+    parser.add_argument("--scale", type=float, default=1.0, help="corpus size multiplier")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="allowed throughput drop versus the baseline (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    backends = available_backends()
+    if args.backend:
+        backends = {name: backends[name] for name in args.backend if name in backends}
+    if not backends:
+        print("No sanitizer backends available.")
+        return 1
+
+    corpus = build_corpus(seed=args.seed, scale=args.scale)
+    categories = args.category or list(corpus)
+    policies = {name: POLICIES[name]() for name in (args.policy or POLICIES)}
+
+    header = f"{'backend':<8} {'policy':<8} {'category':<15} {'MB/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>9}"
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    for backend_name, backend in backends.items():
+        for policy_name, policy in policies.items():
+            for category in categories:
+                stats = measure(backend, policy, corpus[category], args.repeat)
+                results[f"{backend_name}/{policy_name}/{category}"] = stats
+                print(
+                    f"{backend_name:<8} {policy_name:<8} {category:<15} "
+                    f"{stats['mb_per_s']:9.2f} {stats['p50_ms']:9.3f} "
+                    f"{stats['p99_ms']:9.3f} {stats['peak_kb']:9.1f}"
+                )
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print("\nThroughput regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo throughput regressions.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
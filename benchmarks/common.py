@@ -0,0 +1,30 @@
+"""
+Shared helpers for the chedito benchmarks.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(chedito_config=None):
+    """Configure a minimal Django environment so chedito can be imported."""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(INSTALLED_APPS=["chedito"], CHEDITO_CONFIG=chedito_config or {})
+        django.setup()
+
+
+def percentile(values, fraction):
+    """Return the ``fraction`` percentile (0-1) of ``values`` (nearest rank)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,160 @@
+"""
+Generated corpus of Quill-shaped documents for the sanitizer benchmarks.
+
+Documents are built from a seeded random generator, so every run (and every
+machine) benchmarks exactly the same input.
+"""
+
+import random
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat"
+).split()
+
+COLORS = ("rgb(230, 0, 0)", "rgb(0, 138, 0)", "#06c", "yellow", "rgb(153, 51, 255)")
+ALIGNS = ("center", "right", "justify")
+
+HOSTILE_SNIPPETS = (
+    '<script>alert("xss")</script>',
+    '<img src=x onerror="alert(1)">',
+    '<a href="javascript:alert(document.cookie)">click</a>',
+    '<a href=" JaVaScRiPt:alert(1)">click</a>',
+    '<iframe src="data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg=="></iframe>',
+    '<svg onload="alert(1)"><circle r="1"/></svg>',
+    '<p style="background-image: url(javascript:alert(1)); color: red">styled</p>',
+    '<style>body { display: none }</style>',
+    '<!--<script>alert(1)</script>-->',
+    '<math><mi xlink:href="javascript:alert(1)">x</mi></math>',
+    '<div onclick="steal()" onmouseover="steal()">hover</div>',
+    '<object data="evil.swf"></object><embed src="evil.swf">',
+    '<p>unclosed <b><i>nesting</b></i> &lt;escaped&gt; &amp;amp;</p>',
+)
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + "."
+
+
+def _inline(rng):
+    """A sentence with Quill inline formatting."""
+    text = _sentence(rng)
+    choice = rng.random()
+    if choice < 0.15:
+        return f"<strong>{text}</strong>"
+    if choice < 0.25:
+        return f"<em>{text}</em>"
+    if choice < 0.32:
+        return f'<a href="https://example.com/{rng.randint(1, 999)}" target="_blank" rel="noopener noreferrer">{text}</a>'
+    if choice < 0.38:
+        return f"<code>{text}</code>"
+    return text
+
+
+def _paragraph(rng):
+    body = " ".join(_inline(rng) for _ in range(rng.randint(1, 4)))
+    if rng.random() < 0.15:
+        return f'<p class="ql-align-{rng.choice(ALIGNS)}">{body}</p>'
+    return f"<p>{body}</p>"
+
+
+def small_comment(rng):
+    """A short comment: one or two paragraphs of lightly formatted text."""
+    return "".join(_paragraph(rng) for _ in range(rng.randint(1, 2)))
+
+
+def long_article(rng, size=50_000):
+    """A long article with headings, lists, quotes, images and video embeds."""
+    parts = []
+    total = 0
+    while total < size:
+        roll = rng.random()
+        if roll < 0.08:
+            level = rng.randint(1, 3)
+            part = f"<h{level}>{_sentence(rng, 2, 6)}</h{level}>"
+        elif roll < 0.16:
+            items = "".join(f"<li>{_inline(rng)}</li>" for _ in range(rng.randint(2, 6)))
+            tag = rng.choice(("ul", "ol"))
+            part = f"<{tag}>{items}</{tag}>"
+        elif roll < 0.20:
+            part = f"<blockquote>{_sentence(rng)}</blockquote>"
+        elif roll < 0.24:
+            part = f'<p><img src="/media/chedito_uploads/images/img_{rng.randint(1, 99)}.png" alt="{_sentence(rng, 1, 3)}"></p>'
+        elif roll < 0.25:
+            part = '<iframe class="ql-video" frameborder="0" allowfullscreen="true" src="https://www.youtube.com/embed/dQw4w9WgXcQ"></iframe>'
+        elif roll < 0.28:
+            part = f'<pre class="ql-syntax" spellcheck="false">{_sentence(rng)}</pre>'
+        else:
+            part = _paragraph(rng)
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)
+
+
+def table_heavy(rng, rows=200, cols=6):
+    """A document dominated by a large table."""
+    header = "".join(f"<th>{_sentence(rng, 1, 2)}</th>" for _ in range(cols))
+    body = []
+    for _ in range(rows):
+        cells = "".join(
+            f'<td colspan="1" rowspan="1">{_sentence(rng, 1, 4)}</td>' for _ in range(cols)
+        )
+        body.append(f"<tr>{cells}</tr>")
+    return (
+        f"<p>{_sentence(rng)}</p>"
+        f"<table><thead><tr>{header}</tr></thead><tbody>{''.join(body)}</tbody></table>"
+    )
+
+
+def style_heavy(rng, spans=1500):
+    """A document where most text carries inline styles (pasted content)."""
+    parts = []
+    for _ in range(spans):
+        styles = [f"color: {rng.choice(COLORS)}"]
+        if rng.random() < 0.5:
+            styles.append(f"background-color: {rng.choice(COLORS)}")
+        if rng.random() < 0.4:
+            styles.append(f"font-size: {rng.randint(10, 32)}px")
+        if rng.random() < 0.3:
+            styles.append("position: absolute")
+        parts.append(f'<span style="{"; ".join(styles)};">{_sentence(rng, 2, 6)}</span> ')
+    return f"<p>{''.join(parts)}</p>"
+
+
+def hostile(rng, count=300):
+    """Quill-shaped content interleaved with XSS payloads and broken markup."""
+    parts = []
+    for _ in range(count):
+        parts.append(_paragraph(rng))
+        parts.append(rng.choice(HOSTILE_SNIPPETS))
+    return "".join(parts)
+
+
+# name -> (generator, number of documents)
+CATEGORIES = {
+    "small_comments": (small_comment, 500),
+    "long_articles": (long_article, 5),
+    "table_heavy": (table_heavy, 5),
+    "style_heavy": (style_heavy, 5),
+    "hostile": (hostile, 5),
+}
+
+
+def build_corpus(seed=1234, scale=1.0):
+    """
+    Build the benchmark corpus.
+
+    Args:
+        seed: Random seed; the same seed always yields the same corpus.
+        scale: Multiplier for the number of documents per category.
+
+    Returns:
+        Dict mapping category name to a list of HTML documents.
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    for name, (generator, count) in CATEGORIES.items():
+        corpus[name] = [generator(rng) for _ in range(max(1, int(count * scale)))]
+    return corpus
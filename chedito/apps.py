@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CheditoConfig(AppConfig):
@@ -10,4 +11,11 @@ class CheditoConfig(AppConfig):
 
     def ready(self):
         """Perform initialization when Django starts."""
-        pass
+        from chedito.assets import precompute_integrity
+        from chedito.conf import chedito_settings
+        from chedito.tasks import check_status_cache
+
+        checks.register(check_status_cache, checks.Tags.caches)
+
+        if chedito_settings.asset_integrity:
+            precompute_integrity()
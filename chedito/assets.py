@@ -0,0 +1,164 @@
+"""
+Chedito static asset tags.
+
+The ``<link>`` and ``<script>`` tags output by chedito_css and chedito_js
+are built once per settings fingerprint and reused, so rendering them
+doesn't resolve static URLs (a manifest lookup with
+ManifestStaticFilesStorage) on every request. Subresource integrity
+digests are computed once per file, at startup when they are enabled.
+"""
+
+import base64
+import hashlib
+
+from django.core.exceptions import ImproperlyConfigured
+from django.templatetags.static import static
+from django.urls import get_script_prefix
+from django.utils.html import format_html
+
+from chedito.conf import chedito_settings
+
+QUILL_THEME_CSS = {
+    "snow": "chedito/css/quill.snow.css",
+    "bubble": "chedito/css/quill.bubble.css",
+}
+CHEDITO_CSS = "chedito/css/chedito.css"
+JS_ASSETS = ("chedito/js/quill.min.js", "chedito/js/chedito.js")
+
+INTEGRITY_ALGORITHM = "sha384"
+
+# Built tags by (kind, fingerprint), and integrity digests by static path
+_tags = {}
+_integrity = {}
+
+
+def get_css_assets(theme=None):
+    """
+    Get the static paths of the stylesheets for a Quill theme.
+
+    Args:
+        theme: Quill theme (default: the quill_theme setting).
+
+    Returns:
+        Tuple of static paths.
+    """
+    if theme is None:
+        theme = chedito_settings.quill_theme
+    # Themes other than bubble use the snow stylesheet
+    return (QUILL_THEME_CSS.get(theme, QUILL_THEME_CSS["snow"]), CHEDITO_CSS)
+
+
+def _read_static(path):
+    """Read a static file as it is served, or from the finders before collectstatic."""
+    from django.contrib.staticfiles import finders
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    try:
+        # Post-processed storages rewrite CSS, so hash the stored copy
+        name = getattr(staticfiles_storage, "stored_name", lambda name: name)(path)
+        with staticfiles_storage.open(name) as f:
+            return f.read()
+    except (ImproperlyConfigured, OSError, ValueError):
+        pass
+
+    found = finders.find(path)
+    if not found:
+        return None
+    with open(found, "rb") as f:
+        return f.read()
+
+
+def get_integrity(path):
+    """
+    Get the subresource integrity value of a static file.
+
+    Args:
+        path: Static path of the file.
+
+    Returns:
+        The ``sha384-...`` value, or None if the file can't be found.
+    """
+    if path not in _integrity:
+        content = _read_static(path)
+        if content is None:
+            _integrity[path] = None
+        else:
+            digest = hashlib.new(INTEGRITY_ALGORITHM, content).digest()
+            _integrity[path] = f"{INTEGRITY_ALGORITHM}-{base64.b64encode(digest).decode('ascii')}"
+    return _integrity[path]
+
+
+def precompute_integrity():
+    """Compute the integrity values of every chedito asset."""
+    for path in (*QUILL_THEME_CSS.values(), CHEDITO_CSS, *JS_ASSETS):
+        get_integrity(path)
+
+
+def _integrity_attributes(path):
+    integrity = get_integrity(path) if chedito_settings.asset_integrity else None
+    if integrity is None:
+        return ""
+    return format_html(' integrity="{}" crossorigin="anonymous"', integrity)
+
+
+def build_css_tags():
+    """Build the stylesheet tags, with preload hints for the scripts if enabled."""
+    tags = [
+        format_html('<link rel="stylesheet" href="{}"{}>', static(path), _integrity_attributes(path))
+        for path in get_css_assets()
+    ]
+    if chedito_settings.asset_preload:
+        tags.extend(
+            format_html(
+                '<link rel="preload" href="{}" as="script"{}>',
+                static(path),
+                _integrity_attributes(path),
+            )
+            for path in JS_ASSETS
+        )
+    return "\n".join(tags)
+
+
+def build_js_tags():
+    """Build the script tags."""
+    defer = " defer" if chedito_settings.asset_defer else ""
+    return "\n".join(
+        format_html('<script src="{}"{}{}></script>', static(path), defer, _integrity_attributes(path))
+        for path in JS_ASSETS
+    )
+
+
+_BUILDERS = {"css": build_css_tags, "js": build_js_tags}
+
+
+def get_asset_tags(kind):
+    """
+    Get the tags for the CSS or JS assets, building them once per fingerprint.
+
+    The fingerprint covers the settings the tags depend on and the script
+    prefix, which Django adds to relative STATIC_URLs.
+
+    Args:
+        kind: "css" or "js".
+
+    Returns:
+        HTML string of the tags.
+    """
+    key = (
+        kind,
+        chedito_settings.quill_theme,
+        chedito_settings.asset_preload,
+        chedito_settings.asset_defer,
+        chedito_settings.asset_integrity,
+        get_script_prefix(),
+    )
+    tags = _tags.get(key)
+    if tags is None:
+        tags = _tags[key] = _BUILDERS[kind]()
+    return tags
+
+
+def reset_asset_cache():
+    """Discard the built tags and integrity values."""
+    _tags.clear()
+    _integrity.clear()
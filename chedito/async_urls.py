@@ -0,0 +1,32 @@
+"""
+Chedito URL configuration for ASGI deployments.
+
+Same URLs as chedito.urls, but the upload endpoints use the async views so
+uploads don't occupy Django's sync thread while they are saved:
+
+    from django.urls import path, include
+
+    urlpatterns = [
+        ...
+        path('chedito/', include('chedito.async_urls')),
+    ]
+"""
+
+from django.urls import path
+
+from chedito.urls import urlpatterns as sync_urlpatterns
+from chedito.views import AsyncFileUploadView, AsyncImageUploadView, AsyncVideoUploadView
+
+app_name = "chedito"
+
+# Sync views replaced by their async counterparts
+ASYNC_VIEW_NAMES = frozenset({"upload_image", "upload_video", "upload_file"})
+
+urlpatterns = [
+    path("upload/image/", AsyncImageUploadView.as_view(), name="upload_image"),
+    path("upload/video/", AsyncVideoUploadView.as_view(), name="upload_video"),
+    path("upload/file/", AsyncFileUploadView.as_view(), name="upload_file"),
+
+    # Batch and chunked uploads, job status and image derivatives stay sync
+    *(pattern for pattern in sync_urlpatterns if pattern.name not in ASYNC_VIEW_NAMES),
+]
@@ -0,0 +1,171 @@
+"""
+Chedito sanitized-output cache.
+
+Caches the result of sanitizing rich text content, keyed by a hash of the
+content and the fingerprint of the sanitization policy. An in-process LRU
+tier can be combined with a Django cache backend tier.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from chedito.conf import chedito_settings
+from chedito.sanitizer import get_backend, get_policy, is_sanitized, mark_sanitized
+from chedito.utils import sanitize_html
+
+
+class SanitizeCache:
+    """
+    A two-tier cache for sanitized HTML.
+
+    The first tier is a size-bounded, thread-safe LRU held in process
+    memory. The optional second tier is a Django cache backend shared
+    between processes.
+    """
+
+    key_prefix = "chedito:sanitized"
+
+    def __init__(self, max_size=0, cache_alias=None, timeout=None):
+        """
+        Initialize SanitizeCache.
+
+        Args:
+            max_size: Maximum number of entries in the in-process tier (0 disables it).
+            cache_alias: Django cache alias for the shared tier (None disables it).
+            timeout: Timeout in seconds for entries in the shared tier.
+        """
+        self.max_size = max_size
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Whether any cache tier is configured."""
+        return bool(self.max_size or self.cache_alias)
+
+    def make_key(self, content, policy):
+        """Build the cache key for content sanitized under a policy."""
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self.key_prefix}:{get_backend().name}:{policy.fingerprint}:{digest}"
+
+    def get_backend_cache(self):
+        """Return the Django cache for the shared tier, or None."""
+        if not self.cache_alias:
+            return None
+        from django.core.cache import caches
+        return caches[self.cache_alias]
+
+    def get(self, key):
+        """Look up a sanitized value, returning None on a miss."""
+        if self.max_size:
+            with self._lock:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+        backend_cache = self.get_backend_cache()
+        if backend_cache is not None:
+            value = backend_cache.get(key)
+            if value is not None:
+                self._store_local(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Store a sanitized value in every configured tier."""
+        self._store_local(key, value)
+        backend_cache = self.get_backend_cache()
+        if backend_cache is not None:
+            backend_cache.set(key, value, self.timeout)
+
+    def _store_local(self, key, value):
+        if not self.max_size:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Clear the in-process tier and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return a dict of cache statistics."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+_sanitize_cache = None
+
+
+def get_sanitize_cache():
+    """Get the process-wide SanitizeCache built from settings."""
+    global _sanitize_cache
+
+    if _sanitize_cache is None:
+        _sanitize_cache = SanitizeCache(
+            max_size=chedito_settings.sanitize_cache_size,
+            cache_alias=chedito_settings.sanitize_cache_alias,
+            timeout=chedito_settings.sanitize_cache_timeout,
+        )
+    return _sanitize_cache
+
+
+def reset_sanitize_cache():
+    """Discard the process-wide cache (called when settings are reloaded)."""
+    global _sanitize_cache
+    _sanitize_cache = None
+
+
+def cached_sanitize_html(html_content, policy=None):
+    """
+    Sanitize HTML content, reusing a cached result when available.
+
+    Falls through to ``sanitize_html`` when no cache tier is configured.
+
+    Args:
+        html_content: The HTML string to sanitize.
+        policy: A compiled SanitizationPolicy (default policy if omitted).
+
+    Returns:
+        Sanitized HTML string.
+    """
+    if not html_content or not chedito_settings.sanitize_html:
+        return sanitize_html(html_content)
+
+    cache = get_sanitize_cache()
+    if policy is None:
+        policy = get_policy()
+    if not cache.enabled or is_sanitized(html_content, policy):
+        return sanitize_html(html_content, policy=policy)
+
+    key = cache.make_key(html_content, policy)
+    value = cache.get(key)
+    if value is None:
+        value = sanitize_html(html_content, policy=policy)
+        cache.set(key, str(value))
+        return value
+    # Entries are only written above, from sanitize_html output
+    return mark_sanitized(value, policy)
@@ -0,0 +1,412 @@
+"""
+Chedito chunked uploads.
+
+Resumable uploads sent as a sequence of chunks. Each session keeps its
+metadata and received chunks in a private local directory, outside of
+MEDIA_ROOT, until it is completed, aborted or expires; on completion the
+chunks are streamed into the configured chedito storage backend.
+
+Requests for a session are serialized by a lock file in its directory,
+and the session metadata is replaced atomically, so concurrent requests
+can't lose or interleave chunks.
+"""
+
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.uploadedfile import UploadedFile
+
+from chedito.conf import chedito_settings
+from chedito.signatures import SNIFF_SIZE, check_signature
+from chedito.utils import validate_file_size, validate_file_type
+
+try:
+    import fcntl
+except ImportError:  # Windows: sessions are only locked within the process
+    fcntl = None
+
+_process_lock = threading.Lock()
+
+
+class ChunkedUploadError(Exception):
+    """An invalid chunked upload request."""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+    def as_dict(self):
+        """Return the error as a JSON-serializable dict."""
+        return {"error": str(self), **self.extra}
+
+
+def _chunks_dir():
+    directory = chedito_settings.chunked_upload_dir
+    if not directory:
+        directory = os.path.join(settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), "chedito_chunks")
+    return directory
+
+
+def _write_file(path, data):
+    """Write a file atomically, by replacing it with a complete temporary copy."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ChunkedUpload:
+    """
+    A resumable upload session.
+
+    Chunks must be sent in order: each one starts at the current ``offset``.
+    A chunk that arrives out of order is refused with the offset to resume
+    from, so a client can recover after a dropped connection.
+    """
+
+    session_filename = "session.json"
+    lock_filename = "session.lock"
+
+    def __init__(self, upload_id, data):
+        self.upload_id = upload_id
+        self.data = data
+
+    @property
+    def directory(self):
+        """Local directory holding the session and its chunks."""
+        return os.path.join(_chunks_dir(), self.upload_id)
+
+    @property
+    def offset(self):
+        """Number of bytes received so far."""
+        return self.data["offset"]
+
+    @property
+    def size(self):
+        """Total size of the file, as declared when the session was created."""
+        return self.data["size"]
+
+    @property
+    def filename(self):
+        """Original filename."""
+        return self.data["filename"]
+
+    @property
+    def is_expired(self):
+        """Whether the session has not been used within chunked_upload_expiry."""
+        return time.time() > self.data["expires"]
+
+    @classmethod
+    def create(cls, filename, size, upload_type, allowed_types, max_size,
+               content_type=None, user_id=None):
+        """
+        Start a new upload session.
+
+        Args:
+            filename: Original filename.
+            size: Total file size in bytes.
+            upload_type: Type of upload ("image", "video", "file").
+            allowed_types: List of allowed MIME types.
+            max_size: Maximum file size in bytes.
+            content_type: Content type declared by the client.
+            user_id: Primary key of the uploading user, if authenticated.
+
+        Returns:
+            The new ChunkedUpload.
+
+        Raises:
+            ChunkedUploadError: If the file can't be accepted.
+        """
+        if not filename:
+            raise ChunkedUploadError("No filename provided.")
+        if not isinstance(size, int) or size <= 0:
+            raise ChunkedUploadError("Invalid file size.")
+
+        is_valid, error = validate_file_size(_DeclaredFile(size), max_size)
+        if not is_valid:
+            raise ChunkedUploadError(error)
+
+        guessed_type, _ = mimetypes.guess_type(filename)
+        if guessed_type and guessed_type not in allowed_types:
+            raise ChunkedUploadError(
+                f"File type '{guessed_type}' is not allowed. Allowed types: {', '.join(allowed_types)}"
+            )
+
+        now = time.time()
+        upload = cls(uuid.uuid4().hex, {
+            "filename": filename,
+            "size": size,
+            "content_type": content_type or guessed_type or "application/octet-stream",
+            "upload_type": upload_type,
+            "allowed_types": list(allowed_types),
+            "chunk_size": chedito_settings.chunked_upload_chunk_size,
+            "user_id": user_id,
+            "offset": 0,
+            "parts": [],
+            "created": now,
+            "expires": now + chedito_settings.chunked_upload_expiry,
+        })
+        os.makedirs(upload.directory, mode=0o700)
+        upload._save_session()
+        return upload
+
+    @classmethod
+    def get(cls, upload_id, user_id=None):
+        """
+        Load an upload session.
+
+        Raises:
+            ChunkedUploadError: If the session doesn't exist, has expired or
+                belongs to another user.
+        """
+        try:
+            upload_id = uuid.UUID(hex=upload_id).hex
+        except ValueError:
+            raise ChunkedUploadError("Upload not found.", status=404) from None
+
+        upload = cls(upload_id, None)
+        upload._load()
+        if upload.data["user_id"] != user_id:
+            raise ChunkedUploadError("Upload not found.", status=404)
+        if upload.is_expired:
+            upload.delete()
+            raise ChunkedUploadError("Upload has expired.", status=404)
+        return upload
+
+    def describe(self):
+        """Return the public state of the session as a JSON-serializable dict."""
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "offset": self.offset,
+            "chunk_size": self.data["chunk_size"],
+            "expires": int(self.data["expires"]),
+        }
+
+    def write_chunk(self, offset, data, checksum=None):
+        """
+        Store the next chunk of the file.
+
+        Args:
+            offset: Byte offset of the chunk within the file.
+            data: Chunk content (bytes).
+            checksum: Optional hex SHA-256 digest of the chunk.
+
+        Returns:
+            The new offset.
+
+        Raises:
+            ChunkedUploadError: If the chunk is out of order, too large,
+                corrupted or of a disallowed type.
+        """
+        with self._lock():
+            # Another request may have stored chunks since the session was loaded
+            self._load()
+            return self._write_chunk(offset, data, checksum)
+
+    def _write_chunk(self, offset, data, checksum):
+        if offset != self.offset:
+            raise ChunkedUploadError("Unexpected chunk offset.", status=409, offset=self.offset)
+        if not data:
+            raise ChunkedUploadError("Empty chunk.")
+        if len(data) > self.data["chunk_size"]:
+            raise ChunkedUploadError("Chunk is larger than the chunk size.", status=413)
+        if offset + len(data) > self.size:
+            raise ChunkedUploadError("Chunk extends past the declared file size.")
+        if checksum is not None and hashlib.sha256(data).hexdigest() != checksum.lower():
+            raise ChunkedUploadError("Chunk checksum mismatch.", offset=self.offset)
+
+        if offset == 0:
+            is_valid, error = check_signature(data, self.data["allowed_types"])
+            if not is_valid:
+                self._remove()
+                raise ChunkedUploadError(error)
+
+        part = f"{offset:012d}.part"
+        _write_file(self._path(part), data)
+
+        self.data["parts"].append(part)
+        self.data["offset"] = offset + len(data)
+        self.data["expires"] = time.time() + chedito_settings.chunked_upload_expiry
+        self._save_session()
+        return self.offset
+
+    def open(self):
+        """Return a file-like object reading the received chunks in order."""
+        return _PartsReader([self._path(part) for part in self.data["parts"]])
+
+    def complete(self, storage=None):
+        """
+        Assemble the file, save it to storage and end the session.
+
+        Args:
+            storage: Chedito storage backend (the configured one by default).
+
+        Returns:
+            URL where the file can be accessed.
+
+        Raises:
+            ChunkedUploadError: If the upload is incomplete or not allowed.
+        """
+        with self._lock():
+            self._load()
+            return self._complete(storage)
+
+    def _complete(self, storage):
+        if self.offset != self.size:
+            raise ChunkedUploadError("Upload is incomplete.", status=409, offset=self.offset)
+
+        with self.open() as reader:
+            header = reader.read(SNIFF_SIZE)
+        declared = UploadedFile(
+            io.BytesIO(header), self.filename, self.data["content_type"], self.size
+        )
+        is_valid, error = validate_file_type(declared, self.data["allowed_types"])
+        if not is_valid:
+            self._remove()
+            raise ChunkedUploadError(error)
+
+        if storage is None:
+            storage = chedito_settings.get_storage()
+
+        content = File(self.open(), name=self.filename)
+        content.size = self.size
+        try:
+            url = storage.save(content, self.filename, self.data["upload_type"])
+        finally:
+            content.close()
+
+        self._remove()
+        return url
+
+    def delete(self):
+        """Remove the session and its chunks."""
+        try:
+            with self._lock():
+                self._remove()
+        except ChunkedUploadError:
+            pass  # Already removed
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _lock(self):
+        """Hold the session's lock, serializing requests across processes."""
+        try:
+            lock_file = open(self._path(self.lock_filename), "ab")
+        except OSError:
+            raise ChunkedUploadError("Upload not found.", status=404) from None
+        with lock_file:
+            if fcntl is None:
+                with _process_lock:
+                    yield
+            else:
+                # Released when the file is closed
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _load(self):
+        try:
+            with open(self._path(self.session_filename), "rb") as f:
+                self.data = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            raise ChunkedUploadError("Upload not found.", status=404) from None
+
+    def _save_session(self):
+        _write_file(self._path(self.session_filename), json.dumps(self.data).encode("utf-8"))
+
+    def _remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class _DeclaredFile:
+    """Stand-in for validate_file_size before any content has arrived."""
+
+    def __init__(self, size):
+        self.size = size
+
+
+class _PartsReader(io.RawIOBase):
+    """Read stored chunks one after another."""
+
+    def __init__(self, parts):
+        self._parts = iter(parts)
+        self._current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self._current is None:
+                part = next(self._parts, None)
+                if part is None:
+                    return 0
+                self._current = open(part, "rb")
+            data = self._current.read(len(buffer))
+            if data:
+                buffer[:len(data)] = data
+                return len(data)
+            self._current.close()
+            self._current = None
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+        super().close()
+
+
+def purge_expired_uploads():
+    """
+    Delete chunked upload sessions that have expired.
+
+    Returns:
+        Number of sessions deleted.
+    """
+    try:
+        upload_ids = os.listdir(_chunks_dir())
+    except OSError:
+        return 0
+
+    purged = 0
+    expiry = chedito_settings.chunked_upload_expiry
+    for upload_id in upload_ids:
+        upload = ChunkedUpload(upload_id, None)
+        try:
+            with upload._lock():
+                try:
+                    upload._load()
+                except ChunkedUploadError:
+                    # Session file is gone; remove the directory once it is stale
+                    if os.path.getmtime(upload.directory) + expiry > time.time():
+                        continue
+                else:
+                    if not upload.is_expired:
+                        continue
+                upload._remove()
+        except (ChunkedUploadError, OSError):
+            continue
+        purged += 1
+    return purged
@@ -4,7 +4,14 @@ Chedito configuration management.
 Provides a centralized way to access chedito settings with defaults.
 """
 
+import json
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
 from django.utils.module_loading import import_string
 
 
@@ -43,6 +50,30 @@ DEFAULTS = {
     "max_video_size": 50 * 1024 * 1024,  # 50MB
     "max_file_size": 10 * 1024 * 1024,  # 10MB
 
+    # Chunked uploads
+    "chunked_upload_chunk_size": 1024 * 1024,  # 1MB, below DATA_UPLOAD_MAX_MEMORY_SIZE
+    "chunked_upload_expiry": 24 * 60 * 60,  # Seconds an unused session is kept
+    "chunked_upload_dir": None,  # Private directory for chunks (default: <temp dir>/chedito_chunks)
+
+    # Batch uploads
+    "batch_upload_max_files": 20,
+    "batch_upload_workers": 4,  # Threads saving the files of one batch
+
+    # Image derivatives (requires Pillow)
+    "image_derivatives": False,
+    "image_derivative_widths": [320, 640, 1280],
+    "image_derivative_format": "webp",  # Pillow format: "webp", "jpeg", "png" or "avif"
+    "image_derivative_quality": 80,
+    "image_derivatives_on_upload": True,  # Otherwise made on first request
+    "image_sizes": None,  # "sizes" attribute added with srcset
+
+    # Post-upload tasks
+    "upload_tasks": [],  # Dotted paths of task(storage, url, upload_type) callables
+    "upload_task_backend": "chedito.tasks.ThreadPoolTaskBackend",
+    "upload_task_workers": 2,
+    "upload_task_cache_alias": "default",  # Django cache holding job status
+    "upload_task_status_timeout": 60 * 60,  # Seconds job status is kept
+
     # Security
     "require_authentication": False,
     "staff_only_uploads": False,
@@ -73,6 +104,11 @@ DEFAULTS = {
         "text-align", "text-decoration", "font-weight", "font-style",
     ],
 
+    # Sanitized output cache (used by render_rich_text and |richtext)
+    "sanitize_cache_size": 0,  # In-process LRU entries, 0 disables
+    "sanitize_cache_alias": None,  # Django cache alias, None disables
+    "sanitize_cache_timeout": 3600,  # Seconds, for the Django cache tier
+
     # Quill configuration
     "quill_theme": "snow",  # "snow" or "bubble"
     "quill_config": {
@@ -101,18 +137,106 @@ DEFAULTS = {
     "widget_height": "300px",
     "widget_min_height": "150px",
     "widget_max_height": None,
+    # Create editors only when they scroll into view or gain focus
+    "lazy_init": False,
+
+    # Asset tags
+    "asset_preload": False,  # chedito_css adds preload hints for the scripts
+    "asset_defer": False,  # chedito_js scripts are deferred
+    "asset_integrity": False,  # Subresource integrity attributes
 }
 
 
+# Settings holding lists of names
+_SEQUENCE_SETTINGS = (
+    "allowed_image_types",
+    "allowed_video_types",
+    "allowed_file_types",
+    "image_derivative_widths",
+    "upload_tasks",
+    "allowed_tags",
+    "allowed_styles",
+)
+
+
+class SettingsSnapshot:
+    """
+    Read-only, validated view of the chedito settings.
+
+    Every setting is resolved against DEFAULTS once, when the snapshot is
+    built, and stored in a slot. List settings and ``allowed_attributes``
+    are stored as copies of the configured lists and dict, so they keep
+    their types. Keys of CHEDITO_CONFIG that are not chedito settings are
+    kept in ``extra``.
+    """
+
+    __slots__ = (*DEFAULTS, "extra")
+
+    def __init__(self, user_settings):
+        """
+        Build a snapshot.
+
+        Args:
+            user_settings: The CHEDITO_CONFIG mapping.
+
+        Raises:
+            ImproperlyConfigured: If CHEDITO_CONFIG or one of its list
+                settings has the wrong type.
+        """
+        if not isinstance(user_settings, Mapping):
+            raise ImproperlyConfigured("CHEDITO_CONFIG must be a dict.")
+
+        for name, default in DEFAULTS.items():
+            object.__setattr__(self, name, _validate(name, user_settings.get(name, default)))
+        object.__setattr__(self, "extra", MappingProxyType({
+            name: value for name, value in user_settings.items() if name not in DEFAULTS
+        }))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Chedito settings snapshots are read-only.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Chedito settings snapshots are read-only.")
+
+    def as_dict(self):
+        """Return every setting, including extra ones, as a dict."""
+        values = dict(self.extra)
+        values.update((name, getattr(self, name)) for name in DEFAULTS)
+        return values
+
+
+def _validate(name, value):
+    """Validate a setting and copy it into its snapshot form."""
+    if name in _SEQUENCE_SETTINGS:
+        if isinstance(value, str) or not isinstance(value, (list, tuple, set, frozenset)):
+            raise ImproperlyConfigured(f"CHEDITO_CONFIG['{name}'] must be a list.")
+        return list(value)
+    if name == "allowed_attributes":
+        if not isinstance(value, Mapping):
+            raise ImproperlyConfigured(f"CHEDITO_CONFIG['{name}'] must be a dict.")
+        return {tag: list(attrs) for tag, attrs in value.items()}
+    return value
+
+
 class CheditoSettings:
     """
     Settings object for Chedito.
 
     Allows attribute-style access to settings with fallback to defaults.
+    Settings are resolved into a SettingsSnapshot on first access, and its
+    values are kept as plain attributes of this object until reload(), so
+    reading a setting is an ordinary attribute lookup. Only the settings in
+    DEFAULTS become attributes; extra CHEDITO_CONFIG keys are looked up in
+    the snapshot, so they can't shadow methods such as get() or reload().
     """
 
     def __init__(self):
         self._cached_settings = None
+        self._snapshot = None
+        self._storage = None
+        self._storage_lock = threading.Lock()
+        self._task_backend = None
+        self._quill_config_json = {}
 
     @property
     def user_settings(self):
@@ -121,16 +245,26 @@ class CheditoSettings:
             self._cached_settings = getattr(settings, "CHEDITO_CONFIG", {})
         return self._cached_settings
 
+    @property
+    def snapshot(self):
+        """The SettingsSnapshot of the current settings."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = SettingsSnapshot(self.user_settings)
+            self.__dict__.update((name, getattr(snapshot, name)) for name in DEFAULTS)
+            self._snapshot = snapshot
+        return snapshot
+
     def __getattr__(self, name):
-        """Get a setting value, falling back to default."""
+        """Get a setting value the first time, or after settings are reloaded."""
         if name.startswith("_"):
             raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
-        if name in self.user_settings:
-            return self.user_settings[name]
-
+        snapshot = self.snapshot
         if name in DEFAULTS:
-            return DEFAULTS[name]
+            return getattr(snapshot, name)
+        if name in snapshot.extra:
+            return snapshot.extra[name]
 
         raise AttributeError(f"Invalid chedito setting: '{name}'")
 
@@ -146,9 +280,49 @@ class CheditoSettings:
         return import_string(self.storage_backend)
 
     def get_storage(self):
-        """Get an instance of the configured storage backend."""
-        storage_class = self.get_storage_class()
-        return storage_class()
+        """
+        Get the shared instance of the configured storage backend.
+
+        The backend is constructed once per process and reused until
+        settings are reloaded.
+        """
+        storage = self._storage
+        if storage is None:
+            with self._storage_lock:
+                if self._storage is None:
+                    self._storage = self.get_storage_class()()
+                storage = self._storage
+        return storage
+
+    def reset_storage(self):
+        """Discard the shared storage instance, calling its close() hook."""
+        with self._storage_lock:
+            storage, self._storage = self._storage, None
+        close = getattr(storage, "close", None)
+        if close is not None:
+            close()
+
+    def get_task_backend(self):
+        """
+        Get the shared instance of the configured post-upload task backend.
+
+        Like the storage backend, it is constructed once per process and
+        reused until settings are reloaded.
+        """
+        backend = self._task_backend
+        if backend is None:
+            with self._storage_lock:
+                if self._task_backend is None:
+                    self._task_backend = import_string(self.upload_task_backend)()
+                backend = self._task_backend
+        return backend
+
+    def reset_task_backend(self):
+        """Discard the shared task backend instance, calling its close() hook."""
+        with self._storage_lock:
+            backend, self._task_backend = self._task_backend, None
+        if backend is not None:
+            backend.close()
 
     def get_quill_config(self, extra_config=None):
         """
@@ -170,6 +344,35 @@ class CheditoSettings:
 
         return config
 
+    def get_quill_config_json(self, extra_config=None):
+        """
+        Get the Quill configuration serialized as JSON.
+
+        The result is memoized per distinct extra_config (compared by
+        content) until settings are reloaded, so rendering many editors
+        with the same configuration merges and serializes it once.
+
+        Args:
+            extra_config: Additional configuration to merge.
+
+        Returns:
+            JSON string of the complete Quill configuration.
+        """
+        try:
+            key = json.dumps(extra_config, sort_keys=True) if extra_config else ""
+        except (TypeError, ValueError):
+            # Not comparable by content; serialize without memoizing
+            return json.dumps(self.get_quill_config(extra_config))
+
+        config_json = self._quill_config_json.get(key)
+        if config_json is None:
+            config_json = json.dumps(self.get_quill_config(extra_config))
+            # Bound the memo in case configurations are built per request
+            if len(self._quill_config_json) >= QUILL_CONFIG_CACHE_SIZE:
+                self._quill_config_json.clear()
+            self._quill_config_json[key] = config_json
+        return config_json
+
     def _deep_merge(self, base, override):
         """Deep merge two dictionaries."""
         result = base.copy()
@@ -182,8 +385,40 @@ class CheditoSettings:
 
     def reload(self):
         """Clear cached settings, forcing a reload on next access."""
+        from chedito.assets import reset_asset_cache
+        from chedito.cache import reset_sanitize_cache
+        from chedito.sanitizer import clear_policies
+
+        for name in DEFAULTS:
+            self.__dict__.pop(name, None)
+        self._snapshot = None
         self._cached_settings = None
+        self._quill_config_json = {}
+        clear_policies()
+        reset_sanitize_cache()
+        reset_asset_cache()
+        self.reset_storage()
+        self.reset_task_backend()
+
+
+# Number of distinct Quill configurations kept serialized
+QUILL_CONFIG_CACHE_SIZE = 128
 
 
 # Global settings instance
 chedito_settings = CheditoSettings()
+
+
+def reload_chedito_settings(*, setting, **kwargs):
+    """Reload settings when they are changed, e.g. by override_settings in tests."""
+    if setting == "CHEDITO_CONFIG":
+        chedito_settings.reload()
+    elif setting in ("MEDIA_ROOT", "MEDIA_URL", "STORAGES"):
+        chedito_settings.reset_storage()
+    if setting in ("STATIC_URL", "STORAGES"):
+        from chedito.assets import reset_asset_cache
+
+        reset_asset_cache()
+
+
+setting_changed.connect(reload_chedito_settings)
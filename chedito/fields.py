@@ -4,12 +4,86 @@ Chedito model fields.
 Provides RichTextField for use in Django models.
 """
 
+import hashlib
+
+from django.core import checks
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+from django.utils.crypto import salted_hmac
 
 from chedito.forms import RichTextFormField
 from chedito.widgets import RichTextWidget
 
 
+class RichTextValue(str):
+    """
+    A RichTextField value carrying its stored plain-text companions.
+
+    Returned by RichTextDescriptor for saved instances, so that template
+    filters such as ``strip_tags`` and ``truncate_richtext`` can use the
+    precomputed text instead of parsing the HTML.
+    """
+
+    def __new__(cls, value, plain_text=None, excerpt=None, excerpt_length=None):
+        instance = super().__new__(cls, value)
+        instance.plain_text = plain_text
+        instance.excerpt = excerpt
+        instance.excerpt_length = excerpt_length
+        return instance
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+    def get_excerpt(self, length):
+        """
+        Return stored plain text that covers the first ``length`` characters.
+
+        Returns the excerpt when it is long enough to tell whether the text
+        exceeds ``length``, else the full plain text, else None.
+        """
+        if self.excerpt is not None and (
+            length < self.excerpt_length or len(self.excerpt) < self.excerpt_length
+        ):
+            return self.excerpt
+        return self.plain_text
+
+
+class RichTextDescriptor(DeferredAttribute):
+    """
+    Attribute descriptor for RichTextFields with plain-text companions.
+
+    Wraps loaded values in RichTextValue when the digest stored with the
+    companions matches the loaded HTML, so text left stale by reassignment,
+    save(update_fields=...) or QuerySet.update() is never used.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        value = super().__get__(instance, cls)
+        if type(value) is not str or instance._state.adding:
+            return value
+
+        field = self.field
+        data = instance.__dict__
+        digest = data.get(field.digest_field) if field.digest_field else None
+        if not digest or digest != field.get_digest(value):
+            return value
+
+        plain_text = data.get(field.text_field) if field.text_field else None
+        excerpt = data.get(field.excerpt_field) if field.excerpt_field else None
+        if plain_text is None and excerpt is None:
+            return value
+
+        return RichTextValue(value, plain_text, excerpt, field.excerpt_length)
+
+    def __set__(self, instance, value):
+        # Defining __set__ makes this a data descriptor, so __get__ still runs
+        # once the value is in the instance __dict__.
+        instance.__dict__[self.field.attname] = value
+
+
 class RichTextField(models.TextField):
     """
     A TextField that renders as a rich text editor in forms.
@@ -26,19 +100,73 @@ class RichTextField(models.TextField):
                     }
                 }
             )
+
+            # Sanitize once on save into a companion column:
+            content = RichTextField(
+                sanitized_field='content_html',
+                policy_field='content_policy',
+            )
+            content_html = models.TextField(blank=True, editable=False)
+            content_policy = models.CharField(max_length=16, blank=True, editable=False)
+
+            # Keep plain-text companions for strip_tags / truncate_richtext:
+            content = RichTextField(
+                text_field='content_text',
+                excerpt_field='content_excerpt',
+                digest_field='content_digest',
+            )
+            content_text = models.TextField(blank=True, editable=False)
+            content_excerpt = models.CharField(max_length=300, blank=True, editable=False)
+            content_digest = models.CharField(max_length=16, blank=True, editable=False)
     """
 
-    def __init__(self, *args, quill_config=None, widget_attrs=None, **kwargs):
+    def __init__(
+        self,
+        *args,
+        quill_config=None,
+        widget_attrs=None,
+        sanitize_on_save=False,
+        sanitized_field=None,
+        policy_field=None,
+        text_field=None,
+        excerpt_field=None,
+        excerpt_length=300,
+        digest_field=None,
+        **kwargs
+    ):
         """
         Initialize RichTextField.
 
         Args:
             quill_config: Custom Quill.js configuration to override defaults.
             widget_attrs: Additional HTML attributes for the widget.
+            sanitize_on_save: Sanitize the value in place before saving.
+            sanitized_field: Name of a model field that receives the sanitized
+                value on save (implies sanitize_on_save, leaves the raw value as is).
+            policy_field: Name of a model field (16 characters) that stores a
+                seal of the policy, raw value and sanitized value on save, so
+                stored values are only trusted while all three are unchanged.
+            text_field: Name of a model field that receives the plain text on save.
+            excerpt_field: Name of a model field that receives the first
+                ``excerpt_length`` characters of the plain text on save.
+            excerpt_length: Length of the stored excerpt.
+            digest_field: Name of a model field (16 characters) that stores a
+                digest of the HTML the companions were computed from, so they
+                are only used while it matches the loaded value. Required with
+                text_field or excerpt_field.
             *args, **kwargs: Standard TextField arguments.
         """
         self.quill_config = quill_config or {}
         self.widget_attrs = widget_attrs or {}
+        self.sanitize_on_save = sanitize_on_save or bool(sanitized_field)
+        self.sanitized_field = sanitized_field
+        self.policy_field = policy_field
+        self.text_field = text_field
+        self.excerpt_field = excerpt_field
+        self.excerpt_length = excerpt_length
+        self.digest_field = digest_field
+        if text_field or excerpt_field:
+            self.descriptor_class = RichTextDescriptor
         super().__init__(*args, **kwargs)
 
     def deconstruct(self):
@@ -48,8 +176,138 @@ class RichTextField(models.TextField):
             kwargs["quill_config"] = self.quill_config
         if self.widget_attrs:
             kwargs["widget_attrs"] = self.widget_attrs
+        if self.sanitized_field:
+            kwargs["sanitized_field"] = self.sanitized_field
+        elif self.sanitize_on_save:
+            kwargs["sanitize_on_save"] = True
+        if self.policy_field:
+            kwargs["policy_field"] = self.policy_field
+        if self.text_field:
+            kwargs["text_field"] = self.text_field
+        if self.excerpt_field:
+            kwargs["excerpt_field"] = self.excerpt_field
+            if self.excerpt_length != 300:
+                kwargs["excerpt_length"] = self.excerpt_length
+        if self.digest_field:
+            kwargs["digest_field"] = self.digest_field
         return name, path, args, kwargs
 
+    def check(self, **kwargs):
+        """Check that plain-text companions are declared with a digest_field."""
+        errors = super().check(**kwargs)
+        if (self.text_field or self.excerpt_field) and not self.digest_field:
+            errors.append(
+                checks.Error(
+                    "RichTextField text_field and excerpt_field require a digest_field.",
+                    hint="Add a CharField(max_length=16) and pass its name as digest_field.",
+                    obj=self,
+                    id="chedito.E001",
+                )
+            )
+        return errors
+
+    def get_prep_value(self, value):
+        """Store SanitizedHTML values as plain strings."""
+        value = super().get_prep_value(value)
+        if value is not None and type(value) is not str:
+            value = str(value)
+        return value
+
+    def pre_save(self, model_instance, add):
+        """Sanitize the value and update plain-text companions before saving."""
+        value = super().pre_save(model_instance, add)
+
+        if self.sanitize_on_save:
+            from chedito.sanitizer import get_policy
+            from chedito.utils import sanitize_html
+
+            policy = get_policy()
+            sanitized = sanitize_html(value, policy=policy) if value else ""
+            if self.sanitized_field:
+                setattr(model_instance, self.sanitized_field, sanitized)
+            else:
+                value = sanitized
+                setattr(model_instance, self.attname, value)
+            if self.policy_field:
+                setattr(model_instance, self.policy_field, self.get_seal(policy, value, sanitized))
+
+        if self.text_field or self.excerpt_field:
+            from chedito.utils import html_to_text
+
+            plain_text = html_to_text(value)
+            if self.text_field:
+                setattr(model_instance, self.text_field, plain_text)
+            if self.excerpt_field:
+                setattr(model_instance, self.excerpt_field, plain_text[:self.excerpt_length])
+            if self.digest_field:
+                setattr(model_instance, self.digest_field, self.get_digest(value))
+
+        return value
+
+    def get_digest(self, value):
+        """
+        Compute the value stored in digest_field on save.
+
+        Returns:
+            16-character hex string of the HTML the companions were computed from.
+        """
+        return hashlib.blake2b(str(value or "").encode("utf-8"), digest_size=8).hexdigest()
+
+    def get_seal(self, policy, value, sanitized):
+        """
+        Compute the value stored in policy_field on save.
+
+        The seal is keyed with SECRET_KEY and covers the policy fingerprint,
+        the raw value and the sanitized value, so it stops matching when the
+        policy changes or either column is changed outside of save(), for
+        example by QuerySet.update() or by reassigning the field.
+
+        Returns:
+            16-character hex string.
+        """
+        message = "\0".join((policy.fingerprint, str(value or ""), str(sanitized or "")))
+        return salted_hmac("chedito.fields.RichTextField", message).hexdigest()[:16]
+
+    def get_sanitized_value(self, model_instance):
+        """
+        Return the sanitized value for a model instance.
+
+        Values stored by sanitize-on-save are returned without sanitizing them
+        again only when the seal in policy_field matches the current policy
+        and column values. Anything else is re-sanitized and updated on the
+        instance, and persisted on the next save. Without a policy_field the
+        stored value can't be verified and is sanitized on every call.
+        """
+        from chedito.sanitizer import get_policy, is_sanitized, mark_sanitized
+        from chedito.utils import sanitize_html
+
+        value = getattr(model_instance, self.attname)
+        if not value:
+            return ""
+
+        policy = get_policy()
+        if not (self.sanitize_on_save and self.policy_field):
+            return sanitize_html(value, policy=policy)
+
+        if is_sanitized(value, policy):
+            return value
+
+        target = self.sanitized_field or self.attname
+        stored = getattr(model_instance, target)
+        if stored and getattr(model_instance, self.policy_field) == self.get_seal(
+            policy, value, stored
+        ):
+            return mark_sanitized(stored, policy)
+
+        sanitized = sanitize_html(value, policy=policy)
+        setattr(model_instance, target, sanitized)
+        setattr(
+            model_instance,
+            self.policy_field,
+            self.get_seal(policy, getattr(model_instance, self.attname), sanitized),
+        )
+        return sanitized
+
     def formfield(self, **kwargs):
         """Return the form field for this model field."""
         widget = RichTextWidget(
@@ -73,8 +331,6 @@ class RichTextField(models.TextField):
 
         # Add a method to get sanitized content
         def get_sanitized_content(model_instance):
-            from chedito.utils import sanitize_html
-            value = getattr(model_instance, name)
-            return sanitize_html(value) if value else ""
+            return self.get_sanitized_value(model_instance)
 
         setattr(cls, f"get_{name}_sanitized", get_sanitized_content)
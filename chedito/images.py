@@ -0,0 +1,225 @@
+"""
+Chedito image derivatives.
+
+Resized, recompressed copies of uploaded images at a few fixed widths, and
+the ``srcset`` rewriting that lets browsers pick the smallest one that
+fits. Generating derivatives requires Pillow.
+"""
+
+import html
+import io
+import posixpath
+import re
+
+from django.urls import NoReverseMatch, reverse
+
+from chedito.conf import chedito_settings
+
+# Pillow format names and the file extensions used for them
+FORMAT_EXTENSIONS = {
+    "webp": "webp",
+    "jpeg": "jpg",
+    "png": "png",
+    "avif": "avif",
+}
+
+# Originals that can be resized (animated GIFs and SVGs are served as is)
+DERIVABLE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+_IMG_TAG_RE = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+_SRC_RE = re.compile(r"""\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+_SRCSET_RE = re.compile(r"\ssrcset\s*=", re.IGNORECASE)
+
+
+def get_widths():
+    """Get the configured derivative widths, smallest first."""
+    return sorted(int(width) for width in chedito_settings.image_derivative_widths)
+
+
+def derivative_name(name, width):
+    """
+    Get the storage name of a derivative.
+
+    Args:
+        name: Storage name of the original image.
+        width: Width of the derivative in pixels.
+
+    Returns:
+        Name of the derivative, next to the original.
+    """
+    stem, _ = posixpath.splitext(name)
+    extension = FORMAT_EXTENSIONS[chedito_settings.image_derivative_format.lower()]
+    return f"{stem}.w{width}.{extension}"
+
+
+def is_derivable(name):
+    """
+    Whether derivatives can be made of a stored file.
+
+    Only images stored by chedito qualify, and never derivatives themselves.
+    """
+    if not name or posixpath.normpath(name) != name or name.startswith("/"):
+        return False
+    images_path = f"{chedito_settings.upload_path.rstrip('/')}/images/"
+    if not name.startswith(images_path):
+        return False
+    stem, extension = posixpath.splitext(posixpath.basename(name))
+    return extension.lower() in DERIVABLE_EXTENSIONS and "." not in stem
+
+
+def resize_image(file, width):
+    """
+    Make a resized, recompressed copy of an image.
+
+    Args:
+        file: Binary file object with the original image.
+        width: Width of the copy in pixels; the aspect ratio is kept.
+
+    Returns:
+        The encoded copy (bytes), or None if the image is not wider than width.
+
+    Raises:
+        ImportError: If Pillow is not installed.
+    """
+    from PIL import Image, ImageOps
+
+    image_format = chedito_settings.image_derivative_format.upper()
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width <= width:
+            return None
+
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        image.save(
+            output, image_format, quality=chedito_settings.image_derivative_quality, optimize=True
+        )
+    return output.getvalue()
+
+
+def generate_derivative(storage, name, width):
+    """
+    Create one derivative of a stored image, unless it already exists.
+
+    Args:
+        storage: Chedito storage backend holding the original.
+        name: Storage name of the original image.
+        width: Width of the derivative in pixels.
+
+    Returns:
+        Storage name of the derivative, or None if the original is not wider
+        than width.
+    """
+    target = derivative_name(name, width)
+    if storage.exists(target):
+        return target
+
+    with storage.open(name) as original:
+        data = resize_image(original, width)
+    if data is None:
+        return None
+
+    storage.save_as(data, target)
+    return target
+
+
+def generate_derivatives(storage, url):
+    """
+    Create every configured derivative of an uploaded image.
+
+    Args:
+        storage: Chedito storage backend the image was saved to.
+        url: URL returned by storage.save().
+
+    Returns:
+        Dict mapping width to derivative name, for the widths the image
+        was wide enough for.
+    """
+    name = storage.name_from_url(url)
+    if not is_derivable(name):
+        return {}
+
+    derivatives = {}
+    # Stop at the first width the image is too narrow for
+    for width in get_widths():
+        target = generate_derivative(storage, name, width)
+        if target is None:
+            break
+        derivatives[width] = target
+    return derivatives
+
+
+def get_srcset(url, storage=None):
+    """
+    Build the srcset for an image.
+
+    Each width points at the derivative view, which redirects to the
+    derivative (generating it on first use) or to the original when the
+    image is narrower than that width.
+
+    Args:
+        url: URL of the original image.
+        storage: Chedito storage backend (the configured one by default).
+
+    Returns:
+        The srcset value, or None if the image has no derivatives.
+    """
+    if storage is None:
+        storage = chedito_settings.get_storage()
+    name = storage.name_from_url(url)
+    if not is_derivable(name):
+        return None
+
+    try:
+        candidates = [
+            f"{reverse('chedito:image_derivative', args=[width, name])} {width}w"
+            for width in get_widths()
+        ]
+    except NoReverseMatch:
+        return None
+    return ", ".join(candidates) or None
+
+
+def add_srcset(html_content):
+    """
+    Add srcset (and sizes) to the chedito-uploaded images in HTML.
+
+    Images that already have a srcset, or that weren't uploaded through
+    chedito, are left unchanged.
+
+    Args:
+        html_content: Rendered (sanitized) HTML.
+
+    Returns:
+        HTML with srcset attributes added.
+    """
+    if "<img" not in html_content and "<IMG" not in html_content:
+        return html_content
+
+    storage = chedito_settings.get_storage()
+    sizes = chedito_settings.image_sizes
+
+    def rewrite(match):
+        tag = match.group(0)
+        if _SRCSET_RE.search(tag):
+            return tag
+        src = _SRC_RE.search(tag)
+        if src is None:
+            return tag
+
+        url = html.unescape(next(value for value in src.groups() if value is not None))
+        srcset = get_srcset(url, storage)
+        if srcset is None:
+            return tag
+
+        attributes = f' srcset="{html.escape(srcset)}"'
+        if sizes:
+            attributes += f' sizes="{html.escape(sizes)}"'
+        end = len(tag) - (2 if tag.endswith("/>") else 1)
+        return tag[:end].rstrip() + attributes + tag[end:]
+
+    return _IMG_TAG_RE.sub(rewrite, html_content)
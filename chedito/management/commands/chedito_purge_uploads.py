@@ -0,0 +1,18 @@
+"""
+Delete abandoned chunked upload sessions.
+
+Usage:
+    python manage.py chedito_purge_uploads
+"""
+
+from django.core.management.base import BaseCommand
+
+from chedito.chunked import purge_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked upload sessions that expired without being completed."
+
+    def handle(self, **options):
+        purged = purge_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {purged} expired upload session(s)."))
@@ -0,0 +1,269 @@
+"""
+Re-sanitize stored RichTextField values with the current policy.
+
+Usage:
+    python manage.py chedito_resanitize
+    python manage.py chedito_resanitize blog blog.Comment --workers 8
+    python manage.py chedito_resanitize --dry-run
+    python manage.py chedito_resanitize --checkpoint resanitize.json
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from chedito.conf import chedito_settings
+from chedito.fields import RichTextField
+from chedito.sanitizer import SanitizationPolicy, get_backend, get_policy
+
+_worker_policy = None
+
+
+def _init_worker(allowed_tags, allowed_attributes, allowed_styles):
+    """Compile the policy once in each worker process."""
+    global _worker_policy
+    _worker_policy = SanitizationPolicy(allowed_tags, allowed_attributes, allowed_styles)
+
+
+def _sanitize_with(backend, policy, values):
+    return [backend.clean(value, policy) if value else value for value in values]
+
+
+def _sanitize_values(values):
+    """Sanitize a batch of values in a worker process."""
+    return _sanitize_with(get_backend(), _worker_policy, values)
+
+
+class Command(BaseCommand):
+    help = "Re-sanitize all RichTextField values with the current sanitization policy."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "labels", nargs="*", metavar="app_label[.ModelName]",
+            help="Restrict to these apps or models (default: all models with a RichTextField).",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Rows read and written per primary-key chunk (default: 1000).",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Sanitizer processes; 1 sanitizes in this process (default: CPU count).",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report how many rows would change without writing anything.",
+        )
+        parser.add_argument(
+            "--checkpoint", metavar="PATH",
+            help="JSON file recording progress; an existing file resumes the run.",
+        )
+
+    def handle(self, **options):
+        if not chedito_settings.sanitize_html:
+            raise CommandError("HTML sanitization is disabled (CHEDITO_CONFIG['sanitize_html']).")
+
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        self.dry_run = options["dry_run"]
+        self.policy = get_policy()
+        self.checkpoint_path = options["checkpoint"]
+        self.checkpoint = self.load_checkpoint()
+
+        targets = self.get_targets(options["labels"])
+        if not targets:
+            self.stdout.write("No models with a RichTextField found.")
+            return
+
+        workers = max(1, options["workers"])
+        executor = None
+        if workers > 1:
+            allowed_tags, allowed_attributes, allowed_styles = self.policy.key
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(allowed_tags, dict(allowed_attributes), allowed_styles),
+            )
+
+        try:
+            for model, fields in targets:
+                self.process_model(model, fields, chunk_size, executor, workers)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def get_targets(self, labels):
+        """Return ``(model, [RichTextField, ...])`` pairs to process."""
+        if labels:
+            models = []
+            for label in labels:
+                try:
+                    if "." in label:
+                        models.append(apps.get_model(label))
+                    else:
+                        models.extend(apps.get_app_config(label).get_models())
+                except LookupError as e:
+                    raise CommandError(str(e)) from e
+        else:
+            models = apps.get_models()
+
+        targets = []
+        for model in models:
+            if model._meta.proxy:
+                continue
+            fields = [
+                field for field in model._meta.concrete_fields
+                if isinstance(field, RichTextField)
+            ]
+            if fields:
+                targets.append((model, fields))
+        return targets
+
+    def process_model(self, model, fields, chunk_size, executor, workers):
+        """Re-sanitize one model in primary-key order."""
+        label = model._meta.label
+        state = self.checkpoint.get(label, {})
+        if state.get("done"):
+            self.stdout.write(f"{label}: already completed, skipping.")
+            return
+
+        targets = [field.sanitized_field or field.attname for field in fields]
+        policy_fields = [field.policy_field for field in fields if field.policy_field]
+        update_fields = list(dict.fromkeys(targets + policy_fields))
+        columns = list(dict.fromkeys([field.attname for field in fields] + update_fields))
+
+        queryset = model._default_manager.order_by("pk")
+        last_pk = state.get("last_pk")
+        processed = updated = 0
+        started = time.monotonic()
+
+        while True:
+            chunk = queryset
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            rows = list(chunk.values_list("pk", *columns)[:chunk_size].iterator())
+            if not rows:
+                break
+
+            changed = self.sanitize_rows(model, rows, columns, fields, executor, workers)
+            if changed and not self.dry_run:
+                changed = self.write_rows(model, rows, changed, columns, fields, update_fields, queryset.db)
+
+            last_pk = rows[-1][0]
+            processed += len(rows)
+            updated += len(changed)
+            self.save_checkpoint(label, last_pk, done=False)
+
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f"{label}: {processed} rows, {updated} "
+                f"{'would change' if self.dry_run else 'updated'} ({rate:.0f} rows/s)"
+            )
+
+        self.save_checkpoint(label, last_pk, done=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: done, {processed} rows, {updated} "
+            f"{'would change' if self.dry_run else 'updated'}."
+        ))
+
+    def sanitize_rows(self, model, rows, columns, fields, executor, workers):
+        """Sanitize a chunk of rows and return the model instances that changed."""
+        index = {name: position + 1 for position, name in enumerate(columns)}
+        values = [row[index[field.attname]] for row in rows for field in fields]
+
+        if executor is None:
+            cleaned = _sanitize_with(get_backend(), self.policy, values)
+        else:
+            batch = max(1, len(values) // (workers * 4))
+            batches = [values[i:i + batch] for i in range(0, len(values), batch)]
+            cleaned = [value for result in executor.map(_sanitize_values, batches)
+                       for value in result]
+
+        changed = []
+        position = 0
+        for row in rows:
+            updates = {}
+            for field in fields:
+                value = cleaned[position]
+                position += 1
+                target = field.sanitized_field or field.attname
+                if value is None and field.sanitized_field:
+                    value = ""
+                if value != row[index[target]]:
+                    updates[target] = value
+                if field.policy_field:
+                    raw = row[index[field.attname]] if field.sanitized_field else value
+                    seal = field.get_seal(self.policy, raw, value)
+                    if row[index[field.policy_field]] != seal:
+                        updates[field.policy_field] = seal
+
+            if updates:
+                # bulk_update writes every listed column, so start from the stored values
+                instance = model(pk=row[0])
+                for name in columns:
+                    setattr(instance, name, row[index[name]])
+                for name, value in updates.items():
+                    setattr(instance, name, value)
+                changed.append(instance)
+        return changed
+
+    def write_rows(self, model, rows, changed, columns, fields, update_fields, using):
+        """
+        Write changed rows without overwriting edits made since they were read.
+
+        The rows are locked and read again inside the transaction. Rows that
+        were edited meanwhile are sanitized again from their current values,
+        and rows that were deleted are dropped.
+
+        Returns:
+            The model instances that were written.
+        """
+        read = {row[0]: row for row in rows}
+        with transaction.atomic(using=using):
+            current = list(
+                model._default_manager.using(using).select_for_update()
+                .filter(pk__in=[instance.pk for instance in changed])
+                .values_list("pk", *columns)
+            )
+            edited = [row for row in current if row != read[row[0]]]
+            unedited = {row[0] for row in current} - {row[0] for row in edited}
+            changed = [instance for instance in changed if instance.pk in unedited]
+            if edited:
+                changed += self.sanitize_rows(model, edited, columns, fields, None, 1)
+            model._default_manager.using(using).bulk_update(changed, update_fields)
+        return changed
+
+    def load_checkpoint(self):
+        """Load the checkpoint file, if one was given and exists."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read checkpoint {self.checkpoint_path}: {e}") from e
+        if checkpoint.get("policy") != self.policy.fingerprint:
+            self.stdout.write("Checkpoint was written under another policy; starting over.")
+            return {}
+        return checkpoint.get("models", {})
+
+    def save_checkpoint(self, label, last_pk, done):
+        """Record progress for a model (not in dry-run mode)."""
+        if not self.checkpoint_path or self.dry_run:
+            return
+        if last_pk is not None and not isinstance(last_pk, int):
+            last_pk = str(last_pk)
+        self.checkpoint[label] = {"last_pk": last_pk, "done": done}
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"policy": self.policy.fingerprint, "models": self.checkpoint},
+                      checkpoint_file, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
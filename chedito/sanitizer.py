@@ -0,0 +1,495 @@
+"""
+Chedito sanitization policies.
+
+Compiles the allowed tag/attribute/style settings into immutable lookup
+tables once, and selects the sanitizer backend (nh3, bleach or the built-in
+HTMLSanitizer) once per process.
+"""
+
+import hashlib
+import re
+from html import unescape
+from html.parser import HTMLParser
+from types import MappingProxyType
+from urllib.parse import urlparse
+
+from chedito.conf import chedito_settings
+
+
+class SanitizationPolicy:
+    """
+    An immutable, pre-compiled set of sanitization rules.
+
+    Policies are normally obtained through ``get_policy()`` so that equal
+    configurations share a single compiled instance.
+    """
+
+    __slots__ = (
+        "allowed_tags",
+        "allowed_styles",
+        "global_attributes",
+        "tag_attributes",
+        "key",
+        "fingerprint",
+    )
+
+    def __init__(self, allowed_tags, allowed_attributes, allowed_styles):
+        """
+        Compile a policy.
+
+        Args:
+            allowed_tags: Iterable of allowed tag names.
+            allowed_attributes: Dict mapping tag names (or "*") to allowed attributes.
+            allowed_styles: Iterable of allowed CSS property names.
+        """
+        allowed_attributes = allowed_attributes or {}
+        global_attributes = frozenset(allowed_attributes.get("*", ()))
+        tag_attributes = {
+            tag: global_attributes | frozenset(attrs)
+            for tag, attrs in allowed_attributes.items()
+            if tag != "*"
+        }
+
+        self.allowed_tags = frozenset(allowed_tags)
+        self.allowed_styles = frozenset(style.lower() for style in allowed_styles)
+        self.global_attributes = global_attributes
+        self.tag_attributes = MappingProxyType(tag_attributes)
+        self.key = make_policy_key(allowed_tags, allowed_attributes, allowed_styles)
+        self.fingerprint = hashlib.sha1(repr(self.key).encode("utf-8")).hexdigest()[:16]
+
+    def attributes_for(self, tag):
+        """Return the frozenset of attributes allowed on ``tag``."""
+        return self.tag_attributes.get(tag, self.global_attributes)
+
+    def as_attribute_dict(self):
+        """Return the attribute rules as a plain ``{tag: set}`` mapping."""
+        attributes = {tag: set(attrs) for tag, attrs in self.tag_attributes.items()}
+        if self.global_attributes:
+            attributes["*"] = set(self.global_attributes)
+        return attributes
+
+    def __eq__(self, other):
+        if not isinstance(other, SanitizationPolicy):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"<SanitizationPolicy {self.fingerprint}>"
+
+
+class SanitizedHTML(str):
+    """
+    A string known to have been sanitized under a specific policy.
+
+    ``sanitize_html`` returns instances of this type, and passes them
+    through unchanged when asked to sanitize them again under the same
+    policy. It is deliberately not a SafeString: autoescaping still applies
+    unless the value is rendered through chedito's template tags.
+
+    Only instances made by mark_sanitized() from sanitizer output are
+    trusted. Constructing one directly, for example around a value read from
+    the database, does not make is_sanitized() accept it.
+    """
+
+    def __new__(cls, value, policy_fingerprint=None):
+        instance = super().__new__(cls, value)
+        instance.policy_fingerprint = policy_fingerprint
+        instance.verified = False
+        return instance
+
+    def __reduce__(self):
+        return (_restore_sanitized, (str(self), self.policy_fingerprint, self.verified))
+
+
+def _restore_sanitized(value, policy_fingerprint, verified):
+    instance = SanitizedHTML(value, policy_fingerprint)
+    instance.verified = verified
+    return instance
+
+
+def mark_sanitized(value, policy):
+    """
+    Mark output just produced by the sanitizer as sanitized under ``policy``.
+
+    Must only be called with the result of a backend's clean(), or with a
+    value verified to be one.
+    """
+    instance = SanitizedHTML(value, policy.fingerprint)
+    instance.verified = True
+    return instance
+
+
+def is_sanitized(value, policy):
+    """Return True if ``value`` was already sanitized under ``policy``."""
+    return (
+        isinstance(value, SanitizedHTML)
+        and value.verified
+        and value.policy_fingerprint == policy.fingerprint
+    )
+
+
+def make_policy_key(allowed_tags, allowed_attributes, allowed_styles):
+    """Build a hashable, order-independent key for a policy configuration."""
+    return (
+        tuple(sorted(allowed_tags)),
+        tuple(sorted(
+            (tag, tuple(sorted(attrs)))
+            for tag, attrs in (allowed_attributes or {}).items()
+        )),
+        tuple(sorted(style.lower() for style in allowed_styles)),
+    )
+
+
+# Registry of compiled policies, keyed by their configuration
+_policies = {}
+_default_policy = None
+
+
+def get_policy(allowed_tags=None, allowed_attributes=None, allowed_styles=None):
+    """
+    Get the compiled policy for a configuration.
+
+    Any argument left empty falls back to the corresponding chedito setting.
+
+    Returns:
+        A shared SanitizationPolicy instance.
+    """
+    global _default_policy
+
+    if not (allowed_tags or allowed_attributes or allowed_styles):
+        if _default_policy is None:
+            _default_policy = _lookup_policy(
+                chedito_settings.allowed_tags,
+                chedito_settings.allowed_attributes,
+                chedito_settings.allowed_styles,
+            )
+        return _default_policy
+
+    return _lookup_policy(
+        allowed_tags or chedito_settings.allowed_tags,
+        allowed_attributes or chedito_settings.allowed_attributes,
+        allowed_styles or chedito_settings.allowed_styles,
+    )
+
+
+def _lookup_policy(allowed_tags, allowed_attributes, allowed_styles):
+    """Return the registered policy for a configuration, compiling it if needed."""
+    key = make_policy_key(allowed_tags, allowed_attributes, allowed_styles)
+    policy = _policies.get(key)
+    if policy is None:
+        policy = SanitizationPolicy(allowed_tags, allowed_attributes, allowed_styles)
+        policy = _policies.setdefault(key, policy)
+    return policy
+
+
+def clear_policies():
+    """Drop all compiled policies (called when settings are reloaded)."""
+    global _default_policy
+    _policies.clear()
+    _default_policy = None
+
+
+class Nh3Backend:
+    """Sanitizer backend using nh3."""
+
+    name = "nh3"
+
+    def __init__(self):
+        import nh3
+        self._nh3 = nh3
+        self._options = {}
+
+    def _get_options(self, policy):
+        options = self._options.get(policy.key)
+        if options is None:
+            # nh3 refuses a user-managed "rel" attribute while it adds its own
+            # rel="noopener noreferrer" to links, so "rel" is dropped instead
+            attributes = {
+                tag: attrs - {"rel"} for tag, attrs in policy.as_attribute_dict().items()
+            }
+            options = {
+                "tags": set(policy.allowed_tags),
+                "attributes": attributes,
+            }
+            self._options[policy.key] = options
+        return options
+
+    def clean(self, html_content, policy):
+        return self._nh3.clean(html_content, **self._get_options(policy))
+
+
+class BleachBackend:
+    """Sanitizer backend using bleach."""
+
+    name = "bleach"
+
+    def __init__(self):
+        import bleach
+        self._bleach = bleach
+        self._options = {}
+
+    def _get_options(self, policy):
+        options = self._options.get(policy.key)
+        if options is None:
+            options = {
+                "tags": policy.allowed_tags,
+                "attributes": {
+                    tag: list(attrs) for tag, attrs in policy.as_attribute_dict().items()
+                },
+            }
+            self._options[policy.key] = options
+        return options
+
+    def clean(self, html_content, policy):
+        return self._bleach.clean(html_content, strip=True, **self._get_options(policy))
+
+
+_WS = r"[ \t\n\r\f]"
+
+# A well-formed start or end tag
+_TAG_RE = re.compile(
+    rf"""<(?:
+        (?P<start>[a-zA-Z][a-zA-Z0-9-]*)
+        (?P<attrs>(?:{_WS}+[^\s"'<>/=]+
+            (?:{_WS}*={_WS}*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*)
+        {_WS}*(?P<close>/?)>
+      |/(?P<end>[a-zA-Z][a-zA-Z0-9-]*){_WS}*>
+    )""",
+    re.VERBOSE,
+)
+
+_ATTR_RE = re.compile(
+    rf"""{_WS}+(?P<name>[^\s"'<>/=]+)
+        (?:{_WS}*={_WS}*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s"'=<>`]+)))?""",
+    re.VERBOSE,
+)
+
+_NEEDS_ESCAPE_RE = re.compile(r'[&<>"]')
+
+# Elements whose content HTMLParser does not tokenize as markup
+_RAW_TEXT_ELEMENTS = frozenset(
+    tuple(HTMLParser.CDATA_CONTENT_ELEMENTS)
+    + tuple(getattr(HTMLParser, "RCDATA_CONTENT_ELEMENTS", ()))
+    + ("plaintext", "noscript", "noembed", "noframes", "xmp", "textarea", "title")
+)
+
+_SAFE_URL_SCHEMES = ("http", "https", "mailto", "tel", "")
+
+
+def _escape_text(text):
+    if _NEEDS_ESCAPE_RE.search(text) is None:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attr(value):
+    if _NEEDS_ESCAPE_RE.search(value) is None:
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
+class _Unsupported(Exception):
+    """Raised when FastHTMLSanitizer meets markup it leaves to HTMLParser."""
+
+
+class FastHTMLSanitizer:
+    """
+    A single-pass, regex-driven equivalent of ``HTMLSanitizer``.
+
+    Handles well-formed start/end tags and text directly. Documents with
+    markup whose tokenization depends on HTMLParser internals (comments,
+    declarations, raw-text elements such as script/style, stray "<", or a
+    trailing character reference) are handed to ``HTMLSanitizer`` so the
+    output is always identical to it.
+    """
+
+    # Maximum number of distinct raw tags whose sanitized form is memoized
+    token_cache_size = 4096
+
+    def __init__(self, policy):
+        self.policy = policy
+        self._tokens = {}
+
+    def sanitize(self, html_content):
+        """Sanitize ``html_content`` and return the resulting string."""
+        try:
+            return self._sanitize(html_content)
+        except _Unsupported:
+            from chedito.utils import HTMLSanitizer
+            sanitizer = HTMLSanitizer(policy=self.policy)
+            sanitizer.feed(html_content)
+            return sanitizer.get_result()
+
+    def _sanitize(self, html_content):
+        tokens = self._tokens
+        result = []
+        append = result.append
+        tag_stack = []
+        match_tag = _TAG_RE.match
+        find = html_content.find
+        pos = 0
+        length = len(html_content)
+
+        while pos < length:
+            lt = find("<", pos)
+            if lt < 0:
+                text = html_content[pos:]
+                if "&" in text:
+                    # HTMLParser may hold back a trailing, unterminated reference
+                    raise _Unsupported
+                append(_escape_text(text))
+                break
+
+            if lt > pos:
+                text = html_content[pos:lt]
+                if "&" in text:
+                    text = unescape(text)
+                append(_escape_text(text))
+
+            match = match_tag(html_content, lt)
+            if match is None:
+                raise _Unsupported
+            pos = match.end()
+
+            raw = match.group()
+            token = tokens.get(raw)
+            if token is None:
+                token = self._compile_token(match)
+                if len(tokens) < self.token_cache_size:
+                    tokens[raw] = token
+            is_end, tag, rendered, self_closing, raw_text = token
+
+            if is_end:
+                if rendered and tag_stack and tag_stack[-1] == tag:
+                    append(rendered)
+                    tag_stack.pop()
+                continue
+
+            if raw_text and (self_closing or not html_content.startswith(f"</{tag}>", pos)):
+                raise _Unsupported
+            if rendered is not None:
+                append(rendered)
+                if self_closing:
+                    append(f"</{tag}>")
+                else:
+                    tag_stack.append(tag)
+
+        return "".join(result)
+
+    def _compile_token(self, match):
+        """
+        Sanitize a single tag match.
+
+        Returns a tuple of (is_end, tag, rendered, self_closing, raw_text),
+        where ``rendered`` is the sanitized markup, or None when the tag is
+        not allowed.
+        """
+        allowed_tags = self.policy.allowed_tags
+        end_tag = match.group("end")
+        if end_tag is not None:
+            tag = end_tag.lower()
+            rendered = f"</{tag}>" if tag in allowed_tags else None
+            return (True, tag, rendered, False, False)
+
+        tag = match.group("start").lower()
+        rendered = None
+        if tag in allowed_tags:
+            attrs = match.group("attrs")
+            attr_string = self._build_attrs(tag, attrs) if attrs else ""
+            rendered = f"<{tag}{attr_string}>"
+        return (False, tag, rendered, bool(match.group("close")), tag in _RAW_TEXT_ELEMENTS)
+
+    def _build_attrs(self, tag, attrs):
+        allowed = self.policy.attributes_for(tag)
+        parts = []
+        for match in _ATTR_RE.finditer(attrs):
+            name = match.group("name").lower()
+            if name not in allowed:
+                continue
+
+            value = match.group("dq")
+            if value is None:
+                value = match.group("sq")
+                if value is None:
+                    value = match.group("bare")
+            if value and "&" in value:
+                value = unescape(value)
+
+            if name == "style":
+                value = self._filter_styles(value)
+            elif name == "href" or name == "src":
+                value = self._sanitize_url(value)
+            if value is None:
+                continue
+            parts.append(f' {name}="{_escape_attr(value)}"')
+        return "".join(parts)
+
+    def _filter_styles(self, style_string):
+        if not style_string:
+            return None
+
+        allowed_styles = self.policy.allowed_styles
+        kept = []
+        for part in style_string.split(";"):
+            part = part.strip()
+            if ":" in part:
+                prop = part.split(":", 1)[0].strip().lower()
+                if prop in allowed_styles:
+                    kept.append(part)
+
+        return "; ".join(kept) if kept else None
+
+    def _sanitize_url(self, url):
+        if not url:
+            return None
+
+        url = url.strip()
+        if urlparse(url).scheme.lower() not in _SAFE_URL_SCHEMES:
+            return None
+        return url
+
+
+class BuiltinBackend:
+    """Sanitizer backend using chedito's built-in FastHTMLSanitizer."""
+
+    name = "builtin"
+
+    def __init__(self):
+        self._sanitizers = {}
+
+    def clean(self, html_content, policy):
+        sanitizer = self._sanitizers.get(policy.key)
+        if sanitizer is None:
+            sanitizer = self._sanitizers.setdefault(policy.key, FastHTMLSanitizer(policy))
+        return sanitizer.sanitize(html_content)
+
+
+BACKENDS = (Nh3Backend, BleachBackend, BuiltinBackend)
+
+_backend = None
+
+
+def get_backend():
+    """
+    Get the sanitizer backend, chosen once per process.
+
+    Prefers nh3, then bleach, then the built-in sanitizer.
+    """
+    global _backend
+
+    if _backend is None:
+        for backend_class in BACKENDS:
+            try:
+                _backend = backend_class()
+                break
+            except ImportError:
+                continue
+    return _backend
@@ -0,0 +1,203 @@
+"""
+Chedito file signatures.
+
+Identifies uploads from their first bytes (magic numbers, and a few
+content checks for formats without one), so the declared content type and
+file extension don't have to be trusted.
+"""
+
+# Each signature is a tuple of (offset, bytes) parts that must all match,
+# mapped to the MIME types sharing that signature. The first match wins, so
+# ISO-BMFF image brands (at offset 8) come before the generic ftyp box.
+SIGNATURES = (
+    (((0, b"\x89PNG\r\n\x1a\n"),), frozenset({"image/png"})),
+    (((0, b"\xff\xd8\xff"),), frozenset({"image/jpeg"})),
+    (((0, b"GIF87a"),), frozenset({"image/gif"})),
+    (((0, b"GIF89a"),), frozenset({"image/gif"})),
+    (((0, b"RIFF"), (8, b"WEBP")), frozenset({"image/webp"})),
+    (((4, b"ftyp"), (8, b"avif")), frozenset({"image/avif"})),
+    (((4, b"ftyp"), (8, b"avis")), frozenset({"image/avif"})),
+    (((4, b"ftyp"), (8, b"heic")), frozenset({"image/heic"})),
+    (((4, b"ftyp"), (8, b"heix")), frozenset({"image/heic"})),
+    (((4, b"ftyp"), (8, b"mif1")), frozenset({"image/heic"})),
+    (((4, b"ftyp"),), frozenset({"video/mp4", "video/quicktime"})),
+    (((0, b"\x1a\x45\xdf\xa3"),), frozenset({"video/webm"})),
+    (((0, b"OggS"),), frozenset({"video/ogg", "audio/ogg"})),
+    (((0, b"%PDF-"),), frozenset({"application/pdf"})),
+    (((0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"),), frozenset({
+        "application/msword",
+        "application/vnd.ms-excel",
+    })),
+    (((0, b"PK\x03\x04"),), frozenset({
+        "application/zip",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    })),
+    (((0, b"PK\x05\x06"),), frozenset({"application/zip"})),
+)
+
+# Number of leading bytes needed to match every signature
+HEADER_SIZE = max(offset + len(magic) for parts, _ in SIGNATURES for offset, magic in parts)
+
+# Number of leading bytes read by sniff_file()
+SNIFF_SIZE = 4096
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+SVG_TYPES = frozenset({"image/svg+xml"})
+TEXT_TYPES = frozenset({"text/plain", "text/csv"})
+
+# MIME types that can be recognized from a signature
+SIGNED_TYPES = frozenset().union(*(types for _, types in SIGNATURES))
+
+# MIME types that can be recognized by sniff()
+SNIFFABLE_TYPES = SIGNED_TYPES | SVG_TYPES | TEXT_TYPES
+
+
+def _index_signatures(signatures):
+    """Group signatures by the first byte they require, for cheap lookup."""
+    by_first_byte = {}
+    unanchored = []
+    for parts, types in signatures:
+        first = dict(parts).get(0)
+        if first is None:
+            unanchored.append((parts, types))
+        else:
+            by_first_byte.setdefault(first[0], []).append((parts, types))
+    return {byte: tuple(entries) for byte, entries in by_first_byte.items()}, tuple(unanchored)
+
+
+_BY_FIRST_BYTE, _UNANCHORED = _index_signatures(SIGNATURES)
+
+
+def match_signature(header):
+    """
+    Identify a file from the magic number in its first bytes.
+
+    Args:
+        header: The first bytes of the file (at least HEADER_SIZE when available).
+
+    Returns:
+        Frozenset of candidate MIME types, or None if no signature matches.
+    """
+    if not header:
+        return None
+    for parts, types in _BY_FIRST_BYTE.get(header[0], ()) + _UNANCHORED:
+        if all(header[offset:offset + len(magic)] == magic for offset, magic in parts):
+            return types
+    return None
+
+
+# Byte order marks of UTF-16 and UTF-32 text, which is full of NUL bytes
+TEXT_BOMS = (b"\xff\xfe", b"\xfe\xff", b"\x00\x00\xfe\xff")
+
+# Control characters that don't occur in text in any 8-bit encoding
+_CONTROL_BYTES = bytes(sorted(set(range(0x20)) - set(b"\t\n\r\f"))) + b"\x7f"
+
+
+def _is_text(header):
+    """
+    Whether a header looks like text.
+
+    UTF-8 is recognized by decoding, allowing a character cut off at the
+    end, UTF-16 and UTF-32 by their byte order mark. Other bytes are taken
+    as text in an 8-bit encoding (cp1252, latin-1, ...) unless they
+    include control characters.
+    """
+    if header.startswith(TEXT_BOMS):
+        return True
+    if b"\x00" in header:
+        return False
+    try:
+        header.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.reason != "unexpected end of data":
+            return len(header.translate(None, _CONTROL_BYTES)) == len(header)
+    return True
+
+
+def _is_svg(header):
+    """Whether a text header starts an SVG document."""
+    start = header.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if not start.startswith((b"<?xml", b"<!--", b"<!doctype svg", b"<svg")):
+        return False
+    return b"<svg" in start
+
+
+def sniff(header):
+    """
+    Identify a file from its first bytes.
+
+    Refines ZIP archives into Office documents by their entry names, and
+    recognizes SVG and plain text, which have no magic number.
+
+    Args:
+        header: The first bytes of the file (up to SNIFF_SIZE).
+
+    Returns:
+        Frozenset of candidate MIME types, or None if the content is not recognized.
+    """
+    types = match_signature(header)
+    if types is not None:
+        if header.startswith(b"PK\x03\x04"):
+            if b"word/" in header:
+                return frozenset({DOCX, "application/zip"})
+            if b"xl/" in header:
+                return frozenset({XLSX, "application/zip"})
+            if b"[Content_Types].xml" not in header:
+                return frozenset({"application/zip"})
+        return types
+
+    if header and _is_text(header):
+        return SVG_TYPES if _is_svg(header) else TEXT_TYPES
+    return None
+
+
+def read_header(file, size=SNIFF_SIZE):
+    """
+    Read the first bytes of a file without consuming it.
+
+    Only ``size`` bytes are read, and the file position is restored.
+
+    Args:
+        file: A seekable file-like object or UploadedFile.
+        size: Maximum number of bytes to read.
+
+    Returns:
+        The header bytes.
+    """
+    position = file.tell()
+    try:
+        file.seek(0)
+        header = file.read(size)
+    finally:
+        file.seek(position)
+    return header
+
+
+def check_signature(header, allowed_types):
+    """
+    Check the first bytes of a file against a list of allowed types.
+
+    A file whose signature belongs to types that are not allowed is
+    rejected. A file without a known signature is rejected only when every
+    allowed type has one (for example video uploads); otherwise it is left
+    to the remaining validation.
+
+    Args:
+        header: The first bytes of the file.
+        allowed_types: List of allowed MIME types.
+
+    Returns:
+        Tuple of (is_valid, error_message).
+    """
+    types = match_signature(header)
+    if types is None:
+        if SIGNED_TYPES.issuperset(allowed_types):
+            return False, "File content does not match any allowed type."
+        return True, None
+
+    if types.isdisjoint(allowed_types):
+        detected = ", ".join(sorted(types))
+        return False, f"File content ({detected}) is not an allowed type."
+    return True, None
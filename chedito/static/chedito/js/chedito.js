@@ -12,6 +12,12 @@
     // Store all editor instances
     Chedito.editors = {};
 
+    // Parsed editor configurations, by config ID
+    Chedito.configs = {};
+
+    // How far outside the viewport lazy editors start being created
+    Chedito.lazyRootMargin = '200px 0px';
+
     // Default configuration
     Chedito.defaults = {
         theme: 'snow',
@@ -300,10 +306,100 @@
         return null;
     };
 
+    // Files larger than this are sent through the resumable chunked upload API
+    Chedito.chunkedUploadThreshold = 4 * 1024 * 1024;
+
+    // Attempts per chunk before a chunked upload gives up
+    Chedito.chunkRetries = 3;
+
+    // Most files sent in one batch request, unless the widget gives the
+    // server's batch_upload_max_files in data-batch-upload-max-files
+    Chedito.batchUploadMaxFiles = 20;
+
     /**
      * Upload a file to the server
      */
-    Chedito.uploadFile = function(file, uploadUrl, callback) {
+    Chedito.uploadFile = function(file, uploadUrl, callback, onProgress) {
+        if (file.size > Chedito.chunkedUploadThreshold) {
+            Chedito.uploadFileChunked(file, uploadUrl, callback, onProgress);
+        } else {
+            Chedito.uploadFileSimple(file, uploadUrl, callback, onProgress);
+        }
+    };
+
+    /**
+     * Upload several files, sending small ones together in batch requests.
+     *
+     * The callback is called once per file with (error, url, file), in the
+     * order the files were given within each batch. Large files go through
+     * Chedito.uploadFile. Falls back to one request per file when the
+     * endpoint has no batch upload API. maxFiles is the server's limit per
+     * batch request (default: Chedito.batchUploadMaxFiles).
+     */
+    Chedito.uploadFiles = function(files, uploadUrl, callback, onProgress, maxFiles) {
+        const batchUrl = uploadUrl.replace(/\/?$/, '/') + 'batch/';
+        const batchSize = maxFiles || Chedito.batchUploadMaxFiles;
+        const small = [];
+
+        function uploadOne(file) {
+            Chedito.uploadFile(file, uploadUrl, function(error, url) {
+                callback(error, url, file);
+            }, onProgress);
+        }
+
+        function sendBatch(batch) {
+            const formData = new FormData();
+            batch.forEach(function(file) {
+                formData.append('files', file);
+            });
+
+            Chedito.sendRequest('POST', batchUrl, formData, null, function(status, response) {
+                if (status === 404 || status === 405) {
+                    batch.forEach(uploadOne);
+                } else if (status === 200 && response && response.results) {
+                    batch.forEach(function(file, i) {
+                        const result = response.results[i] || {};
+                        if (result.success) {
+                            callback(null, result.url, file);
+                        } else {
+                            callback(result.error || 'Upload failed', null, file);
+                        }
+                    });
+                } else {
+                    let error = 'Upload failed with status ' + status;
+                    if (response && response.error) {
+                        error = response.error;
+                    } else if (status === 0) {
+                        error = 'Network error during upload';
+                    }
+                    batch.forEach(function(file) {
+                        callback(error, null, file);
+                    });
+                }
+            });
+        }
+
+        Array.prototype.forEach.call(files, function(file) {
+            if (file.size > Chedito.chunkedUploadThreshold) {
+                uploadOne(file);
+            } else {
+                small.push(file);
+            }
+        });
+
+        if (small.length === 1) {
+            uploadOne(small[0]);
+            return;
+        }
+        for (let i = 0; i < small.length; i += batchSize) {
+            sendBatch(small.slice(i, i + batchSize));
+        }
+    };
+
+    /**
+     * Upload a file in a single multipart request
+     */
+    Chedito.uploadFileSimple = function(file, uploadUrl, callback, onProgress) {
         const formData = new FormData();
         formData.append('file', file);
 
@@ -316,6 +412,14 @@
             xhr.setRequestHeader('X-CSRFToken', csrfToken);
         }
 
+        if (onProgress) {
+            xhr.upload.onprogress = function(e) {
+                if (e.lengthComputable) {
+                    onProgress(e.loaded, e.total);
+                }
+            };
+        }
+
         xhr.onload = function() {
             if (xhr.status === 200) {
                 try {
@@ -345,6 +449,192 @@
         xhr.send(formData);
     };
 
+    /**
+     * Send a request with the CSRF token and parse the JSON response.
+     * The callback receives the status (0 on network errors) and the response.
+     */
+    Chedito.sendRequest = function(method, url, body, headers, callback) {
+        const xhr = new XMLHttpRequest();
+        xhr.open(method, url, true);
+
+        const csrfToken = Chedito.getCSRFToken();
+        if (csrfToken) {
+            xhr.setRequestHeader('X-CSRFToken', csrfToken);
+        }
+        Object.keys(headers || {}).forEach(function(name) {
+            xhr.setRequestHeader(name, headers[name]);
+        });
+
+        xhr.onload = function() {
+            let response = null;
+            try {
+                response = JSON.parse(xhr.responseText);
+            } catch (e) {
+                // Leave response empty
+            }
+            callback(xhr.status, response);
+        };
+
+        xhr.onerror = function() {
+            callback(0, null);
+        };
+
+        xhr.send(body);
+    };
+
+    /**
+     * Compute the hex SHA-256 digest of a blob, or null where Web Crypto is unavailable
+     */
+    Chedito.checksum = function(blob, callback) {
+        if (!window.crypto || !window.crypto.subtle || !blob.arrayBuffer) {
+            callback(null);
+            return;
+        }
+        blob.arrayBuffer().then(function(buffer) {
+            return window.crypto.subtle.digest('SHA-256', buffer);
+        }).then(function(digest) {
+            return Array.prototype.map.call(new Uint8Array(digest), function(byte) {
+                return ('0' + byte.toString(16)).slice(-2);
+            }).join('');
+        }, function() {
+            return null;
+        }).then(callback);
+    };
+
+    /**
+     * Upload a file in chunks through the resumable upload API.
+     *
+     * The session is remembered in localStorage, so an interrupted upload of
+     * the same file continues from the last stored chunk. Falls back to a
+     * single request when the endpoint has no chunked upload API.
+     */
+    Chedito.uploadFileChunked = function(file, uploadUrl, callback, onProgress) {
+        const startUrl = uploadUrl.replace(/\/?$/, '/') + 'chunked/';
+        const storageKey = ['chedito-upload', startUrl, file.name, file.size, file.lastModified].join(':');
+
+        function remember(session) {
+            try {
+                localStorage.setItem(storageKey, JSON.stringify({
+                    url: session.url,
+                    complete_url: session.complete_url
+                }));
+            } catch (e) {
+                // Uploads still work, they just can't be resumed
+            }
+        }
+
+        function forget() {
+            try {
+                localStorage.removeItem(storageKey);
+            } catch (e) {
+                // Nothing to remove
+            }
+        }
+
+        function recall() {
+            try {
+                return JSON.parse(localStorage.getItem(storageKey));
+            } catch (e) {
+                return null;
+            }
+        }
+
+        function fail(status, response) {
+            // Keep the session after network and server errors so it can be resumed
+            if (status >= 400 && status < 500) {
+                forget();
+            }
+            if (response && response.error) {
+                callback(response.error);
+            } else if (status === 0) {
+                callback('Network error during upload');
+            } else {
+                callback('Upload failed with status ' + status);
+            }
+        }
+
+        function start() {
+            const formData = new FormData();
+            formData.append('filename', file.name);
+            formData.append('size', file.size);
+            formData.append('content_type', file.type);
+
+            Chedito.sendRequest('POST', startUrl, formData, null, function(status, response) {
+                if (status === 404 || status === 405) {
+                    Chedito.uploadFileSimple(file, uploadUrl, callback, onProgress);
+                } else if (status === 201 && response) {
+                    remember(response);
+                    sendChunk(response, 0, 0);
+                } else {
+                    fail(status, response);
+                }
+            });
+        }
+
+        function sendChunk(session, offset, attempt) {
+            if (onProgress) {
+                onProgress(offset, file.size);
+            }
+            if (offset >= file.size) {
+                complete(session);
+                return;
+            }
+
+            const chunk = file.slice(offset, offset + session.chunk_size);
+            Chedito.checksum(chunk, function(checksum) {
+                const headers = {
+                    'Content-Type': 'application/octet-stream',
+                    'X-Chunk-Offset': String(offset)
+                };
+                if (checksum) {
+                    headers['X-Chunk-Checksum'] = checksum;
+                }
+
+                Chedito.sendRequest('PUT', session.url, chunk, headers, function(status, response) {
+                    if (status === 200 && response) {
+                        sendChunk(session, response.offset, 0);
+                    } else if (status === 409 && response && typeof response.offset === 'number' &&
+                               attempt + 1 < Chedito.chunkRetries) {
+                        // The server has a different offset; continue from there
+                        sendChunk(session, response.offset, attempt + 1);
+                    } else if (attempt + 1 < Chedito.chunkRetries && (status === 0 || status >= 500 ||
+                               (response && typeof response.offset === 'number'))) {
+                        setTimeout(function() {
+                            sendChunk(session, offset, attempt + 1);
+                        }, 1000 * Math.pow(2, attempt));
+                    } else {
+                        fail(status, response);
+                    }
+                });
+            });
+        }
+
+        function complete(session) {
+            Chedito.sendRequest('POST', session.complete_url, null, null, function(status, response) {
+                if (status === 200 && response && response.success) {
+                    forget();
+                    callback(null, response.url);
+                } else {
+                    fail(status, response);
+                }
+            });
+        }
+
+        const saved = recall();
+        if (!saved || !saved.url) {
+            start();
+            return;
+        }
+        Chedito.sendRequest('GET', saved.url, null, null, function(status, response) {
+            if (status === 200 && response) {
+                sendChunk(response, response.offset, 0);
+            } else {
+                forget();
+                start();
+            }
+        });
+    };
+
     /**
      * Custom image handler for toolbar button
      */
@@ -401,10 +691,25 @@
         };
     };
 
+    /**
+     * Build an upload callback that embeds each uploaded file at the cursor
+     */
+    Chedito.embedUploaded = function(quill, type, errorMessage) {
+        return function(error, url) {
+            if (error) {
+                console.error(errorMessage, error);
+                return;
+            }
+            const range = quill.getSelection(true);
+            quill.insertEmbed(range.index, type, url);
+            quill.setSelection(range.index + 1);
+        };
+    };
+
     /**
      * Handle drag and drop uploads
      */
-    Chedito.setupDragDrop = function(quill, container, imageUrl, videoUrl) {
+    Chedito.setupDragDrop = function(quill, container, imageUrl, videoUrl, maxFiles) {
         container.addEventListener('dragover', function(e) {
             e.preventDefault();
             e.stopPropagation();
@@ -422,64 +727,82 @@
             e.stopPropagation();
             container.classList.remove('chedito-dragover');
 
-            const files = e.dataTransfer.files;
-            for (let file of files) {
+            const images = [];
+            const videos = [];
+            for (let file of e.dataTransfer.files) {
                 if (file.type.startsWith('image/')) {
-                    Chedito.uploadFile(file, imageUrl, function(error, url) {
-                        if (error) {
-                            console.error('Image upload failed:', error);
-                            return;
-                        }
-                        const range = quill.getSelection(true);
-                        quill.insertEmbed(range.index, 'image', url);
-                        quill.setSelection(range.index + 1);
-                    });
+                    images.push(file);
                 } else if (file.type.startsWith('video/')) {
-                    Chedito.uploadFile(file, videoUrl, function(error, url) {
-                        if (error) {
-                            console.error('Video upload failed:', error);
-                            return;
-                        }
-                        const range = quill.getSelection(true);
-                        quill.insertEmbed(range.index, 'video', url);
-                        quill.setSelection(range.index + 1);
-                    });
+                    videos.push(file);
                 }
             }
+
+            if (images.length) {
+                Chedito.uploadFiles(images, imageUrl, Chedito.embedUploaded(quill, 'image', 'Image upload failed:'), null, maxFiles);
+            }
+            if (videos.length) {
+                Chedito.uploadFiles(videos, videoUrl, Chedito.embedUploaded(quill, 'video', 'Video upload failed:'), null, maxFiles);
+            }
         });
     };
 
     /**
      * Handle paste uploads
      */
-    Chedito.setupPasteUpload = function(quill, imageUrl) {
+    Chedito.setupPasteUpload = function(quill, imageUrl, maxFiles) {
         quill.root.addEventListener('paste', function(e) {
             const clipboardData = e.clipboardData || window.clipboardData;
             const items = clipboardData.items;
 
+            const files = [];
             for (let item of items) {
                 if (item.type.indexOf('image') !== -1) {
-                    e.preventDefault();
                     const file = item.getAsFile();
                     if (file) {
-                        Chedito.uploadFile(file, imageUrl, function(error, url) {
-                            if (error) {
-                                console.error('Paste upload failed:', error);
-                                return;
-                            }
-                            const range = quill.getSelection(true);
-                            quill.insertEmbed(range.index, 'image', url);
-                            quill.setSelection(range.index + 1);
-                        });
+                        files.push(file);
                     }
+                    // Further image items are usually the same image in other formats
                     break;
                 }
             }
+
+            if (files.length) {
+                e.preventDefault();
+                Chedito.uploadFiles(files, imageUrl, Chedito.embedUploaded(quill, 'image', 'Paste upload failed:'), null, maxFiles);
+            }
         });
     };
 
+    /**
+     * Get a configuration from the page-level registry
+     *
+     * Configurations are written as JSON script elements named by ID, once
+     * per page when they come from the form media, and parsed once however
+     * many editors use them.
+     */
+    Chedito.getConfig = function(configId) {
+        if (!(configId in Chedito.configs)) {
+            const element = document.getElementById(configId);
+            if (!element) {
+                console.error('Chedito: Could not find config', configId);
+                return null;
+            }
+            try {
+                Chedito.configs[configId] = JSON.parse(element.textContent);
+            } catch (e) {
+                console.error('Chedito: Invalid config JSON', configId);
+                return null;
+            }
+        }
+        return Chedito.configs[configId];
+    };
+
     /**
      * Initialize a Chedito editor
+     *
+     * config is a Quill configuration object, or the ID of a registered one.
+     * uploadUrls holds the image, video and file endpoints, and optionally
+     * batchMaxFiles, the server's limit on files per batch request.
      */
     Chedito.init = function(textareaId, editorId, config, uploadUrls) {
         const textarea = document.getElementById(textareaId);
@@ -490,6 +813,16 @@
             return null;
         }
 
+        if (typeof config === 'string') {
+            config = Chedito.getConfig(config);
+        }
+
+        // Replace the static content of a lazy editor
+        const preview = editorContainer.querySelector('.chedito-lazy-preview');
+        if (preview) {
+            preview.remove();
+        }
+
         // Merge configuration
         const finalConfig = Object.assign({}, Chedito.defaults, config || {});
 
@@ -541,12 +874,13 @@
                 quill,
                 editorContainer,
                 uploadUrls.image || '/chedito/upload/image/',
-                uploadUrls.video || '/chedito/upload/video/'
+                uploadUrls.video || '/chedito/upload/video/',
+                uploadUrls.batchMaxFiles
             );
 
             // Paste upload
             if (uploadUrls.image) {
-                Chedito.setupPasteUpload(quill, uploadUrls.image);
+                Chedito.setupPasteUpload(quill, uploadUrls.image, uploadUrls.batchMaxFiles);
             }
         }
 
@@ -582,6 +916,45 @@
         }
     };
 
+    /**
+     * Call callback once a widget is needed
+     *
+     * Lazy editors are created when their widget scrolls near the viewport,
+     * or as soon as it is focused or clicked. The callback receives true in
+     * the latter case, so the new editor can take the focus.
+     */
+    Chedito.whenNeeded = function(widget, callback) {
+        let done = false;
+        let observer = null;
+
+        function start(focus) {
+            if (done) return;
+            done = true;
+            if (observer) observer.disconnect();
+            widget.removeEventListener('focusin', onInteract);
+            widget.removeEventListener('pointerdown', onInteract);
+            callback(focus);
+        }
+
+        function onInteract() {
+            start(true);
+        }
+
+        widget.addEventListener('focusin', onInteract);
+        widget.addEventListener('pointerdown', onInteract);
+
+        if (!('IntersectionObserver' in window)) {
+            start(false);
+            return;
+        }
+        observer = new IntersectionObserver(function(entries) {
+            if (entries.some(function(entry) { return entry.isIntersecting; })) {
+                start(false);
+            }
+        }, { rootMargin: Chedito.lazyRootMargin });
+        observer.observe(widget);
+    };
+
     /**
      * Auto-initialize all chedito widgets on page load
      */
@@ -590,13 +963,17 @@
         widgets.forEach(function(widget) {
             const textareaId = widget.getAttribute('data-textarea-id');
             const editorId = widget.getAttribute('data-editor-id');
+            const configId = widget.getAttribute('data-config-id');
             const configStr = widget.getAttribute('data-config');
             const imageUrl = widget.getAttribute('data-upload-image-url');
             const videoUrl = widget.getAttribute('data-upload-video-url');
             const fileUrl = widget.getAttribute('data-upload-file-url');
+            const batchMaxFiles = parseInt(widget.getAttribute('data-batch-upload-max-files'), 10);
 
             let config = {};
-            if (configStr) {
+            if (configId) {
+                config = Chedito.getConfig(configId) || {};
+            } else if (configStr) {
                 try {
                     config = JSON.parse(configStr);
                 } catch (e) {
@@ -607,10 +984,22 @@
             const uploadUrls = {
                 image: imageUrl,
                 video: videoUrl,
-                file: fileUrl
+                file: fileUrl,
+                batchMaxFiles: batchMaxFiles || null
             };
 
-            Chedito.init(textareaId, editorId, config, uploadUrls);
+            if (widget.getAttribute('data-chedito-lazy') === 'true') {
+                // Observed once, however often autoInit runs
+                widget.setAttribute('data-chedito-lazy', 'pending');
+                Chedito.whenNeeded(widget, function(focus) {
+                    const quill = Chedito.init(textareaId, editorId, config, uploadUrls);
+                    if (quill && focus) {
+                        quill.focus();
+                    }
+                });
+            } else if (widget.getAttribute('data-chedito-lazy') !== 'pending') {
+                Chedito.init(textareaId, editorId, config, uploadUrls);
+            }
         });
     };
 
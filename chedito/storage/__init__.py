@@ -5,11 +5,13 @@ Provides pluggable storage backends for handling file uploads.
 """
 
 from chedito.storage.base import BaseStorage
+from chedito.storage.content_addressed import ContentAddressedStorage
 from chedito.storage.default import DefaultStorage
 from chedito.storage.local import LocalStorage
 
 __all__ = [
     "BaseStorage",
+    "ContentAddressedStorage",
     "DefaultStorage",
     "LocalStorage",
 ]
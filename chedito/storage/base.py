@@ -5,6 +5,9 @@ Defines the interface for all storage backends.
 """
 
 from abc import ABC, abstractmethod
+from urllib.parse import unquote
+
+from asgiref.sync import sync_to_async
 
 
 class BaseStorage(ABC):
@@ -67,6 +70,78 @@ class BaseStorage(ABC):
         """
         pass
 
+    def open(self, filename):
+        """
+        Open a stored file for reading.
+
+        Optional; backends implement it to support image derivatives.
+
+        Args:
+            filename: Name/path of the file.
+
+        Returns:
+            File object opened in binary mode.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support reading files.")
+
+    def save_as(self, file, filename):
+        """
+        Save a file under exactly the given name, replacing any existing file.
+
+        Optional; backends implement it to support image derivatives.
+
+        Args:
+            file: File-like object or raw bytes.
+            filename: Name/path of the file.
+
+        Returns:
+            URL where the file can be accessed.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support saving by name.")
+
+    def name_from_url(self, url):
+        """
+        Get the name of a stored file from its URL.
+
+        Args:
+            url: URL returned by save() or url().
+
+        Returns:
+            Name/path of the file, or None if the URL doesn't point into this storage.
+        """
+        prefix = self.url("")
+        if not prefix or not url.startswith(prefix) or "?" in url:
+            return None
+        return unquote(url[len(prefix):]) or None
+
+    async def asave(self, file, filename, upload_type="file"):
+        """
+        Async version of save().
+
+        Runs save() in a worker thread by default, so slow storage I/O
+        doesn't block the event loop or Django's sync thread. Backends with
+        an async client can override this.
+        """
+        return await sync_to_async(self.save, thread_sensitive=False)(file, filename, upload_type)
+
+    async def adelete(self, filename):
+        """Async version of delete(), run in a worker thread by default."""
+        return await sync_to_async(self.delete, thread_sensitive=False)(filename)
+
+    async def aexists(self, filename):
+        """Async version of exists(), run in a worker thread by default."""
+        return await sync_to_async(self.exists, thread_sensitive=False)(filename)
+
+    # An optional hook, so deliberately concrete and empty rather than abstract
+    def close(self):  # noqa: B027
+        """
+        Release resources held by the backend.
+
+        Backends are shared by all requests in a process. This is called when
+        the shared instance is discarded (when settings are reloaded), so
+        backends holding connection pools or clients can shut them down.
+        """
+
     def get_available_name(self, filename):
         """
         Get an available filename, avoiding overwrites.
@@ -0,0 +1,99 @@
+"""
+Chedito content-addressed storage backend.
+
+Stores each distinct file once, named after the hash of its content, so
+repeated uploads of the same file share one copy.
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+
+from chedito.storage.local import LocalStorage
+from chedito.utils import sanitize_filename
+
+
+class ContentAddressedStorage(LocalStorage):
+    """
+    Local filesystem storage that deduplicates uploads by content.
+
+    Files are hashed while they are written and stored as
+    ``<upload_path>/<type>s/<xx>/<digest><ext>``, where ``xx`` is the first
+    two characters of the digest. Uploading content that is already stored
+    returns the URL of the existing file.
+
+    Stored files are shared between every upload of the same content, so
+    deleting one removes it for all of them.
+    """
+
+    hash_algorithm = "sha256"
+    chunk_size = 64 * 1024
+
+    def get_content_name(self, digest, filename):
+        """
+        Get the storage name for content with the given digest.
+
+        Args:
+            digest: Hex digest of the content.
+            filename: Original filename (only its extension is kept).
+
+        Returns:
+            Name relative to the upload type directory.
+        """
+        _, ext = os.path.splitext(sanitize_filename(filename))
+        return f"{digest[:2]}/{digest}{ext.lower()}"
+
+    def save(self, file, filename, upload_type="file"):
+        """
+        Save a file, reusing an existing copy of the same content.
+
+        Args:
+            file: File-like object, UploadedFile or raw bytes.
+            filename: Original filename.
+            upload_type: Type of upload ("image", "video", "file").
+
+        Returns:
+            URL where the file can be accessed.
+        """
+        directory = os.path.dirname(self._get_path("", upload_type))
+        os.makedirs(directory, exist_ok=True)
+
+        # Hash while writing to a temporary file next to the final location
+        digest = hashlib.new(self.hash_algorithm)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as dest:
+                for chunk in self._iter_chunks(file):
+                    digest.update(chunk)
+                    dest.write(chunk)
+
+            name = self.get_content_name(digest.hexdigest(), filename)
+            filepath = self._get_path(name, upload_type)
+            if os.path.exists(filepath):
+                os.remove(temp_path)
+            else:
+                # mkstemp creates files readable by the owner only
+                os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+                self._ensure_directory(filepath)
+                os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return self.url(self._get_relative_path(name, upload_type))
+
+    def _iter_chunks(self, file):
+        """Yield the content of an upload in chunks."""
+        if hasattr(file, "chunks"):
+            yield from file.chunks(self.chunk_size)
+        elif hasattr(file, "read"):
+            while True:
+                chunk = file.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            yield file
@@ -4,8 +4,12 @@ Chedito default storage backend.
 Uses Django's default_storage for file operations.
 """
 
+import posixpath
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 
 from chedito.storage.base import BaseStorage
 from chedito.conf import chedito_settings
@@ -18,8 +22,13 @@ class DefaultStorage(BaseStorage):
 
     This allows chedito to automatically use whatever storage backend
     is configured in Django settings (local, S3, GCS, etc.).
+
+    Uploads are handed to the storage as file objects, so the backend
+    streams them in chunks instead of receiving one large bytes object.
     """
 
+    chunk_size = 64 * 1024
+
     def __init__(self):
         self.storage = default_storage
         self.upload_path = chedito_settings.upload_path
@@ -45,19 +54,79 @@ class DefaultStorage(BaseStorage):
         unique_filename = generate_unique_filename(filename)
         path = self._get_path(unique_filename, upload_type)
 
-        # Handle different file types
-        if hasattr(file, "read"):
-            content = file.read()
-            if hasattr(file, "seek"):
+        content = self._as_file(file, unique_filename)
+        try:
+            saved_path = self.storage.save(path, content)
+        finally:
+            if isinstance(content.file, SpooledTemporaryFile):
+                content.close()
+            if _is_seekable(file):
                 file.seek(0)
-        else:
-            content = file
 
-        # Save the file
-        saved_path = self.storage.save(path, ContentFile(content))
+        return self.url(saved_path)
+
+    def save_as(self, file, filename):
+        """
+        Save a file under exactly the given name, replacing any existing file.
+
+        Args:
+            file: File-like object, UploadedFile or raw bytes.
+            filename: Path of the file.
+
+        Returns:
+            URL where the file can be accessed.
+        """
+        if self.storage.exists(filename):
+            self.storage.delete(filename)
+
+        content = self._as_file(file, posixpath.basename(filename))
+        try:
+            saved_path = self.storage.save(filename, content)
+        finally:
+            if isinstance(content.file, SpooledTemporaryFile):
+                content.close()
 
         return self.url(saved_path)
 
+    def open(self, filename):
+        """
+        Open a file for reading.
+
+        Args:
+            filename: Path of the file.
+
+        Returns:
+            File object opened in binary mode.
+        """
+        return self.storage.open(filename, "rb")
+
+    def _as_file(self, file, filename):
+        """
+        Wrap upload content in a Django File without reading it into memory.
+
+        UploadedFiles are passed through, so temporary uploads can be moved
+        into place by the storage. Seekable file objects are wrapped as is.
+        Non-seekable streams and chunk iterables are copied to a temporary
+        file that stays in memory only up to FILE_UPLOAD_MAX_MEMORY_SIZE.
+        """
+        if isinstance(file, File):
+            return file
+        if isinstance(file, (bytes, str)):
+            return ContentFile(file, name=filename)
+        if hasattr(file, "read") and _is_seekable(file):
+            return File(file, name=filename)
+
+        if hasattr(file, "read"):
+            chunks = iter(lambda: file.read(self.chunk_size) or None, None)
+        else:
+            chunks = iter(file)
+
+        spool = SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        for chunk in chunks:
+            spool.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        spool.seek(0)
+        return File(spool, name=filename)
+
     def delete(self, filename):
         """
         Delete a file from Django's default storage.
@@ -99,3 +168,15 @@ class DefaultStorage(BaseStorage):
             True if the file exists, False otherwise.
         """
         return self.storage.exists(filename)
+
+
+def _is_seekable(file):
+    """Whether a file-like object supports seeking back to the start."""
+    seekable = getattr(file, "seekable", None)
+    if seekable is None:
+        return hasattr(file, "seek")
+    try:
+        return seekable()
+    except ValueError:
+        # Closed file
+        return False
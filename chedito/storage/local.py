@@ -73,7 +73,41 @@ class LocalStorage(BaseStorage):
         # Ensure directory exists
         self._ensure_directory(filepath)
 
-        # Write the file
+        self._write(file, filepath)
+
+        relative_path = self._get_relative_path(unique_filename, upload_type)
+        return self.url(relative_path)
+
+    def save_as(self, file, filename):
+        """
+        Save a file under exactly the given name, replacing any existing file.
+
+        Args:
+            file: File-like object, UploadedFile or raw bytes.
+            filename: Relative path of the file.
+
+        Returns:
+            URL where the file can be accessed.
+        """
+        filepath = os.path.join(self.location, filename)
+        self._ensure_directory(filepath)
+        self._write(file, filepath)
+        return self.url(filename)
+
+    def open(self, filename):
+        """
+        Open a file for reading.
+
+        Args:
+            filename: Relative path of the file.
+
+        Returns:
+            File object opened in binary mode.
+        """
+        return open(os.path.join(self.location, filename), "rb")
+
+    def _write(self, file, filepath):
+        """Write upload content to a path."""
         if hasattr(file, "chunks"):
             # Django UploadedFile
             with open(filepath, "wb") as dest:
@@ -88,9 +122,6 @@ class LocalStorage(BaseStorage):
             with open(filepath, "wb") as dest:
                 dest.write(file)
 
-        relative_path = self._get_relative_path(unique_filename, upload_type)
-        return self.url(relative_path)
-
     def delete(self, filename):
         """
         Delete a file from the local filesystem.
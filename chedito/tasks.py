@@ -0,0 +1,218 @@
+"""
+Chedito post-upload tasks.
+
+Work that follows an upload, such as making image derivatives, runs as a
+background job so the upload response doesn't wait for it. Jobs are handed
+to a pluggable task backend (an in-process thread pool by default) and
+their status is kept in a Django cache, where clients can poll it.
+"""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from chedito.conf import chedito_settings
+from chedito.images import generate_derivatives
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_STATUS_KEY_PREFIX = "chedito:upload-job"
+
+# Cache backends whose entries aren't visible to other processes
+PROCESS_LOCAL_CACHES = frozenset({
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+})
+
+
+def generate_image_derivatives(storage, url, upload_type):
+    """Make the resized copies of an uploaded image."""
+    return {"widths": sorted(generate_derivatives(storage, url))}
+
+
+generate_image_derivatives.upload_types = ("image",)
+
+
+def get_upload_tasks(upload_type):
+    """
+    Get the tasks to run after a file of the given type is uploaded.
+
+    Tasks are the callables named in ``upload_tasks``, preceded by
+    generate_image_derivatives when derivatives are made on upload. A task
+    with an ``upload_types`` attribute only runs for those types.
+
+    Returns:
+        List of task callables.
+    """
+    tasks = [import_string(path) for path in chedito_settings.upload_tasks]
+    if chedito_settings.image_derivatives and chedito_settings.image_derivatives_on_upload:
+        tasks.insert(0, generate_image_derivatives)
+    return [task for task in tasks if upload_type in getattr(task, "upload_types", (upload_type,))]
+
+
+def _status_cache():
+    return caches[chedito_settings.upload_task_cache_alias]
+
+
+def check_status_cache(app_configs=None, **kwargs):
+    """
+    System check warning when job status is kept in a per-process cache.
+
+    Status requests can be served by another worker process than the one
+    that ran the job, so the status cache must be shared between processes
+    whenever post-upload tasks are enabled.
+
+    Returns:
+        List of check messages.
+    """
+    if not (
+        chedito_settings.upload_tasks
+        or (chedito_settings.image_derivatives and chedito_settings.image_derivatives_on_upload)
+    ):
+        return []
+
+    alias = chedito_settings.upload_task_cache_alias
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        checks.Warning(
+            f"Upload job status is kept in the '{alias}' cache, which uses {backend}.",
+            hint=(
+                "Status polls served by another process won't find the job. Point "
+                "upload_task_cache_alias at a cache shared between processes, such "
+                "as Redis, Memcached or the database cache."
+            ),
+            id="chedito.W001",
+        )
+    ]
+
+
+def set_job_status(job_id, status, **data):
+    """Record the status of a job, with any extra JSON-serializable data."""
+    _status_cache().set(
+        f"{_STATUS_KEY_PREFIX}:{job_id}",
+        {"job_id": job_id, "status": status, **data},
+        chedito_settings.upload_task_status_timeout,
+    )
+
+
+def get_job_status(job_id):
+    """Get the recorded status of a job, or None if it is unknown or expired."""
+    return _status_cache().get(f"{_STATUS_KEY_PREFIX}:{job_id}")
+
+
+def enqueue_upload_tasks(url, upload_type):
+    """
+    Queue the post-upload tasks for a saved file.
+
+    Args:
+        url: URL returned by the storage backend.
+        upload_type: Type of upload ("image", "video", "file").
+
+    Returns:
+        The job ID, or None if no task applies to the upload.
+    """
+    if not get_upload_tasks(upload_type):
+        return None
+
+    job_id = uuid.uuid4().hex
+    set_job_status(job_id, PENDING, url=url)
+    chedito_settings.get_task_backend().enqueue(job_id, url, upload_type)
+    return job_id
+
+
+def run_upload_job(job_id, url, upload_type):
+    """
+    Run the post-upload tasks of a job and record the outcome.
+
+    Task backends call this wherever the job is executed: a thread, or a
+    worker process of an external queue.
+
+    Args:
+        job_id: ID returned by enqueue_upload_tasks().
+        url: URL of the uploaded file.
+        upload_type: Type of upload ("image", "video", "file").
+    """
+    close_old_connections()
+    set_job_status(job_id, RUNNING, url=url)
+    storage = chedito_settings.get_storage()
+    results = {}
+    try:
+        for task in get_upload_tasks(upload_type):
+            results[task.__name__] = task(storage, url, upload_type)
+    except Exception as e:
+        set_job_status(job_id, FAILED, url=url, results=results, error=str(e))
+    else:
+        set_job_status(job_id, DONE, url=url, results=results)
+    finally:
+        close_old_connections()
+
+
+class BaseTaskBackend:
+    """
+    Base class for post-upload task backends.
+
+    A backend only has to get run_upload_job() called with the job's
+    arguments, in the current process or elsewhere. Adapters for external
+    queues (Celery, RQ, ...) submit a job that calls it in a worker; the
+    status cache must then be shared between web and worker processes.
+    """
+
+    def enqueue(self, job_id, url, upload_type):
+        """Arrange for run_upload_job(job_id, url, upload_type) to be called."""
+        raise NotImplementedError("Task backends must implement enqueue().")
+
+    def close(self):
+        """Release resources when the shared backend instance is discarded."""
+        pass
+
+
+class SyncTaskBackend(BaseTaskBackend):
+    """Run jobs immediately, inside the upload request (useful for tests)."""
+
+    def enqueue(self, job_id, url, upload_type):
+        run_upload_job(job_id, url, upload_type)
+
+
+class ThreadPoolTaskBackend(BaseTaskBackend):
+    """Run jobs on a thread pool in the web process."""
+
+    def __init__(self, max_workers=None):
+        """
+        Initialize ThreadPoolTaskBackend.
+
+        Args:
+            max_workers: Number of worker threads (default: upload_task_workers).
+        """
+        self.max_workers = max_workers or chedito_settings.upload_task_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """The thread pool, started on first use."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="chedito-upload"
+                    )
+        return self._executor
+
+    def enqueue(self, job_id, url, upload_type):
+        return self.executor.submit(run_upload_job, job_id, url, upload_type)
+
+    def close(self):
+        # Queued jobs still run; the threads exit once they are done
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
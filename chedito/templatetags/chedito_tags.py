@@ -7,8 +7,11 @@ Provides template tags for rendering rich text content and including assets.
 from django import template
 from django.utils.safestring import mark_safe
 
-from chedito.utils import sanitize_html
+from chedito.assets import get_asset_tags
+from chedito.cache import cached_sanitize_html
 from chedito.conf import chedito_settings
+from chedito.images import add_srcset
+from chedito.utils import html_to_text, truncate_html, truncate_html_text, truncate_text
 
 register = template.Library()
 
@@ -36,7 +39,10 @@ def render_rich_text(content, sanitize=True):
         return ""
 
     if sanitize:
-        content = sanitize_html(content)
+        content = cached_sanitize_html(content)
+
+    if chedito_settings.image_derivatives:
+        content = add_srcset(content)
 
     return mark_safe(content)
 
@@ -52,25 +58,13 @@ def chedito_css():
             {% chedito_css %}
         </head>
 
+    The tags are built once per theme and asset settings, and include
+    preload hints for the scripts when asset_preload is enabled.
+
     Returns:
         HTML link tags for CSS files.
     """
-    from django.templatetags.static import static
-
-    theme = chedito_settings.quill_theme
-
-    tags = []
-
-    # Add Quill theme CSS (bundled locally)
-    if theme == "bubble":
-        tags.append(f'<link rel="stylesheet" href="{static("chedito/css/quill.bubble.css")}">')
-    else:
-        tags.append(f'<link rel="stylesheet" href="{static("chedito/css/quill.snow.css")}">')
-
-    # Add chedito custom CSS
-    tags.append(f'<link rel="stylesheet" href="{static("chedito/css/chedito.css")}">')
-
-    return mark_safe('\n'.join(tags))
+    return mark_safe(get_asset_tags("css"))
 
 
 @register.simple_tag
@@ -85,17 +79,13 @@ def chedito_js():
             {% chedito_js %}
         </body>
 
+    The tags are built once per asset settings, with defer and integrity
+    attributes when asset_defer and asset_integrity are enabled.
+
     Returns:
         HTML script tags for JavaScript files.
     """
-    from django.templatetags.static import static
-
-    tags = [
-        f'<script src="{static("chedito/js/quill.min.js")}"></script>',
-        f'<script src="{static("chedito/js/chedito.js")}"></script>',
-    ]
-
-    return mark_safe('\n'.join(tags))
+    return mark_safe(get_asset_tags("js"))
 
 
 @register.simple_tag
@@ -121,7 +111,7 @@ def chedito_assets():
 
 
 @register.inclusion_tag('chedito/widget.html')
-def chedito_editor(name, value='', config=None, **attrs):
+def chedito_editor(name, value='', config=None, lazy=None, **attrs):
     """
     Render a standalone Chedito editor.
 
@@ -136,17 +126,18 @@ def chedito_editor(name, value='', config=None, **attrs):
         name: The form field name.
         value: Initial value (HTML content).
         config: Optional Quill configuration dictionary.
+        lazy: Create the editor only when it scrolls into view or gains
+            focus (default: the lazy_init setting).
         **attrs: Additional HTML attributes.
 
     Returns:
         Rendered editor HTML.
     """
-    import json
+    from chedito.widgets import get_config_context, get_lazy_context
 
     widget_id = attrs.get('id', name)
     editor_id = f'{widget_id}_editor'
-
-    quill_config = chedito_settings.get_quill_config(config)
+    quill_config = chedito_settings.get_quill_config_json(config)
 
     return {
         'widget': {
@@ -157,13 +148,18 @@ def chedito_editor(name, value='', config=None, **attrs):
                 **attrs,
             },
             'editor_id': editor_id,
-            'quill_config': json.dumps(quill_config),
+            'quill_config': quill_config,
+            **get_config_context(quill_config, editor_id),
             'widget_height': chedito_settings.widget_height,
             'widget_min_height': chedito_settings.widget_min_height,
             'widget_max_height': chedito_settings.widget_max_height,
             'upload_image_url': '/chedito/upload/image/',
             'upload_video_url': '/chedito/upload/video/',
             'upload_file_url': '/chedito/upload/file/',
+            'batch_upload_max_files': chedito_settings.batch_upload_max_files,
+            **get_lazy_context(
+                chedito_settings.lazy_init if lazy is None else lazy, value
+            ),
         }
     }
 
@@ -191,7 +187,10 @@ def richtext_filter(value, sanitize=True):
         return ""
 
     if sanitize:
-        value = sanitize_html(value)
+        value = cached_sanitize_html(value)
+
+    if chedito_settings.image_derivatives:
+        value = add_srcset(value)
 
     return mark_safe(value)
 
@@ -205,6 +204,9 @@ def strip_tags_filter(value):
         {% load chedito_tags %}
         {{ article.content|strip_tags }}
 
+    When given a RichTextField value whose model stores a plain-text
+    companion (``text_field``), the stored text is returned directly.
+
     Args:
         value: The HTML content.
 
@@ -214,12 +216,11 @@ def strip_tags_filter(value):
     if not value:
         return ""
 
-    import re
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', value)
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    plain_text = getattr(value, 'plain_text', None)
+    if plain_text is not None:
+        return plain_text
+
+    return html_to_text(value)
 
 
 @register.filter(name='truncate_richtext')
@@ -231,6 +232,10 @@ def truncate_richtext_filter(value, length=100):
         {% load chedito_tags %}
         {{ article.content|truncate_richtext:200 }}
 
+    Only as much of the document as the preview needs is read. When given
+    a RichTextField value whose model stores an excerpt (``excerpt_field``)
+    or plain-text companion (``text_field``), that is used instead.
+
     Args:
         value: The HTML content.
         length: Maximum character length.
@@ -241,16 +246,38 @@ def truncate_richtext_filter(value, length=100):
     if not value:
         return ""
 
-    # Strip tags first
-    text = strip_tags_filter(value)
+    get_excerpt = getattr(value, 'get_excerpt', None)
+    text = get_excerpt(length) if get_excerpt is not None else None
+    if text is None:
+        plain_text = getattr(value, 'plain_text', None)
+        if plain_text is None:
+            # Only the start of the document is read
+            return truncate_html_text(value, length)
+        text = plain_text
 
-    if len(text) <= length:
-        return text
+    return truncate_text(text, length)
 
-    # Find a good break point
-    truncated = text[:length]
-    last_space = truncated.rfind(' ')
-    if last_space > length * 0.8:  # If space is reasonably close to end
-        truncated = truncated[:last_space]
 
-    return truncated + '...'
+@register.filter(name='truncate_richtext_html')
+def truncate_richtext_html_filter(value, length=100):
+    """
+    Truncate rich text content to a specified length, keeping the formatting.
+
+    Usage:
+        {% load chedito_tags %}
+        {{ article.content|truncate_richtext_html:200 }}
+
+    Reading stops once ``length`` characters of text have been collected,
+    and any elements still open are closed. The preview is sanitized.
+
+    Args:
+        value: The HTML content.
+        length: Maximum number of text characters.
+
+    Returns:
+        Safe HTML string.
+    """
+    if not value:
+        return ""
+
+    return mark_safe(cached_sanitize_html(truncate_html(value, length)))
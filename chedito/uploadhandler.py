@@ -0,0 +1,131 @@
+"""
+Chedito upload handler.
+
+Validates uploads while Django is still receiving them, so oversized or
+disallowed files are rejected before they are fully read into memory or
+written to a temporary file.
+"""
+
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from chedito.signatures import HEADER_SIZE, check_signature
+
+
+class RejectedUpload:
+    """
+    Placeholder for a file rejected by a CheditoUploadHandler in skip mode.
+
+    Takes the place of the file in ``request.FILES``, so the remaining files
+    keep their positions and the rejection can be reported per file.
+    """
+
+    def __init__(self, name, error):
+        self.name = name
+        self.error = error
+        self.size = 0
+
+    def __repr__(self):
+        return f"<RejectedUpload: {self.name} ({self.error})>"
+
+
+class CheditoUploadHandler(FileUploadHandler):
+    """
+    Upload handler that enforces a size limit and checks file signatures.
+
+    Must run before Django's memory and temporary-file handlers. It passes
+    every chunk through unchanged and stops the upload, recording the
+    reason in ``error``, as soon as a file exceeds ``max_size`` or its
+    first bytes identify a type outside ``allowed_types``.
+
+    With ``skip_invalid``, only the offending file is rejected: its data is
+    dropped and it appears in ``request.FILES`` as a RejectedUpload, while
+    the other files are received normally.
+    """
+
+    # When True, the rest of the request body is not read after an upload
+    # is stopped. This saves bandwidth, but clients then see a dropped
+    # connection instead of the error response.
+    connection_reset = False
+
+    def __init__(self, request=None, max_size=None, allowed_types=None, skip_invalid=False,
+                 max_files=None):
+        """
+        Initialize CheditoUploadHandler.
+
+        Args:
+            request: The HttpRequest being processed.
+            max_size: Maximum size in bytes of each file (None for no limit).
+            allowed_types: List of allowed MIME types (None to skip the check).
+            skip_invalid: Reject invalid files one by one instead of stopping
+                the whole upload.
+            max_files: Maximum number of files accepted (None for no limit).
+        """
+        super().__init__(request)
+        self.max_size = max_size
+        self.allowed_types = allowed_types
+        self.skip_invalid = skip_invalid
+        self.max_files = max_files
+        self.error = None
+        self._files = 0
+        self._rejected = None
+        self._received = 0
+        self._header = b""
+        self._checked = False
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None,
+                 content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset,
+                         content_type_extra)
+        self._received = 0
+        self._header = b""
+        self._checked = self.allowed_types is None
+        self._rejected = None
+        self._files += 1
+
+        if self.max_files is not None and self._files > self.max_files:
+            self._stop(f"Too many files; at most {self.max_files} can be uploaded at once.")
+        elif content_length is not None and self.max_size is not None and content_length > self.max_size:
+            self._reject_size()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._rejected is not None:
+            return None
+
+        self._received += len(raw_data)
+        if self.max_size is not None and self._received > self.max_size:
+            self._reject_size()
+
+        if not self._checked and self._rejected is None:
+            self._header += raw_data[:HEADER_SIZE - len(self._header)]
+            if len(self._header) >= HEADER_SIZE:
+                self._check_header()
+
+        # Keep the data of a rejected file from the other handlers
+        return None if self._rejected is not None else raw_data
+
+    def file_complete(self, file_size):
+        if not self._checked and self._rejected is None:
+            self._check_header()
+        if self._rejected is not None:
+            return RejectedUpload(self.file_name, self._rejected)
+        # Leave creating the file object to the next handler
+        return None
+
+    def _check_header(self):
+        self._checked = True
+        is_valid, error = check_signature(self._header, self.allowed_types)
+        if not is_valid:
+            self._stop(error)
+
+    def _reject_size(self):
+        max_mb = self.max_size / (1024 * 1024)
+        self._stop(f"File size exceeds maximum allowed ({max_mb:.2f}MB)")
+
+    def _stop(self, error):
+        if self.skip_invalid:
+            # Not SkipFile: Django then closes the other handlers' files,
+            # which may still belong to earlier, accepted uploads.
+            self._rejected = error
+            return
+        self.error = error
+        raise StopUpload(connection_reset=self.connection_reset)
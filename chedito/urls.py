@@ -13,7 +13,21 @@ Include these URLs in your project's urls.py:
 
 from django.urls import path
 
-from chedito.views import ImageUploadView, VideoUploadView, FileUploadView
+from chedito.views import (
+    ChunkedUploadCompleteView,
+    ChunkedUploadView,
+    FileBatchUploadView,
+    FileChunkedUploadView,
+    FileUploadView,
+    ImageBatchUploadView,
+    ImageChunkedUploadView,
+    ImageDerivativeView,
+    ImageUploadView,
+    UploadStatusView,
+    VideoBatchUploadView,
+    VideoChunkedUploadView,
+    VideoUploadView,
+)
 
 app_name = "chedito"
 
@@ -21,4 +35,26 @@ urlpatterns = [
     path("upload/image/", ImageUploadView.as_view(), name="upload_image"),
     path("upload/video/", VideoUploadView.as_view(), name="upload_video"),
     path("upload/file/", FileUploadView.as_view(), name="upload_file"),
+
+    # Several files per request
+    path("upload/image/batch/", ImageBatchUploadView.as_view(), name="batch_upload_image"),
+    path("upload/video/batch/", VideoBatchUploadView.as_view(), name="batch_upload_video"),
+    path("upload/file/batch/", FileBatchUploadView.as_view(), name="batch_upload_file"),
+
+    # Resumable chunked uploads
+    path("upload/image/chunked/", ImageChunkedUploadView.as_view(), name="chunked_upload_image"),
+    path("upload/video/chunked/", VideoChunkedUploadView.as_view(), name="chunked_upload_video"),
+    path("upload/file/chunked/", FileChunkedUploadView.as_view(), name="chunked_upload_file"),
+    path("upload/chunked/<str:upload_id>/", ChunkedUploadView.as_view(), name="chunked_upload"),
+    path(
+        "upload/chunked/<str:upload_id>/complete/",
+        ChunkedUploadCompleteView.as_view(),
+        name="chunked_upload_complete",
+    ),
+
+    # Status of post-upload tasks
+    path("upload/status/<str:job_id>/", UploadStatusView.as_view(), name="upload_status"),
+
+    # Resized copies of uploaded images, used in srcset
+    path("image/<int:width>/<path:name>", ImageDerivativeView.as_view(), name="image_derivative"),
 ]
@@ -4,9 +4,11 @@ Chedito utility functions.
 Provides helper functions for HTML sanitization, file validation, etc.
 """
 
+import io
 import os
 import re
 import uuid
+import codecs
 import mimetypes
 from html.parser import HTMLParser
 from urllib.parse import urlparse
@@ -14,6 +16,8 @@ from urllib.parse import urlparse
 from django.utils.text import slugify
 
 from chedito.conf import chedito_settings
+from chedito.sanitizer import get_backend, get_policy, is_sanitized, mark_sanitized
+from chedito.signatures import SNIFFABLE_TYPES, read_header, sniff
 
 
 class HTMLSanitizer(HTMLParser):
@@ -24,11 +28,14 @@ class HTMLSanitizer(HTMLParser):
     consider using bleach or nh3 for more robust sanitization.
     """
 
-    def __init__(self, allowed_tags=None, allowed_attributes=None, allowed_styles=None):
+    def __init__(self, allowed_tags=None, allowed_attributes=None, allowed_styles=None,
+                 policy=None):
         super().__init__()
-        self.allowed_tags = allowed_tags or chedito_settings.allowed_tags
-        self.allowed_attributes = allowed_attributes or chedito_settings.allowed_attributes
-        self.allowed_styles = allowed_styles or chedito_settings.allowed_styles
+        if policy is None:
+            policy = get_policy(allowed_tags, allowed_attributes, allowed_styles)
+        self.policy = policy
+        self.allowed_tags = policy.allowed_tags
+        self.allowed_styles = policy.allowed_styles
         self.result = []
         self.tag_stack = []
 
@@ -56,9 +63,7 @@ class HTMLSanitizer(HTMLParser):
     def _filter_attributes(self, tag, attrs):
         """Filter attributes based on allowed list."""
         filtered = []
-        global_allowed = self.allowed_attributes.get("*", [])
-        tag_allowed = self.allowed_attributes.get(tag, [])
-        allowed = set(global_allowed + tag_allowed)
+        allowed = self.policy.attributes_for(tag)
 
         for name, value in attrs:
             if name in allowed:
@@ -140,19 +145,31 @@ class HTMLSanitizer(HTMLParser):
         """Get the sanitized HTML string."""
         return "".join(self.result)
 
+    def flush(self):
+        """Return the output produced since the last flush and discard it."""
+        output = "".join(self.result)
+        self.result = []
+        return output
+
 
-def sanitize_html(html_content, allowed_tags=None, allowed_attributes=None, allowed_styles=None):
+def sanitize_html(html_content, allowed_tags=None, allowed_attributes=None, allowed_styles=None,
+                  policy=None):
     """
     Sanitize HTML content by removing disallowed tags and attributes.
 
+    Uses nh3 if installed, then bleach, then the built-in HTMLSanitizer.
+    Content that is already a SanitizedHTML for the same policy is returned
+    without being parsed again.
+
     Args:
         html_content: The HTML string to sanitize.
         allowed_tags: List of allowed tag names.
         allowed_attributes: Dict mapping tag names to allowed attributes.
         allowed_styles: List of allowed CSS property names.
+        policy: A compiled SanitizationPolicy (overrides the allowed_* arguments).
 
     Returns:
-        Sanitized HTML string.
+        Sanitized HTML string (a SanitizedHTML instance).
     """
     if not html_content:
         return ""
@@ -160,37 +177,301 @@ def sanitize_html(html_content, allowed_tags=None, allowed_attributes=None, allo
     if not chedito_settings.sanitize_html:
         return html_content
 
-    try:
-        import nh3
-        return nh3.clean(
-            html_content,
-            tags=set(allowed_tags or chedito_settings.allowed_tags),
-            attributes=allowed_attributes or chedito_settings.allowed_attributes,
-        )
-    except ImportError:
-        pass
-
-    try:
-        import bleach
-        return bleach.clean(
-            html_content,
-            tags=allowed_tags or chedito_settings.allowed_tags,
-            attributes=allowed_attributes or chedito_settings.allowed_attributes,
-            strip=True,
-        )
-    except ImportError:
-        pass
+    if policy is None:
+        policy = get_policy(allowed_tags, allowed_attributes, allowed_styles)
+
+    if is_sanitized(html_content, policy):
+        return html_content
+
+    return mark_sanitized(get_backend().clean(html_content, policy), policy)
+
+
+def iter_sanitize_html(chunks, policy=None, encoding="utf-8"):
+    """
+    Sanitize HTML incrementally, yielding output as input arrives.
+
+    Always uses the built-in HTMLSanitizer, whose memory use is bounded by
+    the size of a chunk plus any incomplete tag carried over to the next one.
+    Unlike ``sanitize_html``, incomplete markup at the very end of the input
+    is flushed as escaped text instead of being dropped.
+
+    Args:
+        chunks: Iterable of str or bytes chunks.
+        policy: A compiled SanitizationPolicy (default policy if omitted).
+        encoding: Encoding used to decode bytes chunks.
+
+    Yields:
+        Sanitized HTML strings.
+    """
+    decoder = None
+    sanitizer = None
+    if chedito_settings.sanitize_html:
+        sanitizer = HTMLSanitizer(policy=policy or get_policy())
+
+    def process(text):
+        if sanitizer is None:
+            return text
+        sanitizer.feed(text)
+        return sanitizer.flush()
+
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            chunk = decoder.decode(chunk)
+        if chunk:
+            output = process(chunk)
+            if output:
+                yield output
+
+    if decoder is not None:
+        output = process(decoder.decode(b"", final=True))
+        if output:
+            yield output
+
+    if sanitizer is not None:
+        sanitizer.close()
+        output = sanitizer.flush()
+        if output:
+            yield output
+
+
+def sanitize_html_stream(source, writer, chunk_size=64 * 1024, policy=None, encoding="utf-8"):
+    """
+    Sanitize HTML from a file-like object or upload into a writer.
+
+    Args:
+        source: UploadedFile, file-like object opened in text or binary mode,
+            or an iterable of str/bytes chunks.
+        writer: Text or binary file-like object to write sanitized HTML to.
+        chunk_size: Number of bytes/characters read at a time.
+        policy: A compiled SanitizationPolicy (default policy if omitted).
+        encoding: Encoding used to decode binary input and encode binary output.
+
+    Returns:
+        Number of characters written.
+    """
+    binary_output = not isinstance(writer, io.TextIOBase)
+    written = 0
+
+    for output in iter_sanitize_html(_read_chunks(source, chunk_size), policy, encoding):
+        writer.write(output.encode(encoding) if binary_output else output)
+        written += len(output)
+
+    return written
+
+
+def _read_chunks(source, chunk_size):
+    """Yield chunks from an UploadedFile, file-like object or iterable."""
+    if hasattr(source, "chunks"):
+        yield from source.chunks(chunk_size)
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from source
+
 
-    # Fallback to our basic sanitizer
-    sanitizer = HTMLSanitizer(allowed_tags, allowed_attributes, allowed_styles)
-    sanitizer.feed(html_content)
-    return sanitizer.get_result()
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def html_to_text(html_content):
+    """
+    Convert HTML to plain text by removing tags and collapsing whitespace.
+
+    Args:
+        html_content: The HTML string.
+
+    Returns:
+        Plain text string.
+    """
+    if not html_content:
+        return ""
+
+    text = _TAG_RE.sub("", html_content)
+    text = _WHITESPACE_RE.sub(" ", text)
+    return text.strip()
+
+
+def iter_html_text(html_content):
+    """
+    Lazily yield the text between the tags of an HTML string.
+
+    Joining the pieces gives the same text ``html_to_text`` removes tags
+    from, so callers can stop reading as soon as they have enough.
+    """
+    pos = 0
+    for match in _TAG_RE.finditer(html_content):
+        if match.start() > pos:
+            yield html_content[pos:match.start()]
+        pos = match.end()
+    if pos < len(html_content):
+        yield html_content[pos:]
+
+
+def html_text_prefix(html_content, length):
+    """
+    Return the start of ``html_to_text(html_content)``, reading only as much as needed.
+
+    Args:
+        html_content: The HTML string.
+        length: Number of characters of plain text wanted.
+
+    Returns:
+        A prefix of the plain text that is longer than ``length`` if the
+        plain text is, else the whole plain text.
+    """
+    parts = []
+    size = 0
+    pending_space = False
+    for piece in iter_html_text(html_content or ""):
+        piece = _WHITESPACE_RE.sub(" ", piece)
+        leading = piece.startswith(" ")
+        trailing = piece.endswith(" ")
+        piece = piece.strip(" ")
+        if not piece:
+            pending_space = pending_space or leading
+            continue
+        if size and (pending_space or leading):
+            parts.append(" ")
+            size += 1
+        parts.append(piece)
+        size += len(piece)
+        pending_space = trailing
+        if size > length:
+            break
+    return "".join(parts)
+
+
+def truncate_text(text, length, ellipsis="..."):
+    """
+    Truncate plain text near a word boundary.
+
+    Args:
+        text: The plain text.
+        length: Maximum character length.
+        ellipsis: String appended when the text is cut.
+
+    Returns:
+        The text, or its first ``length`` characters (backed off to the last
+        space when one is close to the end) followed by ``ellipsis``.
+    """
+    if len(text) <= length:
+        return text
+
+    truncated = text[:length]
+    last_space = truncated.rfind(" ")
+    if last_space > length * 0.8:  # If space is reasonably close to end
+        truncated = truncated[:last_space]
+    return truncated + ellipsis
+
+
+def truncate_html_text(html_content, length, ellipsis="..."):
+    """
+    Convert HTML to plain text truncated to ``length`` characters.
+
+    Equivalent to ``truncate_text(html_to_text(html_content), length)``, but
+    stops reading the document once enough text has been collected.
+    """
+    return truncate_text(html_text_prefix(html_content, length), length, ellipsis)
+
+
+_TAG_NAME_RE = re.compile(r"<(/?)([a-zA-Z][^\s/>]*)")
+_ENTITY_RE = re.compile(r"&#?[a-zA-Z0-9]+;")
+_VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+
+def _cut_text(text, count):
+    """Return the offset in ``text`` after ``count`` characters, counting entities as one."""
+    offset = 0
+    for _ in range(count):
+        match = _ENTITY_RE.match(text, offset)
+        offset = match.end() if match else offset + 1
+    return offset
+
+
+def truncate_html(html_content, length, ellipsis="..."):
+    """
+    Truncate HTML to ``length`` characters of text, keeping the markup.
+
+    The document is walked tag by tag and reading stops once ``length``
+    characters of text have been emitted; elements still open at that point
+    are closed. Character entities count as one character.
+
+    Args:
+        html_content: The HTML string.
+        length: Maximum number of text characters.
+        ellipsis: String appended when the text is cut.
+
+    Returns:
+        Well-nested HTML string.
+    """
+    if not html_content:
+        return ""
+
+    output = []
+    open_tags = []
+    size = 0
+    pos = 0
+    end = len(html_content)
+
+    while pos < end:
+        match = _TAG_RE.search(html_content, pos)
+        text_end = match.start() if match else end
+        if text_end > pos:
+            text = html_content[pos:text_end]
+            text_size = len(text) - sum(len(m) - 1 for m in _ENTITY_RE.findall(text))
+            if size + text_size > length:
+                if text.isspace():
+                    output.append(text)
+                    pos = text_end
+                    continue
+                remaining = length - size
+                cut = text[:_cut_text(text, remaining)]
+                last_space = cut.rfind(" ")
+                if last_space >= 0 and size + last_space > length * 0.8:
+                    cut = cut[:last_space]
+                output.append(cut.rstrip() + ellipsis)
+                break
+            output.append(text)
+            size += text_size
+        if match is None:
+            break
+
+        tag = match.group()
+        output.append(tag)
+        pos = match.end()
+        name_match = _TAG_NAME_RE.match(tag)
+        if name_match is None:
+            continue
+        name = name_match.group(2).lower()
+        if name_match.group(1):
+            if name in open_tags:
+                index = len(open_tags) - 1 - open_tags[::-1].index(name)
+                del open_tags[index:]
+        elif name not in _VOID_ELEMENTS and not tag.endswith("/>"):
+            open_tags.append(name)
+
+    output.extend(f"</{name}>" for name in reversed(open_tags))
+    return "".join(output)
 
 
 def validate_file_type(uploaded_file, allowed_types):
     """
     Validate that an uploaded file is of an allowed type.
 
+    The type is sniffed from the first few KB of the file content, and the
+    file extension must also map to an allowed type. The declared content
+    type is only trusted when the content isn't recognized and some allowed
+    types can't be recognized from content.
+
     Args:
         uploaded_file: Django UploadedFile object.
         allowed_types: List of allowed MIME types.
@@ -204,6 +485,20 @@ def validate_file_type(uploaded_file, allowed_types):
     filename = uploaded_file.name
     guessed_type, _ = mimetypes.guess_type(filename)
 
+    # Objects without readable content fall back to the declared type
+    readable = hasattr(uploaded_file, "read")
+    detected = sniff(read_header(uploaded_file)) if readable else None
+    if detected is not None:
+        if detected.isdisjoint(allowed_types):
+            detected_type = ", ".join(sorted(detected))
+            return False, f"File type '{detected_type}' is not allowed. Allowed types: {', '.join(allowed_types)}"
+        if guessed_type and guessed_type not in allowed_types:
+            return False, f"File extension type '{guessed_type}' is not allowed. Allowed types: {', '.join(allowed_types)}"
+        return True, None
+
+    if readable and SNIFFABLE_TYPES.issuperset(allowed_types):
+        return False, f"File content is not recognized. Allowed types: {', '.join(allowed_types)}"
+
     if content_type in allowed_types:
         return True, None
 
@@ -5,14 +5,22 @@ Handles file uploads for images, videos, and attachments.
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.urls import reverse
 from django.views import View
-from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.utils.decorators import method_decorator
 from django.core.exceptions import PermissionDenied
+from django.utils.cache import patch_cache_control
 
+from chedito.chunked import ChunkedUpload, ChunkedUploadError
 from chedito.conf import chedito_settings
+from chedito.images import generate_derivative, get_widths, is_derivable
+from chedito.tasks import enqueue_upload_tasks, get_job_status
+from chedito.uploadhandler import CheditoUploadHandler, RejectedUpload
 from chedito.utils import validate_file_type, validate_file_size
 
 
@@ -23,11 +31,36 @@ class BaseUploadView(View):
     allowed_types_setting = "allowed_file_types"
     max_size_setting = "max_file_size"
 
-    @method_decorator(csrf_protect)
+    upload_handler = None
+
+    @method_decorator(csrf_exempt)
     def dispatch(self, request, *args, **kwargs):
         """Handle request with CSRF protection."""
+        # The CSRF check reads request.POST, so the upload handler has to be
+        # installed before it runs.
+        if request.method == "POST":
+            self.upload_handler = self.get_upload_handler(request)
+            request.upload_handlers.insert(0, self.upload_handler)
+        return self._dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def _dispatch(self, request, *args, **kwargs):
         return super().dispatch(request, *args, **kwargs)
 
+    def get_upload_handler(self, request):
+        """Get the handler that validates uploads while they are received."""
+        return CheditoUploadHandler(
+            request,
+            max_size=self.get_max_size(),
+            allowed_types=self.get_allowed_types(),
+        )
+
+    def get_upload_error(self):
+        """Get the reason the upload handler stopped the upload, if any."""
+        if self.upload_handler is None:
+            return None
+        return self.upload_handler.error
+
     def check_permissions(self, request):
         """
         Check if the user has permission to upload.
@@ -50,39 +83,86 @@ class BaseUploadView(View):
         """Get the maximum file size for this upload type."""
         return getattr(chedito_settings, self.max_size_setting)
 
-    def post(self, request):
-        """Handle file upload POST request."""
-        try:
-            self.check_permissions(request)
-        except PermissionDenied as e:
-            return JsonResponse({"error": str(e)}, status=403)
+    def process_upload(self, url, upload_type):
+        """
+        Queue the post-upload tasks for a saved file.
+
+        Returns:
+            Dict with the ``job_id`` and ``status_url`` of the queued job, to
+            add to the response; empty when no task applies.
+        """
+        job_id = enqueue_upload_tasks(url, upload_type)
+        if job_id is None:
+            return {}
+        return {"job_id": job_id, "status_url": reverse("chedito:upload_status", args=[job_id])}
+
+    def get_uploaded_file(self, request):
+        """
+        Get and validate the uploaded file.
+
+        Returns:
+            Tuple of (uploaded_file, error_message); uploaded_file is None
+            when the upload is missing or invalid.
+        """
+        # Reading request.FILES runs the upload handlers
+        uploaded_files = request.FILES
+        upload_error = self.get_upload_error()
+        if upload_error:
+            return None, upload_error
 
-        if "file" not in request.FILES:
-            return JsonResponse({"error": "No file provided."}, status=400)
+        if "file" not in uploaded_files:
+            return None, "No file provided."
 
-        uploaded_file = request.FILES["file"]
+        uploaded_file = uploaded_files["file"]
+        error = self.validate_file(uploaded_file)
+        if error:
+            return None, error
 
+        return uploaded_file, None
+
+    def validate_file(self, uploaded_file):
+        """
+        Validate the type and size of an uploaded file.
+
+        Returns:
+            Error message, or None if the file is valid.
+        """
         # Validate file type
         allowed_types = self.get_allowed_types()
         is_valid, error = validate_file_type(uploaded_file, allowed_types)
         if not is_valid:
-            return JsonResponse({"error": error}, status=400)
+            return error
 
         # Validate file size
         max_size = self.get_max_size()
         is_valid, error = validate_file_size(uploaded_file, max_size)
         if not is_valid:
+            return error
+
+        return None
+
+    def post(self, request):
+        """Handle file upload POST request."""
+        try:
+            self.check_permissions(request)
+        except PermissionDenied as e:
+            return JsonResponse({"error": str(e)}, status=403)
+
+        uploaded_file, error = self.get_uploaded_file(request)
+        if error:
             return JsonResponse({"error": error}, status=400)
 
         # Save the file
         try:
             storage = chedito_settings.get_storage()
             url = storage.save(uploaded_file, uploaded_file.name, self.upload_type)
+            job = self.process_upload(url, self.upload_type)
 
             return JsonResponse({
                 "success": True,
                 "url": url,
                 "filename": uploaded_file.name,
+                **job,
             })
 
         except Exception as e:
@@ -115,6 +195,369 @@ class FileUploadView(BaseUploadView):
     max_size_setting = "max_file_size"
 
 
+class AsyncUploadViewMixin:
+    """
+    Run an upload view natively under ASGI.
+
+    The multipart body is parsed and the file saved through the storage's
+    ``asave()`` in worker threads, so neither blocks the event loop or
+    Django's sync thread.
+    """
+
+    @method_decorator(csrf_exempt)
+    async def dispatch(self, request, *args, **kwargs):
+        """Handle request with CSRF protection."""
+        if request.method == "POST":
+            self.upload_handler = self.get_upload_handler(request)
+            request.upload_handlers.insert(0, self.upload_handler)
+            # The CSRF check reads request.POST; parse it off the event loop first
+            await sync_to_async(lambda: request.POST, thread_sensitive=False)()
+        return await self._dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    async def _dispatch(self, request, *args, **kwargs):
+        # Skip BaseUploadView's sync CSRF wrapper; View.dispatch calls the handler
+        return await View.dispatch(self, request, *args, **kwargs)
+
+    async def acheck_permissions(self, request):
+        """
+        Async version of check_permissions, run in a thread as it may query the user.
+
+        Like the other blocking steps of the upload, it runs in a worker
+        thread rather than the thread shared by all sync code, so slow
+        permission checks don't hold up other requests.
+        """
+        await sync_to_async(self.check_permissions, thread_sensitive=False)(request)
+
+    async def post(self, request):
+        """Handle file upload POST request."""
+        try:
+            await self.acheck_permissions(request)
+        except PermissionDenied as e:
+            return JsonResponse({"error": str(e)}, status=403)
+
+        uploaded_file, error = self.get_uploaded_file(request)
+        if error:
+            return JsonResponse({"error": error}, status=400)
+
+        # Save the file
+        try:
+            storage = chedito_settings.get_storage()
+            url = await storage.asave(uploaded_file, uploaded_file.name, self.upload_type)
+            job = await sync_to_async(self.process_upload, thread_sensitive=False)(
+                url, self.upload_type
+            )
+
+            return JsonResponse({
+                "success": True,
+                "url": url,
+                "filename": uploaded_file.name,
+                **job,
+            })
+
+        except Exception as e:
+            return JsonResponse({
+                "error": f"Failed to save file: {str(e)}"
+            }, status=500)
+
+
+class AsyncImageUploadView(AsyncUploadViewMixin, ImageUploadView):
+    """Handle image uploads under ASGI."""
+
+
+class AsyncVideoUploadView(AsyncUploadViewMixin, VideoUploadView):
+    """Handle video uploads under ASGI."""
+
+
+class AsyncFileUploadView(AsyncUploadViewMixin, FileUploadView):
+    """Handle generic file uploads (attachments) under ASGI."""
+
+
+class BatchUploadMixin:
+    """
+    Upload several files in one request.
+
+    Expects the files in ``files`` form fields, at most
+    ``batch_upload_max_files`` of them. Each file is validated on its own
+    and the valid ones are saved concurrently; the response lists a result
+    per file, in the order they were sent. Combined with an upload view,
+    whose type and size settings apply to every file.
+    """
+
+    def get_upload_handler(self, request):
+        """Get a handler that rejects invalid files one by one."""
+        return CheditoUploadHandler(
+            request,
+            max_size=self.get_max_size(),
+            allowed_types=self.get_allowed_types(),
+            skip_invalid=True,
+            max_files=chedito_settings.batch_upload_max_files,
+        )
+
+    def post(self, request):
+        """Handle batch upload POST request."""
+        try:
+            self.check_permissions(request)
+        except PermissionDenied as e:
+            return JsonResponse({"error": str(e)}, status=403)
+
+        uploaded_files = request.FILES.getlist("files")
+        if not uploaded_files:
+            return JsonResponse({"error": "No files provided."}, status=400)
+
+        results = []
+        valid_files = []
+        for uploaded_file in uploaded_files:
+            if isinstance(uploaded_file, RejectedUpload):
+                error = uploaded_file.error
+            else:
+                error = self.validate_file(uploaded_file)
+            if error:
+                results.append({"success": False, "error": error, "filename": uploaded_file.name})
+            else:
+                results.append(None)
+                valid_files.append(uploaded_file)
+
+        saved = iter(self.save_files(valid_files))
+        results = [result or next(saved) for result in results]
+
+        return JsonResponse({
+            "success": all(result["success"] for result in results),
+            "results": results,
+        })
+
+    def save_files(self, uploaded_files):
+        """
+        Save files to storage, several at a time.
+
+        Returns:
+            List of per-file results, in the order of uploaded_files.
+        """
+        storage = chedito_settings.get_storage()
+        workers = min(chedito_settings.batch_upload_workers, len(uploaded_files))
+        if workers <= 1:
+            return [self.save_file(storage, uploaded_file) for uploaded_file in uploaded_files]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda f: self.save_file(storage, f), uploaded_files))
+
+    def save_file(self, storage, uploaded_file):
+        """Save one file and return its result."""
+        try:
+            url = storage.save(uploaded_file, uploaded_file.name, self.upload_type)
+            job = self.process_upload(url, self.upload_type)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to save file: {str(e)}",
+                "filename": uploaded_file.name,
+            }
+        return {"success": True, "url": url, "filename": uploaded_file.name, **job}
+
+
+class ImageBatchUploadView(BatchUploadMixin, ImageUploadView):
+    """Upload several images in one request."""
+
+
+class VideoBatchUploadView(BatchUploadMixin, VideoUploadView):
+    """Upload several videos in one request."""
+
+
+class FileBatchUploadView(BatchUploadMixin, FileUploadView):
+    """Upload several files in one request."""
+
+
+class ChunkedUploadMixin:
+    """Shared helpers for the chunked upload views."""
+
+    def _dispatch(self, request, *args, **kwargs):
+        try:
+            return super()._dispatch(request, *args, **kwargs)
+        except PermissionDenied as e:
+            return JsonResponse({"error": str(e)}, status=403)
+        except ChunkedUploadError as e:
+            return JsonResponse(e.as_dict(), status=e.status)
+
+    def get_user_id(self, request):
+        """Get the identifier that ties an upload session to the current user."""
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return str(user.pk)
+
+    def get_upload(self, request, upload_id):
+        """Check permissions and load the user's upload session."""
+        self.check_permissions(request)
+        return ChunkedUpload.get(upload_id, self.get_user_id(request))
+
+    def describe(self, upload):
+        """Session state plus the URLs the client continues with."""
+        return {
+            **upload.describe(),
+            "url": reverse("chedito:chunked_upload", args=[upload.upload_id]),
+            "complete_url": reverse("chedito:chunked_upload_complete", args=[upload.upload_id]),
+        }
+
+
+class ChunkedUploadStartMixin(ChunkedUploadMixin):
+    """
+    Start a resumable chunked upload.
+
+    Expects ``filename``, ``size`` and optionally ``content_type`` as form
+    fields. Combined with an upload view, whose type and size settings
+    apply to the upload.
+    """
+
+    def post(self, request):
+        """Create an upload session."""
+        self.check_permissions(request)
+
+        try:
+            size = int(request.POST.get("size", ""))
+        except ValueError:
+            return JsonResponse({"error": "Invalid file size."}, status=400)
+
+        upload = ChunkedUpload.create(
+            filename=request.POST.get("filename", ""),
+            size=size,
+            upload_type=self.upload_type,
+            allowed_types=self.get_allowed_types(),
+            max_size=self.get_max_size(),
+            content_type=request.POST.get("content_type"),
+            user_id=self.get_user_id(request),
+        )
+        return JsonResponse(self.describe(upload), status=201)
+
+
+class ImageChunkedUploadView(ChunkedUploadStartMixin, ImageUploadView):
+    """Start a chunked image upload."""
+
+
+class VideoChunkedUploadView(ChunkedUploadStartMixin, VideoUploadView):
+    """Start a chunked video upload."""
+
+
+class FileChunkedUploadView(ChunkedUploadStartMixin, FileUploadView):
+    """Start a chunked file upload."""
+
+
+class ChunkedUploadView(ChunkedUploadMixin, BaseUploadView):
+    """
+    Receive the chunks of an upload session.
+
+    GET returns the session state (the offset to resume from), PUT stores
+    the chunk in the request body at the ``X-Chunk-Offset`` header, and
+    DELETE aborts the upload. An ``X-Chunk-Checksum`` header with the hex
+    SHA-256 digest of the chunk is verified when present.
+    """
+
+    http_method_names = ["get", "put", "delete", "options"]
+
+    def get(self, request, upload_id):
+        """Report the state of an upload session."""
+        upload = self.get_upload(request, upload_id)
+        return JsonResponse(self.describe(upload))
+
+    def put(self, request, upload_id):
+        """Store the next chunk."""
+        upload = self.get_upload(request, upload_id)
+
+        try:
+            offset = int(request.headers.get("X-Chunk-Offset", ""))
+        except ValueError:
+            return JsonResponse({"error": "Missing or invalid X-Chunk-Offset header."}, status=400)
+
+        new_offset = upload.write_chunk(
+            offset, request.body, checksum=request.headers.get("X-Chunk-Checksum")
+        )
+        return JsonResponse({"offset": new_offset, "size": upload.size})
+
+    def delete(self, request, upload_id):
+        """Abort an upload session."""
+        upload = self.get_upload(request, upload_id)
+        upload.delete()
+        return JsonResponse({"success": True})
+
+
+class ChunkedUploadCompleteView(ChunkedUploadMixin, BaseUploadView):
+    """Assemble a fully received upload and save it to storage."""
+
+    def post(self, request, upload_id):
+        """Complete an upload session."""
+        upload = self.get_upload(request, upload_id)
+
+        try:
+            url = upload.complete()
+            job = self.process_upload(url, upload.data["upload_type"])
+        except ChunkedUploadError:
+            raise
+        except Exception as e:
+            return JsonResponse({
+                "error": f"Failed to save file: {str(e)}"
+            }, status=500)
+
+        return JsonResponse({
+            "success": True,
+            "url": url,
+            "filename": upload.filename,
+            **job,
+        })
+
+
+class UploadStatusView(View):
+    """
+    Report the status of the post-upload tasks of an upload.
+
+    Job IDs are random and only given to the uploader, in the upload
+    response.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, job_id):
+        """Return the job status as JSON."""
+        status = get_job_status(job_id)
+        if status is None:
+            return JsonResponse({"error": "Job not found."}, status=404)
+        return JsonResponse(status)
+
+
+class ImageDerivativeView(View):
+    """
+    Redirect to a resized copy of an uploaded image.
+
+    The ``srcset`` added to rendered images points here. The derivative is
+    generated on first request if it wasn't made at upload time; images
+    narrower than the requested width redirect to the original.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    # Seconds browsers may cache the redirect
+    cache_timeout = 24 * 60 * 60
+
+    def get(self, request, width, name):
+        """Redirect to the derivative of the named image."""
+        if not chedito_settings.image_derivatives or width not in get_widths():
+            raise Http404("No such image size.")
+        if not is_derivable(name):
+            raise Http404("Image not found.")
+
+        storage = chedito_settings.get_storage()
+        if not storage.exists(name):
+            raise Http404("Image not found.")
+
+        try:
+            target = generate_derivative(storage, name, width)
+        except Exception:
+            # Not an image Pillow can read, or Pillow is missing
+            target = None
+
+        response = HttpResponseRedirect(storage.url(target or name))
+        patch_cache_control(response, public=True, max_age=self.cache_timeout)
+        return response
+
+
 # Function-based views for backwards compatibility
 def upload_image(request):
     """Function-based view for image uploads."""
@@ -4,13 +4,112 @@ Chedito form widgets.
 Provides RichTextWidget for rendering Quill.js editor in forms.
 """
 
+import hashlib
 import json
 
+import django
 from django import forms
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.template.loader import render_to_string
 
 from chedito.conf import chedito_settings
+from chedito.utils import html_to_text, sanitize_html
+
+# Same escapes as django.utils.html.json_script
+_JSON_SCRIPT_ESCAPES = {
+    ord(">"): "\\u003E",
+    ord("<"): "\\u003C",
+    ord("&"): "\\u0026",
+}
+
+
+def _config_script(element_id, config_json):
+    return format_html(
+        '<script id="{}" type="application/json">{}</script>',
+        element_id,
+        mark_safe(config_json.translate(_JSON_SCRIPT_ESCAPES)),
+    )
+
+
+class ConfigScript:
+    """
+    A Quill configuration as a form media asset.
+
+    The ``<script type="application/json">`` element is named after the
+    fingerprint of the configuration. Django merges equal media assets, so
+    the page's ``{{ form.media }}`` carries each configuration once, however
+    many editors use it.
+    """
+
+    def __init__(self, config_json):
+        """
+        Initialize ConfigScript.
+
+        Args:
+            config_json: Quill configuration serialized as JSON.
+        """
+        self.config_json = config_json
+        digest = hashlib.blake2b(config_json.encode("utf-8"), digest_size=8).hexdigest()
+        self.id = f"chedito-config-{digest}"
+
+    def __html__(self):
+        return _config_script(self.id, self.config_json)
+
+    def __eq__(self, other):
+        return isinstance(other, ConfigScript) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+def get_config_context(config_json, editor_id, in_media=False):
+    """
+    Build the context referring an editor to its Quill configuration.
+
+    When the configuration is part of the form media, the editor only
+    refers to the shared element by ID. Otherwise the editor writes its own
+    element, named after the editor, so it never depends on markup rendered
+    elsewhere (a discarded render or a cached fragment).
+
+    Args:
+        config_json: Quill configuration serialized as JSON.
+        editor_id: ID of the editor container.
+        in_media: Whether the configuration is written by the form media.
+
+    Returns:
+        Dict with the ``config_id`` and the ``config_script`` element, which
+        is empty when the configuration is in the form media.
+    """
+    if in_media:
+        return {"config_id": ConfigScript(config_json).id, "config_script": ""}
+
+    config_id = f"{editor_id}_config"
+    return {"config_id": config_id, "config_script": _config_script(config_id, config_json)}
+
+
+def get_lazy_context(lazy, value):
+    """
+    Build the context of a lazily created editor.
+
+    Until the editor is needed, its container shows the sanitized content as
+    static HTML in place of the Quill instance. With ``sanitize_html``
+    disabled the content is shown as plain text, so stored markup never
+    runs before the editor is created.
+
+    Args:
+        lazy: Whether the editor is created on demand.
+        value: HTML content of the field.
+
+    Returns:
+        Dict with the ``lazy`` flag and the ``preview`` HTML.
+    """
+    if not lazy:
+        return {"lazy": False, "preview": ""}
+
+    if not chedito_settings.sanitize_html:
+        return {"lazy": True, "preview": html_to_text(value or "")}
+    return {"lazy": True, "preview": mark_safe(sanitize_html(value or ""))}
 
 
 class RichTextWidget(forms.Textarea):
@@ -33,15 +132,22 @@ class RichTextWidget(forms.Textarea):
 
     template_name = "chedito/widget.html"
 
-    def __init__(self, quill_config=None, attrs=None):
+    # Whether the Quill configuration is written by the form media rather
+    # than by each editor; only for templates that render {{ form.media }}
+    config_in_media = False
+
+    def __init__(self, quill_config=None, attrs=None, lazy=None):
         """
         Initialize RichTextWidget.
 
         Args:
             quill_config: Custom Quill.js configuration to override defaults.
             attrs: HTML attributes for the widget container.
+            lazy: Create the editor only when it scrolls into view or gains
+                focus (default: the lazy_init setting).
         """
         self.quill_config = quill_config or {}
+        self.lazy = lazy
         default_attrs = {
             "class": "chedito-widget",
             "rows": 10,
@@ -54,6 +160,17 @@ class RichTextWidget(forms.Textarea):
         """Get the merged Quill.js configuration."""
         return chedito_settings.get_quill_config(self.quill_config)
 
+    def get_quill_config_json(self):
+        """Get the merged Quill.js configuration serialized as JSON."""
+        if type(self).get_quill_config is not RichTextWidget.get_quill_config:
+            # Honour subclasses that build the configuration themselves
+            return json.dumps(self.get_quill_config())
+        return chedito_settings.get_quill_config_json(self.quill_config)
+
+    def is_lazy(self):
+        """Whether the editor is created on demand rather than on page load."""
+        return chedito_settings.lazy_init if self.lazy is None else self.lazy
+
     def get_context(self, name, value, attrs):
         """Build the context for rendering the widget template."""
         context = super().get_context(name, value, attrs)
@@ -62,18 +179,20 @@ class RichTextWidget(forms.Textarea):
         widget_id = attrs.get("id", name)
         editor_id = f"{widget_id}_editor"
 
-        # Build Quill configuration
-        quill_config = self.get_quill_config()
+        quill_config = self.get_quill_config_json()
 
         context["widget"].update({
             "editor_id": editor_id,
-            "quill_config": json.dumps(quill_config),
+            "quill_config": quill_config,
+            **get_config_context(quill_config, editor_id, self.config_in_media),
             "widget_height": chedito_settings.widget_height,
             "widget_min_height": chedito_settings.widget_min_height,
             "widget_max_height": chedito_settings.widget_max_height,
             "upload_image_url": "/chedito/upload/image/",
             "upload_video_url": "/chedito/upload/video/",
             "upload_file_url": "/chedito/upload/file/",
+            "batch_upload_max_files": chedito_settings.batch_upload_max_files,
+            **get_lazy_context(self.is_lazy(), context["widget"]["value"]),
         })
 
         return context
@@ -104,6 +223,7 @@ class RichTextWidget(forms.Textarea):
             js=[
                 "chedito/js/quill.min.js",
                 "chedito/js/chedito.js",
+                *([ConfigScript(self.get_quill_config_json())] if self.config_in_media else []),
             ]
         )
 
@@ -112,16 +232,21 @@ class AdminRichTextWidget(RichTextWidget):
     """
     RichTextWidget optimized for Django Admin.
 
-    Includes additional styling for admin integration.
+    Includes additional styling for admin integration. The admin always
+    renders form media, so the Quill configuration is written there, once
+    per page.
     """
 
-    def __init__(self, quill_config=None, attrs=None):
+    # Media assets with __html__ need Django 4.1
+    config_in_media = django.VERSION >= (4, 1)
+
+    def __init__(self, quill_config=None, attrs=None, lazy=None):
         default_attrs = {
             "class": "chedito-widget chedito-admin-widget vLargeTextField",
         }
         if attrs:
             default_attrs.update(attrs)
-        super().__init__(quill_config=quill_config, attrs=default_attrs)
+        super().__init__(quill_config=quill_config, attrs=default_attrs, lazy=lazy)
 
     @property
     def media(self):
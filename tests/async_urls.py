@@ -0,0 +1,9 @@
+"""
+URL configuration for Chedito tests that only includes the async URLs.
+"""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path('chedito/', include('chedito.async_urls')),
+]
@@ -36,3 +36,50 @@ class Comment(models.Model):
 
     def __str__(self):
         return f'Comment by {self.author}'
+
+
+class Post(models.Model):
+    """Test model that sanitizes on save into a companion column."""
+
+    body = RichTextField(sanitized_field='body_html', policy_field='body_policy')
+    body_html = models.TextField(blank=True, editable=False)
+    body_policy = models.CharField(max_length=16, blank=True, editable=False)
+
+    def __str__(self):
+        return self.body[:50]
+
+
+class Note(models.Model):
+    """Test model that sanitizes on save in place."""
+
+    text = RichTextField(sanitize_on_save=True)
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class Memo(models.Model):
+    """Test model that sanitizes on save in place and seals the stored value."""
+
+    text = RichTextField(sanitize_on_save=True, policy_field='text_policy')
+    text_policy = models.CharField(max_length=16, blank=True, editable=False)
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class Story(models.Model):
+    """Test model that keeps plain-text companions of its rich text."""
+
+    body = RichTextField(
+        text_field='body_text',
+        excerpt_field='body_excerpt',
+        excerpt_length=20,
+        digest_field='body_digest',
+    )
+    body_text = models.TextField(blank=True, editable=False)
+    body_excerpt = models.CharField(max_length=20, blank=True, editable=False)
+    body_digest = models.CharField(max_length=16, blank=True, editable=False)
+
+    def __str__(self):
+        return self.body[:50]
@@ -0,0 +1,68 @@
+"""
+Tests for Chedito asset tags.
+"""
+
+import base64
+import hashlib
+from unittest import mock
+
+from django.contrib.staticfiles import finders
+from django.test import TestCase, override_settings
+
+from chedito import assets
+from chedito.templatetags.chedito_tags import chedito_assets, chedito_css, chedito_js
+
+
+class AssetTagTests(TestCase):
+    """Tests for chedito_css, chedito_js and chedito_assets."""
+
+    def test_default_output(self):
+        """Test the plain stylesheet and script tags."""
+        self.assertEqual(
+            chedito_css(),
+            '<link rel="stylesheet" href="/static/chedito/css/quill.snow.css">\n'
+            '<link rel="stylesheet" href="/static/chedito/css/chedito.css">',
+        )
+        self.assertEqual(
+            chedito_js(),
+            '<script src="/static/chedito/js/quill.min.js"></script>\n'
+            '<script src="/static/chedito/js/chedito.js"></script>',
+        )
+        self.assertEqual(chedito_assets(), f'{chedito_css()}\n{chedito_js()}')
+
+    def test_tags_are_built_once(self):
+        """Test that static URLs are resolved on the first render only."""
+        assets.reset_asset_cache()
+        with mock.patch.object(assets, 'static', wraps=assets.static) as static:
+            chedito_css()
+            chedito_css()
+            chedito_js()
+            chedito_js()
+
+        self.assertEqual(static.call_count, 4)
+
+    @override_settings(CHEDITO_CONFIG={'quill_theme': 'bubble'})
+    def test_tags_follow_settings(self):
+        """Test that changed settings produce new tags."""
+        self.assertIn('quill.bubble.css', chedito_css())
+
+    @override_settings(CHEDITO_CONFIG={'asset_preload': True, 'asset_defer': True})
+    def test_preload_and_defer(self):
+        """Test that scripts are preloaded from the head and deferred."""
+        self.assertIn(
+            '<link rel="preload" href="/static/chedito/js/quill.min.js" as="script">', chedito_css()
+        )
+        self.assertIn('<script src="/static/chedito/js/chedito.js" defer></script>', chedito_js())
+
+    @override_settings(CHEDITO_CONFIG={'asset_integrity': True})
+    def test_integrity(self):
+        """Test that integrity attributes hold the SHA-384 digest of each file."""
+        with open(finders.find('chedito/js/chedito.js'), 'rb') as f:
+            digest = base64.b64encode(hashlib.sha384(f.read()).digest()).decode('ascii')
+
+        self.assertIn(
+            f'<script src="/static/chedito/js/chedito.js" integrity="sha384-{digest}" '
+            'crossorigin="anonymous"></script>',
+            chedito_js(),
+        )
+        self.assertIsNone(assets.get_integrity('chedito/js/missing.js'))
@@ -0,0 +1,81 @@
+"""
+Tests for the Chedito sanitized-output cache.
+"""
+
+from django.test import TestCase, override_settings
+
+from chedito.cache import SanitizeCache, cached_sanitize_html, get_sanitize_cache
+from chedito.conf import chedito_settings
+from chedito.sanitizer import get_policy
+
+
+class SanitizeCacheTests(TestCase):
+    """Tests for SanitizeCache."""
+
+    def test_lru_eviction(self):
+        """Test that the in-process tier is size-bounded."""
+        cache = SanitizeCache(max_size=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.get('a')
+        cache.set('c', '3')
+
+        self.assertEqual(cache.get('a'), '1')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted."""
+        cache = SanitizeCache(max_size=10)
+        cache.get('missing')
+        cache.set('key', 'value')
+        cache.get('key')
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_key_depends_on_policy(self):
+        """Test that the key changes with the sanitization policy."""
+        cache = SanitizeCache(max_size=10)
+        html = '<p>Hello</p>'
+        self.assertNotEqual(
+            cache.make_key(html, get_policy()),
+            cache.make_key(html, get_policy(['p'])),
+        )
+
+    def test_django_cache_tier(self):
+        """Test that the shared tier serves values missing locally."""
+        shared = SanitizeCache(cache_alias='default')
+        shared.set('chedito-test-key', '<p>cached</p>')
+
+        cache = SanitizeCache(max_size=10, cache_alias='default')
+        self.assertEqual(cache.get('chedito-test-key'), '<p>cached</p>')
+        self.assertEqual(cache.stats()['size'], 1)
+
+
+class CachedSanitizeHTMLTests(TestCase):
+    """Tests for cached_sanitize_html."""
+
+    def tearDown(self):
+        chedito_settings.reload()
+
+    def test_disabled_by_default(self):
+        """Test that no entries are stored without configuration."""
+        cached_sanitize_html('<p>Hello</p>')
+        self.assertFalse(get_sanitize_cache().enabled)
+
+    @override_settings(CHEDITO_CONFIG={'sanitize_cache_size': 16})
+    def test_repeated_content_hits_cache(self):
+        """Test that sanitizing the same content twice hits the cache."""
+        chedito_settings.reload()
+        html = '<p>Hello</p><script>alert(1)</script>'
+
+        first = cached_sanitize_html(html)
+        second = cached_sanitize_html(html)
+
+        self.assertEqual(first, second)
+        self.assertNotIn('<script>', second)
+        stats = get_sanitize_cache().stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
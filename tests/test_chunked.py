@@ -0,0 +1,179 @@
+"""
+Tests for Chedito chunked uploads.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from chedito.chunked import ChunkedUpload, ChunkedUploadError, purge_expired_uploads
+from chedito.conf import chedito_settings
+
+
+MP4 = b'\x00\x00\x00\x18ftypmp42' + bytes(range(256)) * 4
+
+
+class ChunkedUploadTests(TestCase):
+    """Tests for the chunked upload API."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.chunks_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.temp_dir,
+            CHEDITO_CONFIG={'chunked_upload_chunk_size': 512, 'chunked_upload_dir': self.chunks_dir},
+        )
+        self.settings_override.enable()
+        chedito_settings.reload()
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = Client()
+        self.client.login(username='testuser', password='testpass123')
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.settings_override.disable()
+        chedito_settings.reload()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        shutil.rmtree(self.chunks_dir, ignore_errors=True)
+
+    def start(self, data=MP4, filename='clip.mp4', client=None):
+        response = (client or self.client).post(
+            '/chedito/upload/video/chunked/', {'filename': filename, 'size': len(data)}
+        )
+        return response, json.loads(response.content)
+
+    def put(self, session, offset, chunk, checksum=None, client=None):
+        headers = {'HTTP_X_CHUNK_OFFSET': str(offset)}
+        if checksum is not None:
+            headers['HTTP_X_CHUNK_CHECKSUM'] = checksum
+        response = (client or self.client).put(
+            session['url'], chunk, content_type='application/octet-stream', **headers
+        )
+        return response, json.loads(response.content)
+
+    def test_upload_in_chunks(self):
+        """Test that a file sent in chunks is assembled and saved."""
+        response, session = self.start()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(session['chunk_size'], 512)
+
+        offset = 0
+        while offset < len(MP4):
+            chunk = MP4[offset:offset + 512]
+            response, data = self.put(session, offset, chunk, hashlib.sha256(chunk).hexdigest())
+            self.assertEqual(response.status_code, 200)
+            offset = data['offset']
+
+        response = self.client.post(session['complete_url'])
+        self.assertEqual(response.status_code, 200)
+        url = json.loads(response.content)['url']
+
+        with open(os.path.join(self.temp_dir, url.replace('/media/', '')), 'rb') as saved:
+            self.assertEqual(saved.read(), MP4)
+        self.assertEqual(self.client.get(session['url']).status_code, 404)
+
+    def test_chunks_are_kept_out_of_media(self):
+        """Test that chunks are stored in the private directory, not MEDIA_ROOT."""
+        response, session = self.start()
+        self.put(session, 0, MP4[:512])
+
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.chunks_dir, session['upload_id']))),
+            ['000000000000.part', 'session.json', 'session.lock'],
+        )
+
+    def test_concurrent_chunks_are_serialized(self):
+        """Test that a request holding a stale session can't store the same chunk again."""
+        response, session = self.start()
+        first = ChunkedUpload.get(session['upload_id'], str(self.user.pk))
+        second = ChunkedUpload.get(session['upload_id'], str(self.user.pk))
+
+        self.assertEqual(first.write_chunk(0, MP4[:512]), 512)
+        with self.assertRaises(ChunkedUploadError) as cm:
+            second.write_chunk(0, MP4[:512])
+        self.assertEqual(cm.exception.status, 409)
+        self.assertEqual(second.write_chunk(512, MP4[512:1024]), 1024)
+        self.assertEqual(second.data['parts'], ['000000000000.part', '000000000512.part'])
+
+    def test_resume_after_lost_chunk(self):
+        """Test that an out-of-order chunk reports the offset to resume from."""
+        response, session = self.start()
+        self.put(session, 0, MP4[:512])
+
+        response, data = self.put(session, 1024, MP4[1024:1536])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(data['offset'], 512)
+        self.assertEqual(json.loads(self.client.get(session['url']).content)['offset'], 512)
+
+    def test_checksum_mismatch_is_rejected(self):
+        """Test that a corrupted chunk is refused."""
+        response, session = self.start()
+        response, data = self.put(session, 0, MP4[:512], checksum='0' * 64)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(data['offset'], 0)
+
+    def test_disallowed_content_is_rejected_on_first_chunk(self):
+        """Test that the first chunk is checked against the allowed types."""
+        pdf = b'%PDF-1.7\n' + b'\x00' * 600
+        response, session = self.start(pdf)
+        response, data = self.put(session, 0, pdf[:512])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(session['url']).status_code, 404)
+
+    def test_incomplete_upload_cannot_be_completed(self):
+        """Test that completing requires every byte."""
+        response, session = self.start()
+        self.put(session, 0, MP4[:512])
+
+        response = self.client.post(session['complete_url'])
+        self.assertEqual(response.status_code, 409)
+
+    def test_oversized_upload_is_refused(self):
+        """Test that the declared size is checked against the limit."""
+        response = self.client.post(
+            '/chedito/upload/video/chunked/', {'filename': 'clip.mp4', 'size': 10 ** 12}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_sessions_belong_to_their_user(self):
+        """Test that another user can't touch an upload session."""
+        response, session = self.start()
+        User.objects.create_user(username='other', password='testpass123')
+        other = Client()
+        other.login(username='other', password='testpass123')
+
+        response, data = self.put(session, 0, MP4[:512], client=other)
+        self.assertEqual(response.status_code, 404)
+
+    def test_expired_sessions_are_purged(self):
+        """Test that abandoned sessions expire and are deleted."""
+        response, session = self.start()
+        self.put(session, 0, MP4[:512])
+
+        upload = ChunkedUpload.get(session['upload_id'], str(self.user.pk))
+        upload.data['expires'] = time.time() - 1
+        upload._save_session()
+
+        self.assertEqual(purge_expired_uploads(), 1)
+        self.assertEqual(os.listdir(self.chunks_dir), [])
+        self.assertEqual(self.client.get(session['url']).status_code, 404)
+
+    def test_purge_command(self):
+        """Test that the management command reports purged sessions."""
+        from io import StringIO
+
+        out = StringIO()
+        call_command('chedito_purge_uploads', stdout=out)
+        self.assertIn('Deleted 0', out.getvalue())
@@ -0,0 +1,143 @@
+"""
+Tests for Chedito management commands.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from chedito.conf import chedito_settings
+from chedito.sanitizer import get_policy
+from tests.models import Article, Comment, Post
+
+
+DIRTY = '<p>Hello</p><script>alert(1)</script>'
+
+
+class ResanitizeCommandTests(TestCase):
+    """Tests for the chedito_resanitize command."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        # Write unsanitized values directly, bypassing the fields
+        self.article = Article.objects.create(title='a', content='<p>ok</p>')
+        Article.objects.filter(pk=self.article.pk).update(content=DIRTY, summary=DIRTY)
+        self.post = Post.objects.create(body='<p>ok</p>')
+        Post.objects.filter(pk=self.post.pk).update(body=DIRTY, body_html='', body_policy='old')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_command(self, *args, **options):
+        out = StringIO()
+        call_command('chedito_resanitize', *args, workers=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_resanitizes_in_place(self):
+        """Test that stored values are re-sanitized and written back."""
+        output = self.run_command('tests.Article')
+
+        self.article.refresh_from_db()
+        self.assertNotIn('<script>', self.article.content)
+        self.assertNotIn('<script>', self.article.summary)
+        self.assertEqual(self.article.title, 'a')
+        self.assertIn('rows/s', output)
+
+    def test_updates_companion_column(self):
+        """Test that sanitized_field and policy_field are refreshed, raw value kept."""
+        self.run_command('tests.Post')
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.body, DIRTY)
+        self.assertNotIn('<script>', self.post.body_html)
+        self.assertEqual(
+            self.post.body_policy,
+            Post._meta.get_field('body').get_seal(get_policy(), DIRTY, self.post.body_html),
+        )
+        with mock.patch('chedito.utils.sanitize_html') as sanitize_html:
+            self.assertEqual(self.post.get_body_sanitized(), self.post.body_html)
+        sanitize_html.assert_not_called()
+
+    def test_concurrent_edits_are_kept(self):
+        """Test that a row edited after it was read is sanitized from its new value."""
+        from chedito.management.commands.chedito_resanitize import Command
+
+        edited = '<p>Edited</p><script>alert(2)</script>'
+        sanitize_rows = Command.sanitize_rows
+
+        def edit_after_read(command, model, rows, *args):
+            changed = sanitize_rows(command, model, rows, *args)
+            if model is Article and len(rows) == 1 and rows[0][1] == DIRTY:
+                Article.objects.filter(pk=self.article.pk).update(content=edited)
+            return changed
+
+        with mock.patch.object(Command, 'sanitize_rows', edit_after_read):
+            output = self.run_command('tests.Article')
+
+        self.article.refresh_from_db()
+        self.assertIn('Edited', self.article.content)
+        self.assertNotIn('<script>', self.article.content)
+        self.assertNotIn('<script>', self.article.summary)
+        self.assertIn('1 updated', output)
+
+    def test_dry_run_writes_nothing(self):
+        """Test that --dry-run only reports."""
+        output = self.run_command('tests', dry_run=True)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.content, DIRTY)
+        self.assertIn('would change', output)
+
+    def test_small_chunks(self):
+        """Test that rows are processed across several primary-key chunks."""
+        comments = [Comment(article=self.article, author=str(i), body=DIRTY) for i in range(5)]
+        Comment.objects.bulk_create(comments)
+
+        self.run_command('tests.Comment', chunk_size=2)
+
+        self.assertFalse(Comment.objects.filter(body__contains='<script>').exists())
+
+    def test_checkpoint_resumes(self):
+        """Test that completed models are skipped when resuming."""
+        path = os.path.join(self.temp_dir, 'checkpoint.json')
+        self.run_command('tests.Article', checkpoint=path)
+
+        with open(path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertTrue(checkpoint['models']['tests.Article']['done'])
+
+        Article.objects.filter(pk=self.article.pk).update(content=DIRTY)
+        output = self.run_command('tests.Article', checkpoint=path)
+
+        self.assertIn('already completed', output)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.content, DIRTY)
+
+    def test_process_pool(self):
+        """Test sanitizing across worker processes."""
+        call_command('chedito_resanitize', 'tests.Article', workers=2, stdout=StringIO())
+
+        self.article.refresh_from_db()
+        self.assertNotIn('<script>', self.article.content)
+
+    def test_unknown_label(self):
+        """Test that an unknown model label is an error."""
+        with self.assertRaises(CommandError):
+            self.run_command('tests.Missing')
+
+    @override_settings(CHEDITO_CONFIG={'sanitize_html': False})
+    def test_refuses_when_sanitization_disabled(self):
+        """Test that the command refuses to run with sanitization disabled."""
+        chedito_settings.reload()
+        try:
+            with self.assertRaises(CommandError):
+                self.run_command()
+        finally:
+            chedito_settings.reload()
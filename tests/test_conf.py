@@ -0,0 +1,78 @@
+"""
+Tests for Chedito settings.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from chedito.conf import DEFAULTS, SettingsSnapshot, chedito_settings
+
+
+class SettingsSnapshotTests(TestCase):
+    """Tests for SettingsSnapshot."""
+
+    def test_settings_fall_back_to_defaults(self):
+        """Test that unset settings take their default value."""
+        snapshot = SettingsSnapshot({'max_image_size': 1024})
+
+        self.assertEqual(snapshot.max_image_size, 1024)
+        self.assertEqual(snapshot.max_video_size, DEFAULTS['max_video_size'])
+
+    def test_list_settings_keep_their_types(self):
+        """Test that list settings stay lists, copied, and the snapshot is read-only."""
+        allowed_tags = ['p', 'b']
+        snapshot = SettingsSnapshot({'allowed_tags': allowed_tags})
+
+        self.assertEqual(snapshot.allowed_tags + ['i'], ['p', 'b', 'i'])
+        self.assertIsNot(snapshot.allowed_tags, allowed_tags)
+        self.assertEqual(snapshot.allowed_attributes['a'], ['href', 'title', 'target', 'rel'])
+        self.assertIsInstance(snapshot.allowed_attributes, dict)
+        with self.assertRaises(AttributeError):
+            snapshot.allowed_tags = ['i']
+
+    def test_invalid_settings_are_rejected(self):
+        """Test that settings of the wrong type raise ImproperlyConfigured."""
+        with self.assertRaises(ImproperlyConfigured):
+            SettingsSnapshot(['allowed_tags'])
+        with self.assertRaises(ImproperlyConfigured):
+            SettingsSnapshot({'allowed_tags': 'p'})
+        with self.assertRaises(ImproperlyConfigured):
+            SettingsSnapshot({'allowed_attributes': ['a']})
+
+    def test_extra_settings_are_kept(self):
+        """Test that keys that are not chedito settings remain readable."""
+        snapshot = SettingsSnapshot({'custom_option': 1})
+
+        self.assertEqual(snapshot.extra['custom_option'], 1)
+
+
+class CheditoSettingsTests(TestCase):
+    """Tests for the chedito_settings object."""
+
+    def test_settings_are_read_from_the_snapshot(self):
+        """Test that settings are plain attributes once resolved."""
+        chedito_settings.reload()
+        self.assertNotIn('max_image_size', vars(chedito_settings))
+
+        self.assertEqual(chedito_settings.max_image_size, chedito_settings.snapshot.max_image_size)
+        self.assertIn('max_image_size', vars(chedito_settings))
+
+    def test_snapshot_is_rebuilt_when_settings_change(self):
+        """Test that override_settings replaces the snapshot."""
+        snapshot = chedito_settings.snapshot
+        with override_settings(CHEDITO_CONFIG={'max_image_size': 1024, 'custom_option': 1}):
+            self.assertEqual(chedito_settings.max_image_size, 1024)
+            self.assertEqual(chedito_settings.custom_option, 1)
+            self.assertIsNot(chedito_settings.snapshot, snapshot)
+
+        self.assertEqual(chedito_settings.max_image_size, DEFAULTS['max_image_size'])
+        self.assertIsNone(chedito_settings.get('custom_option'))
+        self.assertRaises(AttributeError, getattr, chedito_settings, 'not_a_setting')
+
+    @override_settings(CHEDITO_CONFIG={'get': 1, 'reload': 2, 'custom_option': 3})
+    def test_extra_settings_do_not_shadow_methods(self):
+        """Test that only chedito settings become attributes."""
+        self.assertEqual(chedito_settings.custom_option, 3)
+        self.assertEqual(chedito_settings.get('custom_option'), 3)
+        self.assertTrue(callable(chedito_settings.reload))
+        self.assertNotIn('custom_option', vars(chedito_settings))
@@ -81,3 +81,187 @@ class RichTextFormFieldTests(TestCase):
         result = field.clean(html)
         self.assertIn('Hello', result)
         self.assertIn('World', result)
+
+
+class SanitizeOnSaveTests(TestCase):
+    """Tests for RichTextField sanitize-on-save."""
+
+    def test_in_place_sanitization(self):
+        """Test that the value is sanitized before it is saved."""
+        from tests.models import Note
+
+        note = Note.objects.create(text='<p>Hi</p><script>alert(1)</script>')
+        note.refresh_from_db()
+        self.assertNotIn('<script>', note.text)
+        self.assertEqual(note.get_text_sanitized(), note.text)
+
+    def test_companion_column(self):
+        """Test that the sanitized value and policy are stored alongside the raw value."""
+        from chedito.sanitizer import get_policy
+        from tests.models import Post
+
+        raw = '<p>Hi</p><script>alert(1)</script>'
+        post = Post.objects.create(body=raw)
+        post.refresh_from_db()
+
+        self.assertEqual(post.body, raw)
+        self.assertNotIn('<script>', post.body_html)
+        field = Post._meta.get_field('body')
+        self.assertEqual(post.body_policy, field.get_seal(get_policy(), post.body, post.body_html))
+        self.assertEqual(post.get_body_sanitized(), post.body_html)
+
+    def test_stale_policy_is_resanitized(self):
+        """Test that a changed policy triggers re-sanitization on read."""
+        from chedito.sanitizer import get_policy
+        from tests.models import Post
+
+        post = Post.objects.create(body='<p>Hi</p>')
+        Post.objects.filter(pk=post.pk).update(body_html='stale', body_policy='old')
+        post.refresh_from_db()
+
+        self.assertEqual(post.get_body_sanitized(), '<p>Hi</p>')
+        field = Post._meta.get_field('body')
+        self.assertEqual(post.body_policy, field.get_seal(get_policy(), post.body, '<p>Hi</p>'))
+
+    def test_reassigned_value_is_resanitized(self):
+        """Test that a new raw value is never served from the stored columns."""
+        from tests.models import Memo, Post
+
+        post = Post.objects.create(body='<p>Old</p>')
+        post.body = '<p onclick="alert(1)">New</p>'
+        self.assertEqual(post.get_body_sanitized(), '<p>New</p>')
+
+        memo = Memo.objects.create(text='<p>Old</p>')
+        memo.text = '<script>alert(1)</script>'
+        self.assertNotIn('<script>', memo.get_text_sanitized())
+
+    def test_rows_written_by_update_are_resanitized(self):
+        """Test that values written outside save() are not trusted."""
+        from tests.models import Memo, Note, Post
+
+        post = Post.objects.create(body='<p>Hi</p>')
+        Post.objects.filter(pk=post.pk).update(body='<script>alert(1)</script>')
+        post.refresh_from_db()
+        self.assertNotIn('<script>', post.get_body_sanitized())
+
+        memo = Memo.objects.create(text='<p>Hi</p>')
+        Memo.objects.filter(pk=memo.pk).update(text='<script>alert(1)</script>')
+        memo.refresh_from_db()
+        self.assertNotIn('<script>', memo.get_text_sanitized())
+
+        note = Note.objects.create(text='<p>Hi</p>')
+        Note.objects.filter(pk=note.pk).update(text='<p>Hi</p><script>alert(1)</script>')
+        note.refresh_from_db()
+        self.assertNotIn('<script>', note.get_text_sanitized())
+
+    def test_deconstruct_sanitize_options(self):
+        """Test that sanitize-on-save options survive deconstruction."""
+        field = RichTextField(sanitized_field='body_html', policy_field='body_policy')
+        name, path, args, kwargs = field.deconstruct()
+
+        self.assertEqual(kwargs['sanitized_field'], 'body_html')
+        self.assertEqual(kwargs['policy_field'], 'body_policy')
+        self.assertNotIn('sanitize_on_save', kwargs)
+
+
+class PlainTextCompanionTests(TestCase):
+    """Tests for RichTextField plain-text and excerpt companions."""
+
+    def test_companions_are_stored_on_save(self):
+        """Test that the plain text and excerpt are computed on save."""
+        from tests.models import Story
+
+        story = Story.objects.create(body='<p>Hello <b>big</b></p> <p>wide world of text</p>')
+        story.refresh_from_db()
+
+        self.assertEqual(story.body_text, 'Hello big wide world of text')
+        self.assertEqual(story.body_excerpt, 'Hello big wide world')
+        self.assertEqual(story.body.plain_text, story.body_text)
+
+    def test_filters_use_stored_text(self):
+        """Test that strip_tags and truncate_richtext skip HTML parsing."""
+        from unittest import mock
+        from chedito.templatetags.chedito_tags import strip_tags_filter, truncate_richtext_filter
+        from tests.models import Story
+
+        Story.objects.create(body='<p>Hello <b>big</b></p> <p>wide world of text</p>')
+        story = Story.objects.get()
+
+        with mock.patch('chedito.templatetags.chedito_tags.html_to_text') as html_to_text:
+            self.assertEqual(strip_tags_filter(story.body), 'Hello big wide world of text')
+            self.assertEqual(truncate_richtext_filter(story.body, 9), 'Hello big...')
+            self.assertEqual(
+                truncate_richtext_filter(story.body, 100), 'Hello big wide world of text'
+            )
+        html_to_text.assert_not_called()
+
+    def test_reassignment_drops_stale_text(self):
+        """Test that changing the HTML invalidates the loaded companions."""
+        from tests.models import Story
+
+        story = Story.objects.create(body='<p>Old</p>')
+        story.refresh_from_db()
+        story.body = '<p>New</p>'
+
+        self.assertNotIsInstance(story.body, type(Story.objects.get().body))
+        story.save()
+        self.assertEqual(Story.objects.get().body_text, 'New')
+
+    def test_update_fields_drops_stale_text(self):
+        """Test that companions not saved with the HTML are ignored."""
+        from chedito.templatetags.chedito_tags import strip_tags_filter, truncate_richtext_filter
+        from tests.models import Story
+
+        story = Story.objects.create(body='<p>old text</p>')
+        story.body = '<p>new text</p>'
+        story.save(update_fields=['body'])
+        story = Story.objects.get()
+
+        self.assertEqual(story.body_text, 'old text')
+        self.assertEqual(strip_tags_filter(story.body), 'new text')
+        self.assertEqual(truncate_richtext_filter(story.body, 5), 'new t...')
+
+    def test_queryset_update_drops_stale_text(self):
+        """Test that HTML written by QuerySet.update() is parsed again."""
+        from chedito.templatetags.chedito_tags import strip_tags_filter, truncate_richtext_filter
+        from tests.models import Story
+
+        Story.objects.create(body='<p>old text</p>')
+        Story.objects.update(body='<p>new text</p>')
+        story = Story.objects.get()
+
+        self.assertIsNone(getattr(story.body, 'plain_text', None))
+        self.assertEqual(strip_tags_filter(story.body), 'new text')
+        self.assertEqual(truncate_richtext_filter(story.body, 5), 'new t...')
+
+    def test_companions_require_digest_field(self):
+        """Test that companions without a digest_field fail the system check."""
+        from django.db import models
+        from django.test.utils import isolate_apps
+
+        with isolate_apps('tests'):
+            class Note(models.Model):
+                body = RichTextField(text_field='body_text')
+                body_text = models.TextField(blank=True)
+
+                class Meta:
+                    app_label = 'tests'
+
+            errors = Note._meta.get_field('body').check()
+
+        self.assertEqual([error.id for error in errors], ['chedito.E001'])
+
+    def test_deconstruct_companion_options(self):
+        """Test that companion options survive deconstruction."""
+        field = RichTextField(
+            text_field='body_text',
+            excerpt_field='body_excerpt',
+            excerpt_length=50,
+            digest_field='body_digest',
+        )
+        name, path, args, kwargs = field.deconstruct()
+
+        self.assertEqual(kwargs['text_field'], 'body_text')
+        self.assertEqual(kwargs['excerpt_field'], 'body_excerpt')
+        self.assertEqual(kwargs['excerpt_length'], 50)
+        self.assertEqual(kwargs['digest_field'], 'body_digest')
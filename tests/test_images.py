@@ -0,0 +1,156 @@
+"""
+Tests for Chedito image derivatives.
+"""
+
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import skipUnless
+
+from django.test import TestCase, override_settings
+
+from chedito.conf import chedito_settings
+from chedito.images import add_srcset, derivative_name, generate_derivatives, is_derivable
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+DERIVATIVES_CONFIG = {
+    'upload_path': 'test_uploads/',
+    'storage_backend': 'chedito.storage.local.LocalStorage',
+    'image_derivatives': True,
+    'image_derivative_widths': [320, 640, 1280],
+    'upload_task_backend': 'chedito.tasks.SyncTaskBackend',
+}
+
+
+def make_png(width, height=50):
+    """Encode a solid PNG image of the given size."""
+    output = BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(output, 'PNG')
+    output.seek(0)
+    return output
+
+
+class DerivativeNameTests(TestCase):
+    """Tests for derivative naming and eligibility."""
+
+    def test_derivative_name(self):
+        """Test that derivatives sit next to the original in the configured format."""
+        self.assertEqual(
+            derivative_name('test_uploads/images/photo_ab12cd34.jpg', 640),
+            'test_uploads/images/photo_ab12cd34.w640.webp',
+        )
+
+    def test_is_derivable(self):
+        """Test that only chedito-uploaded raster images qualify."""
+        self.assertTrue(is_derivable('test_uploads/images/photo_ab12cd34.png'))
+        self.assertFalse(is_derivable('test_uploads/images/anim_ab12cd34.gif'))
+        self.assertFalse(is_derivable('test_uploads/files/photo_ab12cd34.png'))
+        self.assertFalse(is_derivable('test_uploads/images/photo_ab12cd34.w640.webp'))
+        self.assertFalse(is_derivable('test_uploads/images/../../secret.png'))
+        self.assertFalse(is_derivable(None))
+
+
+@override_settings(CHEDITO_CONFIG=DERIVATIVES_CONFIG)
+class SrcsetTests(TestCase):
+    """Tests for the srcset rewriting of rendered content."""
+
+    def test_uploaded_images_get_srcset(self):
+        """Test that srcset points at the derivative view for each width."""
+        html = add_srcset('<p><img src="/media/test_uploads/images/a_12345678.png" alt="A"></p>')
+        self.assertIn(
+            'srcset="/chedito/image/320/test_uploads/images/a_12345678.png 320w, '
+            '/chedito/image/640/test_uploads/images/a_12345678.png 640w, '
+            '/chedito/image/1280/test_uploads/images/a_12345678.png 1280w"',
+            html,
+        )
+        self.assertTrue(html.endswith('></p>'))
+
+    def test_other_images_are_left_alone(self):
+        """Test that external images and existing srcsets are not changed."""
+        external = '<img src="https://example.com/a.png">'
+        existing = '<img src="/media/test_uploads/images/a_12345678.png" srcset="a.png 1x">'
+        self.assertEqual(add_srcset(external), external)
+        self.assertEqual(add_srcset(existing), existing)
+
+    @override_settings(
+        CHEDITO_CONFIG={**DERIVATIVES_CONFIG, 'image_sizes': '(max-width: 700px) 100vw, 700px'}
+    )
+    def test_sizes_is_added(self):
+        """Test that the configured sizes attribute accompanies srcset."""
+        html = add_srcset('<img src="/media/test_uploads/images/a_12345678.png" />')
+        self.assertIn(' sizes="(max-width: 700px) 100vw, 700px"/>', html)
+
+    def test_render_rich_text_adds_srcset(self):
+        """Test that render_rich_text rewrites images when derivatives are enabled."""
+        from chedito.templatetags.chedito_tags import render_rich_text
+
+        html = render_rich_text('<p><img src="/media/test_uploads/images/a_12345678.png"></p>')
+        self.assertIn('srcset=', html)
+
+
+@skipUnless(Image, 'Pillow is not installed')
+@override_settings(CHEDITO_CONFIG=DERIVATIVES_CONFIG)
+class GenerateDerivativesTests(TestCase):
+    """Tests for generating derivatives in storage."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.temp_dir)
+        self.settings_override.enable()
+        self.storage = chedito_settings.get_storage()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_derivatives_up_to_the_image_width(self):
+        """Test that no derivative is wider than the original."""
+        url = self.storage.save(make_png(700), 'photo.png', 'image')
+        derivatives = generate_derivatives(self.storage, url)
+
+        self.assertEqual(sorted(derivatives), [320, 640])
+        with self.storage.open(derivatives[320]) as f:
+            image = Image.open(f)
+            self.assertEqual((image.format, image.width), ('WEBP', 320))
+
+    def test_derivative_view_redirects(self):
+        """Test that the view redirects to the derivative, or the original when too narrow."""
+        url = self.storage.save(make_png(700), 'photo.png', 'image')
+        name = self.storage.name_from_url(url)
+
+        response = self.client.get(f'/chedito/image/640/{name}')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], self.storage.url(derivative_name(name, 640)))
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self.client.get(f'/chedito/image/1280/{name}')
+        self.assertEqual(response['Location'], url)
+
+    def test_derivative_view_rejects_other_widths_and_paths(self):
+        """Test that only configured widths of stored images are served."""
+        url = self.storage.save(make_png(700), 'photo.png', 'image')
+        name = self.storage.name_from_url(url)
+
+        self.assertEqual(self.client.get(f'/chedito/image/500/{name}').status_code, 404)
+        self.assertEqual(
+            self.client.get('/chedito/image/640/test_uploads/images/missing_12345678.png').status_code,
+            404,
+        )
+
+    def test_upload_generates_derivatives(self):
+        """Test that image uploads queue making their derivatives."""
+        image = make_png(400)
+        image.name = 'photo.png'
+
+        response = self.client.post('/chedito/upload/image/', {'file': image})
+
+        name = self.storage.name_from_url(response.json()['url'])
+        self.assertTrue(self.storage.exists(derivative_name(name, 320)))
+        self.assertFalse(self.storage.exists(derivative_name(name, 640)))
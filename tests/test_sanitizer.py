@@ -0,0 +1,173 @@
+"""
+Tests for Chedito sanitization policies.
+"""
+
+import pickle
+from unittest import mock, skipUnless
+
+from django.test import TestCase
+
+from chedito.conf import chedito_settings
+from chedito.sanitizer import (
+    BuiltinBackend,
+    FastHTMLSanitizer,
+    Nh3Backend,
+    SanitizationPolicy,
+    SanitizedHTML,
+    get_backend,
+    get_policy,
+    is_sanitized,
+)
+from chedito.utils import HTMLSanitizer, sanitize_html
+
+try:
+    import nh3
+except ImportError:
+    nh3 = None
+
+# Documents on which FastHTMLSanitizer must match HTMLSanitizer exactly
+PARITY_CORPUS = [
+    '<p>Hello <strong>World</strong></p>',
+    '<P CLASS="ql-align-center">Upper &amp; lower</P>',
+    '<p><span style="color: red; position: fixed;FONT-SIZE: 3px">x</span></p>',
+    '<a href="http://example.com/?a=1&amp;b=2" title=\'say "hi"\' onclick="x()">l</a>',
+    '<a href=javascript:alert(1)>bad</a><a href=" https://ok.example ">ok</a>',
+    '<img src="data:text/html,x" alt=a><img src="/x.png" width=10 height="20"/>',
+    '<video controls src=v.mp4></video><iframe src="https://y.example"></iframe>',
+    '<br><br/><br />text &nbsp;&#39;&#x27; &copy more</p>',
+    '<div\nclass="x"\n><p class>a</p><p class="">b</p></div >',
+    '<unknown x=1><custom-el data-x="1">kept text</custom-el></unknown>',
+    '<ul><li>one<li>two</ul><table><tr><td colspan=2 rowspan="3">c</td></tr></table>',
+    '<p>Hello</p><script>alert("xss")</script><style>p {}</style>',
+    '<!-- comment --><p>a < b</p><',
+    'trailing &amp',
+]
+
+
+class SanitizationPolicyTests(TestCase):
+    """Tests for compiled sanitization policies."""
+
+    def test_policy_tables_are_frozen(self):
+        """Test that compiled lookup tables are immutable."""
+        policy = SanitizationPolicy(['p', 'a'], {'*': ['class'], 'a': ['href']}, ['color'])
+        self.assertIsInstance(policy.allowed_tags, frozenset)
+        self.assertEqual(policy.attributes_for('a'), frozenset({'class', 'href'}))
+        self.assertEqual(policy.attributes_for('p'), frozenset({'class'}))
+        with self.assertRaises(TypeError):
+            policy.tag_attributes['p'] = frozenset()
+
+    def test_default_policy_is_shared(self):
+        """Test that the default policy is compiled once and reused."""
+        self.assertIs(get_policy(), get_policy())
+
+    def test_equal_configurations_share_policy(self):
+        """Test that the registry returns one policy per configuration."""
+        first = get_policy(['p', 'em'], {'p': ['class']})
+        second = get_policy(['em', 'p'], {'p': ['class']})
+        self.assertIs(first, second)
+        self.assertNotEqual(first.fingerprint, get_policy().fingerprint)
+
+    def test_reload_recompiles_default_policy(self):
+        """Test that reloading settings drops compiled policies."""
+        policy = get_policy()
+        chedito_settings.reload()
+        self.assertIsNot(get_policy(), policy)
+        self.assertEqual(get_policy(), policy)
+
+    def test_backend_is_chosen_once(self):
+        """Test that the backend instance is reused."""
+        self.assertIs(get_backend(), get_backend())
+
+
+class BuiltinBackendTests(TestCase):
+    """Tests for the built-in sanitizer backend."""
+
+    def test_filters_attributes_and_styles(self):
+        """Test that disallowed attributes and styles are removed."""
+        html = '<p style="color: red; position: fixed" onclick="x()">Hi</p>'
+        result = BuiltinBackend().clean(html, get_policy())
+        self.assertEqual(result, '<p style="color: red">Hi</p>')
+
+    def test_removes_javascript_href(self):
+        """Test that unsafe URLs are dropped."""
+        html = '<a href="javascript:alert(1)" title="t">Click</a>'
+        result = BuiltinBackend().clean(html, get_policy())
+        self.assertEqual(result, '<a title="t">Click</a>')
+
+
+@skipUnless(nh3, 'nh3 is not installed')
+class Nh3BackendTests(TestCase):
+    """Tests for the nh3 sanitizer backend."""
+
+    def test_links_get_noopener_noreferrer(self):
+        """Test that nh3 replaces a user-supplied rel with noopener noreferrer."""
+        html = '<a href="https://example.com" rel="opener" target="_blank">x</a>'
+        result = Nh3Backend().clean(html, get_policy())
+        self.assertEqual(
+            result, '<a href="https://example.com" target="_blank" rel="noopener noreferrer">x</a>'
+        )
+
+
+class FastHTMLSanitizerTests(TestCase):
+    """Tests for the single-pass built-in sanitizer."""
+
+    def test_parity_with_html_parser_sanitizer(self):
+        """Test that output is identical to HTMLSanitizer on the shared corpus."""
+        policy = get_policy()
+        fast = FastHTMLSanitizer(policy)
+        for html in PARITY_CORPUS:
+            reference = HTMLSanitizer(policy=policy)
+            reference.feed(html)
+            with self.subTest(html=html):
+                self.assertEqual(fast.sanitize(html), reference.get_result())
+
+    def test_repeated_tags_are_memoized(self):
+        """Test that identical raw tags are compiled once."""
+        fast = FastHTMLSanitizer(get_policy())
+        fast.sanitize('<p class="a">1</p><p class="a">2</p>')
+        self.assertEqual(len(fast._tokens), 2)
+
+
+class SanitizedHTMLTests(TestCase):
+    """Tests for the SanitizedHTML marker type."""
+
+    def test_sanitize_html_returns_marker(self):
+        """Test that sanitized output is stamped with the policy fingerprint."""
+        result = sanitize_html('<p>Hello</p>')
+        self.assertIsInstance(result, SanitizedHTML)
+        self.assertTrue(is_sanitized(result, get_policy()))
+        self.assertFalse(is_sanitized(result, get_policy(['p'])))
+
+    def test_marked_content_is_not_sanitized_again(self):
+        """Test that marked content skips the backend under the same policy."""
+        result = sanitize_html('<p>Hello</p>')
+        with mock.patch.object(type(get_backend()), 'clean') as clean:
+            self.assertIs(sanitize_html(result), result)
+            sanitize_html(result, allowed_tags=['p'])
+        self.assertEqual(clean.call_count, 1)
+
+    def test_constructed_marker_is_not_trusted(self):
+        """Test that only sanitizer output passes through unchanged."""
+        forged = SanitizedHTML('<script>x</script>', get_policy().fingerprint)
+
+        self.assertFalse(is_sanitized(forged, get_policy()))
+        self.assertNotIn('<script>', sanitize_html(forged))
+
+    def test_template_tags_pass_marked_content_through(self):
+        """Test that render_rich_text trusts content cleaned by the form field."""
+        from chedito.forms import RichTextFormField
+        from chedito.templatetags.chedito_tags import render_rich_text, richtext_filter
+
+        value = RichTextFormField().clean('<p>Hello</p><script>x</script>')
+        with mock.patch.object(type(get_backend()), 'clean') as clean:
+            self.assertEqual(render_rich_text(value), value)
+            self.assertEqual(richtext_filter(value), value)
+        clean.assert_not_called()
+
+    def test_pickle_keeps_fingerprint(self):
+        """Test that the policy fingerprint survives pickling."""
+        result = sanitize_html('<p>Hello</p>')
+        restored = pickle.loads(pickle.dumps(result))
+        self.assertEqual(restored, result)
+        self.assertEqual(restored.policy_fingerprint, result.policy_fingerprint)
+        self.assertTrue(is_sanitized(restored, get_policy()))
@@ -81,3 +81,218 @@ class LocalStorageTests(TestCase):
         url = storage.url('chedito_uploads/files/test.txt')
 
         self.assertEqual(url, '/media/chedito_uploads/files/test.txt')
+
+
+class DefaultStorageTests(TestCase):
+    """Tests for DefaultStorage backend."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.temp_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _read_saved(self, url):
+        path = os.path.join(self.temp_dir, url.replace('/media/', ''))
+        with open(path, 'rb') as saved:
+            return saved.read()
+
+    def test_uploaded_file_is_passed_through(self):
+        """Test that UploadedFiles reach the storage without being read."""
+        from unittest import mock
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        from chedito.storage.default import DefaultStorage
+
+        storage = DefaultStorage()
+        uploaded = SimpleUploadedFile('clip.mp4', b'video bytes')
+        with mock.patch.object(storage.storage, 'save', return_value='x.mp4') as save:
+            storage.save(uploaded, 'clip.mp4', 'video')
+
+        self.assertIs(save.call_args[0][1], uploaded)
+
+    def test_save_seekable_file(self):
+        """Test saving a file object, which is rewound afterwards."""
+        from chedito.storage.default import DefaultStorage
+
+        file_obj = BytesIO(b'Test file content')
+        url = DefaultStorage().save(file_obj, 'test.txt', 'file')
+
+        self.assertEqual(self._read_saved(url), b'Test file content')
+        self.assertEqual(file_obj.tell(), 0)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=16)
+    def test_save_non_seekable_stream(self):
+        """Test that non-seekable streams are spooled in chunks."""
+        from chedito.storage.default import DefaultStorage
+
+        class Stream:
+            def __init__(self, data):
+                self.buffer = BytesIO(data)
+
+            def read(self, size=-1):
+                return self.buffer.read(size)
+
+        data = b'x' * 200000
+        storage = DefaultStorage()
+        storage.chunk_size = 1024
+        url = storage.save(Stream(data), 'big.bin', 'file')
+
+        self.assertEqual(self._read_saved(url), data)
+
+    def test_save_chunks_and_bytes(self):
+        """Test saving an iterable of chunks and raw bytes."""
+        from chedito.storage.default import DefaultStorage
+
+        storage = DefaultStorage()
+        url = storage.save(iter([b'ab', b'cd']), 'chunks.txt', 'file')
+        self.assertEqual(self._read_saved(url), b'abcd')
+
+        url = storage.save(b'raw', 'raw.txt', 'file')
+        self.assertEqual(self._read_saved(url), b'raw')
+
+
+class AsyncStorageTests(TestCase):
+    """Tests for the async storage methods."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.temp_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.settings_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    async def test_asave_aexists_adelete(self):
+        """Test that the async methods delegate to the sync ones."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        storage = LocalStorage()
+        url = await storage.asave(SimpleUploadedFile('a.txt', b'data'), 'a.txt', 'file')
+        name = url.replace('/media/', '')
+
+        self.assertTrue(await storage.aexists(name))
+        self.assertTrue(await storage.adelete(name))
+        self.assertFalse(await storage.aexists(name))
+
+    async def test_asave_runs_in_worker_thread(self):
+        """Test that asave doesn't run save on the event loop thread."""
+        import threading
+        from unittest import mock
+
+        storage = LocalStorage()
+        threads = []
+
+        def save(file, filename, upload_type):
+            threads.append(threading.current_thread())
+            return '/media/a.txt'
+
+        with mock.patch.object(storage, 'save', side_effect=save):
+            url = await storage.asave(BytesIO(b'data'), 'a.txt', 'file')
+
+        self.assertEqual(url, '/media/a.txt')
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Tests for ContentAddressedStorage backend."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _stored_files(self):
+        return [
+            name for root, dirs, files in os.walk(self.temp_dir) for name in files
+        ]
+
+    def test_duplicate_content_is_stored_once(self):
+        """Test that the same content uploaded twice shares one file."""
+        from chedito.storage.content_addressed import ContentAddressedStorage
+
+        storage = ContentAddressedStorage(location=self.temp_dir, base_url='/media/')
+        first = storage.save(BytesIO(b'screenshot'), 'paste.PNG', 'image')
+        second = storage.save(BytesIO(b'screenshot'), 'other name.png', 'image')
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith('.png'))
+        self.assertEqual(len(self._stored_files()), 1)
+
+    def test_url_is_derived_from_digest(self):
+        """Test that files are stored under their content hash."""
+        import hashlib
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from chedito.storage.content_addressed import ContentAddressedStorage
+
+        storage = ContentAddressedStorage(location=self.temp_dir, base_url='/media/')
+        url = storage.save(SimpleUploadedFile('logo.svg', b'<svg/>'), 'logo.svg', 'image')
+
+        digest = hashlib.sha256(b'<svg/>').hexdigest()
+        self.assertTrue(url.endswith(f'/images/{digest[:2]}/{digest}.svg'))
+        self.assertTrue(storage.exists(url.replace('/media/', '')))
+
+    def test_different_content_is_stored_separately(self):
+        """Test that distinct content gets distinct files."""
+        from chedito.storage.content_addressed import ContentAddressedStorage
+
+        storage = ContentAddressedStorage(location=self.temp_dir, base_url='/media/')
+        first = storage.save(b'one', 'a.txt', 'file')
+        second = storage.save(b'two', 'a.txt', 'file')
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(self._stored_files()), 2)
+
+
+class StorageInstanceTests(TestCase):
+    """Tests for the shared storage backend instance."""
+
+    def tearDown(self):
+        from chedito.conf import chedito_settings
+        chedito_settings.reload()
+
+    def test_instance_is_reused(self):
+        """Test that the backend is constructed once."""
+        from chedito.conf import chedito_settings
+
+        self.assertIs(chedito_settings.get_storage(), chedito_settings.get_storage())
+
+    def test_concurrent_first_use_builds_one_instance(self):
+        """Test that threads racing on first use share one instance."""
+        from concurrent.futures import ThreadPoolExecutor
+        from chedito.conf import chedito_settings
+
+        chedito_settings.reload()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            instances = set(map(id, executor.map(lambda _: chedito_settings.get_storage(), range(32))))
+        self.assertEqual(len(instances), 1)
+
+    def test_reload_closes_and_replaces_instance(self):
+        """Test that reloading settings calls the close() hook."""
+        from unittest import mock
+        from chedito.conf import chedito_settings
+
+        storage = chedito_settings.get_storage()
+        with mock.patch.object(storage, 'close') as close:
+            chedito_settings.reload()
+        close.assert_called_once_with()
+        self.assertIsNot(chedito_settings.get_storage(), storage)
+
+    def test_setting_changes_replace_instance(self):
+        """Test that changing the configured backend takes effect."""
+        from chedito.conf import chedito_settings
+
+        with override_settings(CHEDITO_CONFIG={'storage_backend': 'chedito.storage.local.LocalStorage'}):
+            self.assertIsInstance(chedito_settings.get_storage(), LocalStorage)
+        self.assertNotIsInstance(chedito_settings.get_storage(), LocalStorage)
@@ -0,0 +1,141 @@
+"""
+Tests for Chedito post-upload tasks.
+"""
+
+import json
+from io import BytesIO
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from chedito.conf import chedito_settings
+from chedito.tasks import (
+    DONE,
+    FAILED,
+    check_status_cache,
+    enqueue_upload_tasks,
+    get_job_status,
+    get_upload_tasks,
+)
+
+CALLS = []
+
+
+def record_task(storage, url, upload_type):
+    """Task recording its calls."""
+    CALLS.append((url, upload_type))
+    return {"seen": url}
+
+
+def failing_task(storage, url, upload_type):
+    """Task that always fails."""
+    raise ValueError("scanner unavailable")
+
+
+def image_task(storage, url, upload_type):
+    """Task that only applies to images."""
+
+
+image_task.upload_types = ("image",)
+
+
+TASKS_CONFIG = {
+    'upload_path': 'test_uploads/',
+    'upload_tasks': ['tests.test_tasks.record_task'],
+    'upload_task_backend': 'chedito.tasks.SyncTaskBackend',
+}
+
+
+@override_settings(CHEDITO_CONFIG=TASKS_CONFIG)
+class UploadTaskTests(TestCase):
+    """Tests for queuing and running post-upload tasks."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        CALLS.clear()
+        cache.clear()
+
+    def test_job_runs_tasks_and_records_status(self):
+        """Test that a job runs each task and stores their results."""
+        job_id = enqueue_upload_tasks('/media/a.pdf', 'file')
+
+        self.assertEqual(CALLS, [('/media/a.pdf', 'file')])
+        status = get_job_status(job_id)
+        self.assertEqual(status['status'], DONE)
+        self.assertEqual(status['results'], {'record_task': {'seen': '/media/a.pdf'}})
+
+    @override_settings(
+        CHEDITO_CONFIG={**TASKS_CONFIG, 'upload_tasks': ['tests.test_tasks.failing_task']}
+    )
+    def test_failed_job(self):
+        """Test that a failing task marks the job failed with its error."""
+        status = get_job_status(enqueue_upload_tasks('/media/a.pdf', 'file'))
+        self.assertEqual(status['status'], FAILED)
+        self.assertEqual(status['error'], 'scanner unavailable')
+
+    @override_settings(
+        CHEDITO_CONFIG={**TASKS_CONFIG, 'upload_tasks': ['tests.test_tasks.image_task']}
+    )
+    def test_tasks_are_filtered_by_upload_type(self):
+        """Test that no job is queued when no task applies."""
+        self.assertEqual(len(get_upload_tasks('image')), 1)
+        self.assertIsNone(enqueue_upload_tasks('/media/a.pdf', 'file'))
+
+    @override_settings(
+        CHEDITO_CONFIG={**TASKS_CONFIG, 'upload_task_backend': 'chedito.tasks.ThreadPoolTaskBackend'}
+    )
+    def test_thread_pool_backend(self):
+        """Test that the default backend runs jobs off the request thread."""
+        job_id = enqueue_upload_tasks('/media/a.pdf', 'file')
+        chedito_settings.get_task_backend().executor.shutdown(wait=True)
+
+        self.assertEqual(get_job_status(job_id)['status'], DONE)
+
+    def test_upload_response_links_job_status(self):
+        """Test that uploads return immediately with a pollable job."""
+        from unittest import mock
+
+        fake_file = BytesIO(b'%PDF-1.7\n' + b'\x00' * 100)
+        fake_file.name = 'doc.pdf'
+
+        with mock.patch('chedito.storage.default.DefaultStorage.save', return_value='/media/doc.pdf'):
+            response = self.client.post('/chedito/upload/file/', {'file': fake_file})
+
+        data = json.loads(response.content)
+        self.assertEqual(data['url'], '/media/doc.pdf')
+        self.assertEqual(data['status_url'], f"/chedito/upload/status/{data['job_id']}/")
+
+        status = self.client.get(data['status_url']).json()
+        self.assertEqual(status['status'], DONE)
+        self.assertEqual(self.client.get('/chedito/upload/status/missing/').status_code, 404)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_memory_status_cache_warns(self):
+        """Test that the system check flags a status cache private to each process."""
+        self.assertEqual([message.id for message in check_status_cache()], ['chedito.W001'])
+
+        with override_settings(CHEDITO_CONFIG={'upload_tasks': []}):
+            self.assertEqual(check_status_cache(), [])
+        with override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+        ):
+            self.assertEqual(check_status_cache(), [])
+
+    @override_settings(ROOT_URLCONF='tests.async_urls')
+    async def test_async_only_urlconf_links_job_status(self):
+        """Test that chedito.async_urls keeps the job status endpoint."""
+        from unittest import mock
+
+        from django.test import AsyncClient
+
+        fake_file = BytesIO(b'%PDF-1.7\n' + b'\x00' * 100)
+        fake_file.name = 'doc.pdf'
+
+        client = AsyncClient()
+        with mock.patch('chedito.storage.default.DefaultStorage.save', return_value='/media/doc.pdf'):
+            response = await client.post('/chedito/upload/file/', {'file': fake_file})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['status_url'], f"/chedito/upload/status/{data['job_id']}/")
+        self.assertEqual((await client.get(data['status_url'])).status_code, 200)
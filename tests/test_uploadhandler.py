@@ -0,0 +1,151 @@
+"""
+Tests for the Chedito upload handler and file signatures.
+"""
+
+from django.core.files.uploadhandler import StopUpload
+from django.test import TestCase
+
+from chedito.signatures import DOCX, check_signature, match_signature, sniff
+from chedito.uploadhandler import CheditoUploadHandler, RejectedUpload
+
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n' + b'\x00' * 8
+
+
+class SignatureTests(TestCase):
+    """Tests for magic-number matching."""
+
+    def test_match_signature(self):
+        """Test that common formats are recognized."""
+        self.assertEqual(match_signature(PNG_HEADER), {'image/png'})
+        self.assertEqual(match_signature(b'RIFF\x00\x00\x00\x00WEBPVP8 '), {'image/webp'})
+        self.assertIn('video/mp4', match_signature(b'\x00\x00\x00\x18ftypmp42'))
+        self.assertIsNone(match_signature(b'RIFF\x00\x00\x00\x00WAVEfmt '))
+        self.assertIsNone(match_signature(b'plain text'))
+
+    def test_iso_bmff_images_are_told_apart_from_video(self):
+        """Test that the ftyp major brand identifies AVIF and HEIC images."""
+        avif = b'\x00\x00\x00\x1cftypavif\x00\x00\x00\x00avifmif1'
+        heic = b'\x00\x00\x00\x18ftypheic\x00\x00\x00\x00mif1heic'
+
+        self.assertEqual(match_signature(avif), {'image/avif'})
+        self.assertEqual(match_signature(b'\x00\x00\x00\x1cftypavis'), {'image/avif'})
+        self.assertEqual(match_signature(heic), {'image/heic'})
+        self.assertEqual(match_signature(b'\x00\x00\x00\x18ftypmif1'), {'image/heic'})
+        self.assertEqual(sniff(avif), {'image/avif'})
+
+        self.assertTrue(check_signature(avif, ['image/jpeg', 'image/png', 'image/avif'])[0])
+        self.assertFalse(check_signature(avif, ['video/mp4', 'video/webm'])[0])
+        self.assertFalse(check_signature(heic, ['video/mp4', 'video/quicktime'])[0])
+        self.assertFalse(check_signature(b'\x00\x00\x00\x18ftypisom', ['image/avif'])[0])
+
+    def test_check_signature(self):
+        """Test that detected types must be allowed."""
+        self.assertTrue(check_signature(PNG_HEADER, ['image/png'])[0])
+        self.assertFalse(check_signature(PNG_HEADER, ['image/jpeg'])[0])
+
+    def test_unknown_content_depends_on_allowed_types(self):
+        """Test that unrecognized content is only rejected when every type is recognizable."""
+        self.assertTrue(check_signature(b'<svg></svg>', ['image/png', 'image/svg+xml'])[0])
+        self.assertFalse(check_signature(b'<svg></svg>', ['video/mp4', 'video/webm'])[0])
+
+
+class SniffTests(TestCase):
+    """Tests for content sniffing beyond magic numbers."""
+
+    def test_office_documents_are_told_apart_from_zip(self):
+        """Test that ZIP entries identify Office documents."""
+        docx = b'PK\x03\x04' + b'\x00' * 26 + b'[Content_Types].xml' + b'PK\x03\x04word/document.xml'
+        self.assertEqual(sniff(docx), {DOCX, 'application/zip'})
+        self.assertEqual(sniff(b'PK\x03\x04' + b'\x00' * 26 + b'photos/a.jpg'), {'application/zip'})
+
+    def test_text_and_svg(self):
+        """Test that text formats without a magic number are recognized."""
+        self.assertEqual(sniff(b'<?xml version="1.0"?>\n<svg xmlns="..."></svg>'), {'image/svg+xml'})
+        self.assertEqual(sniff('caf\u00e9'.encode('utf-8')[:-1]), {'text/plain', 'text/csv'})
+        self.assertIsNone(sniff(b'\x7fELF\x02\x01\x01\x00'))
+
+    def test_text_in_other_encodings(self):
+        """Test that 8-bit and UTF-16 text is recognized, but not binary data."""
+        text = {'text/plain', 'text/csv'}
+        self.assertEqual(sniff('nom;pr\u00e9nom\r\nZo\u00eb;\u20ac5\r\n'.encode('cp1252')), text)
+        self.assertEqual(sniff('caf\u00e9\n'.encode('latin-1')), text)
+        self.assertEqual(sniff('caf\u00e9\n'.encode('utf-16')), text)
+        self.assertIsNone(sniff(b'\x80\x81\x02\x03binary'))
+        self.assertIsNone(sniff(b'ab\x00cd'))
+
+
+class CheditoUploadHandlerTests(TestCase):
+    """Tests for CheditoUploadHandler."""
+
+    def _start(self, handler, content_length=None):
+        handler.new_file('file', 'upload.png', 'image/png', content_length)
+
+    def test_passes_chunks_through(self):
+        """Test that valid data reaches the next handler unchanged."""
+        handler = CheditoUploadHandler(max_size=100, allowed_types=['image/png'])
+        self._start(handler)
+
+        self.assertEqual(handler.receive_data_chunk(PNG_HEADER, 0), PNG_HEADER)
+        self.assertIsNone(handler.file_complete(len(PNG_HEADER)))
+        self.assertIsNone(handler.error)
+
+    def test_stops_when_size_is_exceeded(self):
+        """Test that the upload stops at the first chunk over the limit."""
+        handler = CheditoUploadHandler(max_size=20, allowed_types=['image/png'])
+        self._start(handler)
+        handler.receive_data_chunk(PNG_HEADER, 0)
+
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(b'\x00' * 16, len(PNG_HEADER))
+        self.assertIn('exceeds maximum', handler.error)
+
+    def test_stops_on_declared_length(self):
+        """Test that a declared length over the limit stops the upload before any data."""
+        handler = CheditoUploadHandler(max_size=20)
+        with self.assertRaises(StopUpload):
+            self._start(handler, content_length=1000)
+
+    def test_checks_signature_across_chunks(self):
+        """Test that the header is collected from small chunks before checking."""
+        handler = CheditoUploadHandler(allowed_types=['image/jpeg'])
+        self._start(handler)
+        handler.receive_data_chunk(PNG_HEADER[:4], 0)
+
+        with self.assertRaises(StopUpload):
+            handler.receive_data_chunk(PNG_HEADER[4:], 4)
+        self.assertIn('image/png', handler.error)
+
+    def test_checks_short_files_on_completion(self):
+        """Test that files shorter than the header are checked when complete."""
+        handler = CheditoUploadHandler(allowed_types=['video/mp4'])
+        self._start(handler)
+        handler.receive_data_chunk(b'tiny', 0)
+
+        with self.assertRaises(StopUpload):
+            handler.file_complete(4)
+
+    def test_skip_invalid_rejects_only_the_file(self):
+        """Test that skip mode drops the invalid file and keeps receiving."""
+        handler = CheditoUploadHandler(max_size=20, allowed_types=['image/png'], skip_invalid=True)
+        self._start(handler)
+        handler.receive_data_chunk(PNG_HEADER, 0)
+        self.assertIsNone(handler.receive_data_chunk(b'\x00' * 16, len(PNG_HEADER)))
+
+        rejected = handler.file_complete(len(PNG_HEADER) + 16)
+        self.assertIsInstance(rejected, RejectedUpload)
+        self.assertIn('exceeds maximum', rejected.error)
+        self.assertIsNone(handler.error)
+
+        self._start(handler)
+        self.assertEqual(handler.receive_data_chunk(PNG_HEADER, 0), PNG_HEADER)
+        self.assertIsNone(handler.file_complete(len(PNG_HEADER)))
+
+    def test_max_files(self):
+        """Test that files beyond max_files are rejected."""
+        handler = CheditoUploadHandler(skip_invalid=True, max_files=1)
+        self._start(handler)
+        self.assertIsNone(handler.file_complete(0))
+
+        self._start(handler)
+        self.assertIn('Too many files', handler.file_complete(0).error)
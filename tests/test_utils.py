@@ -2,10 +2,19 @@
 Tests for Chedito utility functions.
 """
 
+from io import BytesIO, StringIO
+
 from django.test import TestCase
 
 from chedito.utils import (
+    HTMLSanitizer,
+    html_to_text,
+    iter_sanitize_html,
+    sanitize_html_stream,
     sanitize_html,
+    truncate_html,
+    truncate_html_text,
+    truncate_text,
     validate_file_type,
     validate_file_size,
     generate_unique_filename,
@@ -54,6 +63,81 @@ class SanitizeHTMLTests(TestCase):
         self.assertIn('<em>', result)
 
 
+class StreamingSanitizeTests(TestCase):
+    """Tests for the streaming sanitizer API."""
+
+    html = (
+        '<p class="x">Caf\u00e9 &amp; <strong>bold</strong></p>'
+        '<script>alert("xss")</script><a href="javascript:x()">link</a>'
+    )
+
+    def expected(self):
+        sanitizer = HTMLSanitizer()
+        sanitizer.feed(self.html)
+        sanitizer.close()
+        return sanitizer.get_result()
+
+    def test_any_chunking_gives_same_output(self):
+        """Test that output does not depend on where chunks are split."""
+        for size in (1, 3, 7, 64):
+            chunks = [self.html[i:i + size] for i in range(0, len(self.html), size)]
+            with self.subTest(size=size):
+                self.assertEqual(''.join(iter_sanitize_html(chunks)), self.expected())
+
+    def test_bytes_split_inside_character(self):
+        """Test that multi-byte characters split across chunks are decoded."""
+        data = self.html.encode('utf-8')
+        chunks = [data[i:i + 2] for i in range(0, len(data), 2)]
+        self.assertEqual(''.join(iter_sanitize_html(chunks)), self.expected())
+
+    def test_stream_to_binary_writer(self):
+        """Test sanitizing from a binary file into a binary writer."""
+        writer = BytesIO()
+        written = sanitize_html_stream(BytesIO(self.html.encode('utf-8')), writer, chunk_size=5)
+        self.assertEqual(writer.getvalue().decode('utf-8'), self.expected())
+        self.assertEqual(written, len(self.expected()))
+
+    def test_stream_to_text_writer(self):
+        """Test sanitizing from a text file into a text writer."""
+        writer = StringIO()
+        sanitize_html_stream(StringIO(self.html), writer, chunk_size=5)
+        self.assertNotIn('<script>', writer.getvalue())
+        self.assertEqual(writer.getvalue(), self.expected())
+
+
+class TruncateTests(TestCase):
+    """Tests for early-exit truncation."""
+
+    def test_plain_truncation_matches_full_strip(self):
+        """Test that reading a prefix gives the same result as stripping everything."""
+        html = '  <p>Hello <b>big</b></p>\n<p>  wide   world</p> <p>of text</p>' * 3
+        for length in (0, 3, 9, 15, 40, 500):
+            with self.subTest(length=length):
+                self.assertEqual(
+                    truncate_html_text(html, length),
+                    truncate_text(html_to_text(html), length),
+                )
+
+    def test_plain_truncation_stops_early(self):
+        """Test that the rest of the document is not read."""
+        html = '<p>Hello world</p>' + '<p' * 100000
+        self.assertEqual(truncate_html_text(html, 5), 'Hello...')
+
+    def test_html_truncation_closes_open_tags(self):
+        """Test that the preview keeps formatting and is well nested."""
+        html = '<p>Hello <b>bold <i>world</i></b> and more</p><p>Second</p>'
+        self.assertEqual(truncate_html(html, 13), '<p>Hello <b>bold <i>wo...</i></b></p>')
+
+    def test_html_truncation_keeps_short_content(self):
+        """Test that short content is returned unchanged."""
+        html = '<p>Hi <img src="x.png"> &amp; bye<br></p>'
+        self.assertEqual(truncate_html(html, 100), html)
+
+    def test_html_truncation_counts_entities_once(self):
+        """Test that entities are neither split nor counted by length."""
+        self.assertEqual(truncate_html('<p>a&amp;b&lt;cdef</p>', 4), '<p>a&amp;b&lt;...</p>')
+
+
 class ValidateFileTypeTests(TestCase):
     """Tests for file type validation."""
 
@@ -81,6 +165,66 @@ class ValidateFileTypeTests(TestCase):
         self.assertFalse(is_valid)
         self.assertIn('not allowed', error)
 
+    def test_type_is_sniffed_from_content(self):
+        """Test that file content wins over the declared content type."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        png = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+        allowed = ['image/jpeg', 'image/png']
+
+        upload = SimpleUploadedFile('photo.png', png, content_type='application/octet-stream')
+        self.assertEqual(validate_file_type(upload, allowed), (True, None))
+
+        upload = SimpleUploadedFile('photo.png', b'%PDF-1.7', content_type='image/png')
+        is_valid, error = validate_file_type(upload, allowed)
+        self.assertFalse(is_valid)
+        self.assertIn('application/pdf', error)
+
+    def test_avif_is_an_image(self):
+        """Test that AVIF images aren't mistaken for video."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        avif = b'\x00\x00\x00 ftypavif\x00\x00\x00\x00avifmif1miafMA1B' + b'\x00' * 100
+        upload = SimpleUploadedFile('photo.avif', avif, content_type='image/avif')
+
+        self.assertTrue(validate_file_type(upload, ['image/jpeg', 'image/png', 'image/avif'])[0])
+        self.assertFalse(validate_file_type(upload, ['video/mp4', 'video/quicktime'])[0])
+
+    def test_extension_must_be_allowed(self):
+        """Test that text content can't be uploaded under a disallowed extension."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        allowed = ['application/pdf', 'text/plain', 'text/csv']
+        upload = SimpleUploadedFile('notes.txt', b'a,b\n1,2\n', content_type='text/plain')
+        self.assertTrue(validate_file_type(upload, allowed)[0])
+
+        upload = SimpleUploadedFile('page.html', b'<script>x</script>', content_type='text/plain')
+        self.assertFalse(validate_file_type(upload, allowed)[0])
+
+        upload = SimpleUploadedFile('export.csv', 'caf\u00e9;3\r\n'.encode('cp1252'), content_type='text/csv')
+        self.assertTrue(validate_file_type(upload, allowed)[0])
+
+    def test_only_the_header_is_read(self):
+        """Test that sniffing reads a bounded header and keeps the file position."""
+        from django.core.files.uploadedfile import InMemoryUploadedFile
+        from chedito.signatures import SNIFF_SIZE
+
+        reads = []
+
+        class RecordingBytesIO(BytesIO):
+            def read(self, size=-1):
+                reads.append(size)
+                return super().read(size)
+
+        data = b'\x00\x00\x00\x18ftypmp42' + b'\x00' * 100000
+        upload = InMemoryUploadedFile(
+            RecordingBytesIO(data), 'file', 'clip.mp4', 'video/mp4', len(data), None
+        )
+
+        self.assertTrue(validate_file_type(upload, ['video/mp4'])[0])
+        self.assertEqual(reads, [SNIFF_SIZE])
+        self.assertEqual(upload.tell(), 0)
+
 
 class ValidateFileSizeTests(TestCase):
     """Tests for file size validation."""
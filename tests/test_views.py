@@ -5,7 +5,7 @@ Tests for Chedito views.
 import json
 from io import BytesIO
 
-from django.test import TestCase, Client, override_settings
+from django.test import AsyncClient, TestCase, Client, override_settings
 from django.contrib.auth.models import User
 
 
@@ -83,3 +83,196 @@ class UploadViewTests(TestCase):
         response = self.client.get('/chedito/upload/file/')
         # Should return 405 (Method Not Allowed) not 404
         self.assertEqual(response.status_code, 405)
+
+    @override_settings(CHEDITO_CONFIG={'max_image_size': 1024})
+    def test_oversized_upload_is_stopped_while_streaming(self):
+        """Test that the upload handler rejects files over the limit."""
+        from unittest import mock
+        from chedito.conf import chedito_settings
+        chedito_settings.reload()
+        self.client.login(username='testuser', password='testpass123')
+
+        fake_file = BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 10000)
+        fake_file.name = 'big.png'
+
+        with mock.patch('chedito.storage.default.DefaultStorage.save') as save:
+            response = self.client.post('/chedito/upload/image/', {'file': fake_file})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceeds maximum', json.loads(response.content)['error'])
+        save.assert_not_called()
+        chedito_settings.reload()
+
+    def test_upload_with_wrong_signature_is_rejected(self):
+        """Test that file content is checked, not just the name."""
+        self.client.login(username='testuser', password='testpass123')
+
+        fake_file = BytesIO(b'%PDF-1.7\n' + b'\x00' * 100)
+        fake_file.name = 'clip.mp4'
+
+        response = self.client.post('/chedito/upload/video/', {'file': fake_file})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('application/pdf', json.loads(response.content)['error'])
+
+    def test_upload_still_requires_csrf_token(self):
+        """Test that installing the upload handler keeps CSRF protection."""
+        client = Client(enforce_csrf_checks=True)
+        client.login(username='testuser', password='testpass123')
+
+        fake_file = BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+        fake_file.name = 'test.png'
+
+        response = client.post('/chedito/upload/image/', {'file': fake_file})
+        self.assertEqual(response.status_code, 403)
+
+
+class AsyncUploadViewTests(TestCase):
+    """Tests for the async upload views."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = AsyncClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+    async def test_image_upload_is_saved_with_asave(self):
+        """Test that a valid upload is saved through the async storage API."""
+        from unittest import mock
+        await self.client.aforce_login(self.user)
+
+        fake_file = BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+        fake_file.name = 'test.png'
+
+        with mock.patch(
+            'chedito.storage.default.DefaultStorage.save', return_value='/media/test.png'
+        ) as save:
+            response = await self.client.post('/chedito-async/upload/image/', {'file': fake_file})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['url'], '/media/test.png')
+        self.assertEqual(save.call_args[0][1:], ('test.png', 'image'))
+
+    async def test_upload_requires_post(self):
+        """Test that GET requests are not allowed."""
+        response = await self.client.get('/chedito-async/upload/file/')
+        self.assertEqual(response.status_code, 405)
+
+    async def test_upload_validates_type(self):
+        """Test that the async view applies the same validation."""
+        await self.client.aforce_login(self.user)
+
+        fake_file = BytesIO(b'%PDF-1.7\n' + b'\x00' * 100)
+        fake_file.name = 'clip.mp4'
+
+        response = await self.client.post('/chedito-async/upload/video/', {'file': fake_file})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('application/pdf', json.loads(response.content)['error'])
+
+    @override_settings(CHEDITO_CONFIG={'require_authentication': True})
+    async def test_upload_requires_authentication_when_configured(self):
+        """Test that permissions are checked for async uploads."""
+        fake_file = BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+        fake_file.name = 'test.png'
+
+        response = await self.client.post('/chedito-async/upload/image/', {'file': fake_file})
+        self.assertEqual(response.status_code, 403)
+
+    async def test_upload_still_requires_csrf_token(self):
+        """Test that the async views keep CSRF protection."""
+        client = AsyncClient(enforce_csrf_checks=True)
+        await client.aforce_login(self.user)
+
+        fake_file = BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+        fake_file.name = 'test.png'
+
+        response = await client.post('/chedito-async/upload/image/', {'file': fake_file})
+        self.assertEqual(response.status_code, 403)
+
+
+class BatchUploadViewTests(TestCase):
+    """Tests for the batch upload views."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.login(username='testuser', password='testpass123')
+
+    def _png(self, name):
+        fake_file = BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 100)
+        fake_file.name = name
+        return fake_file
+
+    def test_batch_upload_saves_every_file(self):
+        """Test that all files of a batch are saved, with results in order."""
+        from unittest import mock
+
+        files = [self._png(f'image{i}.png') for i in range(5)]
+        with mock.patch(
+            'chedito.storage.default.DefaultStorage.save',
+            side_effect=lambda file, filename, upload_type: f'/media/{filename}',
+        ) as save:
+            response = self.client.post('/chedito/upload/image/batch/', {'files': files})
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertTrue(data['success'])
+        self.assertEqual(
+            [result['url'] for result in data['results']],
+            [f'/media/image{i}.png' for i in range(5)],
+        )
+        self.assertEqual(save.call_count, 5)
+
+    def test_invalid_files_are_reported_per_file(self):
+        """Test that one invalid file doesn't fail the rest of the batch."""
+        from unittest import mock
+
+        pdf = BytesIO(b'%PDF-1.7\n' + b'\x00' * 100)
+        pdf.name = 'fake.png'
+        files = [self._png('a.png'), pdf, self._png('b.png')]
+
+        with mock.patch(
+            'chedito.storage.default.DefaultStorage.save',
+            side_effect=lambda file, filename, upload_type: f'/media/{filename}',
+        ):
+            response = self.client.post('/chedito/upload/image/batch/', {'files': files})
+
+        data = json.loads(response.content)
+        self.assertFalse(data['success'])
+        self.assertEqual([r['success'] for r in data['results']], [True, False, True])
+        self.assertEqual(data['results'][1]['filename'], 'fake.png')
+        self.assertIn('application/pdf', data['results'][1]['error'])
+        self.assertEqual(data['results'][2]['url'], '/media/b.png')
+
+    @override_settings(CHEDITO_CONFIG={'batch_upload_max_files': 2})
+    def test_files_over_the_limit_are_rejected(self):
+        """Test that only batch_upload_max_files files are accepted."""
+        from unittest import mock
+
+        files = [self._png(f'image{i}.png') for i in range(3)]
+        with mock.patch('chedito.storage.default.DefaultStorage.save', return_value='/media/x.png'):
+            response = self.client.post('/chedito/upload/image/batch/', {'files': files})
+
+        results = json.loads(response.content)['results']
+        self.assertEqual([r['success'] for r in results], [True, True, False])
+        self.assertIn('Too many files', results[2]['error'])
+
+    def test_batch_upload_requires_files(self):
+        """Test that an empty batch is refused."""
+        response = self.client.post('/chedito/upload/image/batch/')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CHEDITO_CONFIG={'require_authentication': True})
+    def test_batch_upload_checks_permissions(self):
+        """Test that permissions are checked for batch uploads."""
+        self.client.logout()
+        response = self.client.post('/chedito/upload/image/batch/', {'files': [self._png('a.png')]})
+        self.assertEqual(response.status_code, 403)
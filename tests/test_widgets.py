@@ -5,7 +5,7 @@ Tests for Chedito widgets.
 import json
 from django.test import TestCase
 
-from chedito.widgets import RichTextWidget, AdminRichTextWidget
+from chedito.widgets import AdminRichTextWidget, ConfigScript, RichTextWidget
 
 
 class RichTextWidgetTests(TestCase):
@@ -43,6 +43,35 @@ class RichTextWidgetTests(TestCase):
         self.assertIn('theme', config)
         self.assertIn('modules', config)
 
+    def test_quill_config_json_is_memoized(self):
+        """Test that equal configurations are merged and serialized once."""
+        from unittest import mock
+        from chedito.conf import chedito_settings
+
+        chedito_settings.reload()
+        first = RichTextWidget(quill_config={'placeholder': 'Custom'})
+        second = RichTextWidget(quill_config={'placeholder': 'Custom'})
+
+        with mock.patch.object(
+            chedito_settings, 'get_quill_config', wraps=chedito_settings.get_quill_config
+        ) as get_quill_config:
+            config_json = first.get_quill_config_json()
+            self.assertEqual(second.get_quill_config_json(), config_json)
+            RichTextWidget(quill_config={'placeholder': 'Other'}).get_quill_config_json()
+
+        self.assertEqual(get_quill_config.call_count, 2)
+        self.assertEqual(json.loads(config_json)['placeholder'], 'Custom')
+
+    def test_quill_config_json_follows_settings(self):
+        """Test that the memoized configuration is rebuilt when settings change."""
+        from django.test import override_settings
+
+        widget = RichTextWidget()
+        widget.get_quill_config_json()
+        with override_settings(CHEDITO_CONFIG={'quill_theme': 'bubble'}):
+            self.assertEqual(json.loads(widget.get_quill_config_json())['theme'], 'bubble')
+        self.assertEqual(json.loads(widget.get_quill_config_json())['theme'], 'snow')
+
     def test_render_produces_html(self):
         """Test that render produces HTML output."""
         widget = RichTextWidget()
@@ -60,6 +89,72 @@ class RichTextWidgetTests(TestCase):
         self.assertIn('chedito-editor', html)
         self.assertIn('id_content_editor', html)
 
+    def test_batch_upload_limit_is_passed_to_the_client(self):
+        """Test that the container carries the server's batch upload limit."""
+        from django.test import override_settings
+
+        html = RichTextWidget().render('content', '', {'id': 'id_content'})
+        self.assertIn('data-batch-upload-max-files="20"', html)
+
+        with override_settings(CHEDITO_CONFIG={'batch_upload_max_files': 5}):
+            html = RichTextWidget().render('content', '', {'id': 'id_content'})
+        self.assertIn('data-batch-upload-max-files="5"', html)
+
+    def test_every_editor_writes_its_config(self):
+        """Test that editors carry their own config element, with unique IDs."""
+        widget = RichTextWidget(quill_config={'placeholder': '</script>'})
+        first = widget.render('first', '', {'id': 'id_first'})
+        second = widget.render('second', '', {'id': 'id_second'})
+
+        self.assertIn('<script id="id_first_editor_config" type="application/json">', first)
+        self.assertIn('data-config-id="id_first_editor_config"', first)
+        self.assertIn('<script id="id_second_editor_config" type="application/json">', second)
+        self.assertNotIn('"</script>"', first)
+        self.assertNotIn('data-config=', second)
+
+    def test_editors_are_created_on_load_by_default(self):
+        """Test that widgets are not lazy unless configured."""
+        html = RichTextWidget().render('content', '<p>Hi</p>', {'id': 'id_content'})
+
+        self.assertNotIn('data-chedito-lazy', html)
+        self.assertNotIn('class="ql-editor chedito-lazy-preview"', html)
+
+    def test_lazy_widget_renders_static_preview(self):
+        """Test that a lazy widget shows its sanitized content until created."""
+        widget = RichTextWidget(lazy=True)
+        html = widget.render(
+            'content', '<p>Hello</p><script>alert(1)</script>', {'id': 'id_content'}
+        )
+
+        self.assertIn('data-chedito-lazy="true"', html)
+        self.assertIn('class="ql-editor chedito-lazy-preview"', html)
+        self.assertIn('window.Chedito.whenNeeded(', html)
+        self.assertNotIn('function whenNeeded', html)
+        self.assertIn('<p>Hello</p>', html)
+        self.assertNotIn('<script>alert(1)</script>', html)
+
+    def test_lazy_preview_is_text_without_sanitizing(self):
+        """Test that the preview never renders raw markup when sanitizing is off."""
+        from django.test import override_settings
+
+        with override_settings(CHEDITO_CONFIG={'sanitize_html': False}):
+            html = RichTextWidget(lazy=True).render(
+                'content', '<p>Hello</p><img src=x onerror="alert(1)">', {'id': 'id_content'}
+            )
+
+        self.assertIn('aria-label="Rich text editor content">Hello</div>', html)
+        self.assertNotIn('<img src=x', html)
+        self.assertNotIn('onerror', html.split('chedito-lazy-preview', 1)[1].split('</div>', 1)[0])
+
+    def test_lazy_init_setting(self):
+        """Test that lazy_init makes widgets lazy unless they opt out."""
+        from django.test import override_settings
+
+        with override_settings(CHEDITO_CONFIG={'lazy_init': True}):
+            self.assertTrue(RichTextWidget().is_lazy())
+            self.assertTrue(AdminRichTextWidget().is_lazy())
+            self.assertFalse(RichTextWidget(lazy=False).is_lazy())
+
 
 class AdminRichTextWidgetTests(TestCase):
     """Tests for AdminRichTextWidget."""
@@ -69,6 +164,25 @@ class AdminRichTextWidgetTests(TestCase):
         widget = AdminRichTextWidget()
         self.assertIsNotNone(widget)
 
+    def test_config_is_written_once_by_the_media(self):
+        """Test that admin editors share one config element from the form media."""
+        from django import forms
+
+        class AdminForm(forms.Form):
+            first = forms.CharField(widget=AdminRichTextWidget())
+            second = forms.CharField(widget=AdminRichTextWidget())
+            other = forms.CharField(widget=AdminRichTextWidget(quill_config={'placeholder': 'Other'}))
+
+        form = AdminForm()
+        media = str(form.media)
+        config_id = ConfigScript(form.fields['first'].widget.get_quill_config_json()).id
+
+        self.assertEqual(media.count(f'<script id="{config_id}" type="application/json">'), 1)
+        self.assertEqual(media.count('type="application/json"'), 2)
+        html = str(form['second'])
+        self.assertIn(f'data-config-id="{config_id}"', html)
+        self.assertNotIn('application/json', html)
+
     def test_includes_admin_class(self):
         """Test admin widget includes admin-specific class."""
         widget = AdminRichTextWidget()
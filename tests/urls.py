@@ -8,4 +8,5 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('chedito/', include('chedito.urls')),
+    path('chedito-async/', include('chedito.async_urls', namespace='chedito_async')),
 ]